@@ -0,0 +1,4 @@
+"""Offline benchmarks for the orchestrator — scripted LLM, fake Docker, no network.
+
+Run with `python -m bench`; see bench/__main__.py for options.
+"""
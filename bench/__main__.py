@@ -0,0 +1,75 @@
+"""python -m bench — run the offline benchmark and compare it with the saved baseline.
+
+    python -m bench                          # run, compare with bench/baseline.json if recorded
+    python -m bench --sessions 64 --skills 32
+    python -m bench --save-baseline          # record this machine's numbers as the baseline
+
+Each configuration runs --repeat times and the run with the median session p50 is
+reported. Exits 1 if any tracked metric regressed by more than --tolerance.
+Baselines are machine-specific, so bench/baseline.json is local and not committed.
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import fields
+from pathlib import Path
+
+from bench.harness import BenchConfig, compare, run_benchmark
+
+BASELINE = Path(__file__).parent / "baseline.json"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Offline Helix orchestrator benchmark")
+    for f in fields(BenchConfig):
+        parser.add_argument(f"--{f.name.replace('_', '-')}", type=type(f.default), default=f.default)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed relative regression (0.3 = 30%%)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs to take the median of (by session p50)")
+    parser.add_argument("--json", action="store_true", help="print the full results as JSON")
+    args = parser.parse_args(argv)
+    log = sys.stderr if args.json else sys.stdout  # keep stdout pure JSON with --json
+
+    cfg = BenchConfig(**{f.name: getattr(args, f.name) for f in fields(BenchConfig)})
+    runs = sorted((run_benchmark(cfg) for _ in range(max(1, args.repeat))),
+                  key=lambda r: r["sessions"]["latency"]["p50_ms"])
+    results = runs[len(runs) // 2]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        deploy, sessions = results["deploy"], results["sessions"]
+        print(f"deploy:   {cfg.skills} skills in {deploy['wall_s']}s  latency {deploy['latency']}")
+        print(f"sessions: {cfg.sessions} x {cfg.calls_per_session} calls in {sessions['wall_s']}s  "
+              f"({sessions['sessions_per_s']} sessions/s, {sessions['skill_calls_per_s']} skill calls/s)")
+        print(f"          latency  {sessions['latency']}")
+        print(f"          overhead {sessions['overhead']}")
+        print(f"memory:   peak {results['memory']['peak_mb']} MB")
+    errors = results["deploy"]["errors"] + results["sessions"]["errors"]
+    if errors:
+        print(f"{len(errors)} session error(s), first: {errors[0]}", file=sys.stderr)
+        return 1
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Saved baseline to {args.baseline}", file=log)
+        return 0
+    if not args.baseline.exists():
+        print("No baseline to compare with; run with --save-baseline first.", file=log)
+        return 0
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("config") != results["config"]:
+        print("Baseline was recorded with different settings; not comparing.", file=log)
+        return 0
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    if not regressions:
+        print(f"No regressions against {args.baseline.name} (tolerance {args.tolerance:.0%}).", file=log)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+"""Stand-ins for the LLM, the Docker daemons and the skill containers.
+
+ScriptedProvider replays AgentResponses (hand-written or recorded from a real
+provider with RecordingProvider) after a fixed delay. FakeDocker mimics the
+docker-py calls the factory and GC make, with configurable build and start latency.
+The e2e tests use the same fakes, and make_spec, rather than their own copies.
+offline_backend() wires both into the orchestrator for the duration of a run,
+together with a mock HTTP transport that answers every skill call.
+"""
+
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Iterable, Iterator
+
+import docker
+import httpx
+
+import config
+from models.skill import SkillSpec
+from orchestrator import agent, skill_client
+from orchestrator.providers import AgentResponse, LLMProvider, ToolCall, Usage
+from skill_factory import factory, hosts
+from skill_factory.hosts import DockerHost, HostPool
+from skill_factory.placement import HostBudget
+
+
+def response_to_dict(response: AgentResponse) -> dict:
+    return {
+        "text_parts": response.text_parts,
+        "tool_calls": [asdict(tc) for tc in response.tool_calls],
+        "is_done": response.is_done,
+        "usage": asdict(response.usage),
+        "model": response.model,
+    }
+
+
+def response_from_dict(data: dict) -> AgentResponse:
+    text = "\n".join(data.get("text_parts", []))
+    calls = [ToolCall(**tc) for tc in data.get("tool_calls", [])]
+    return AgentResponse(
+        text_parts=data.get("text_parts", []),
+        tool_calls=calls,
+        is_done=data.get("is_done", False),
+        raw_message={"role": "assistant", "content": text or json.dumps([tc["name"] for tc in data.get("tool_calls", [])])},
+        usage=Usage(**data.get("usage", {})),
+        model=data.get("model", "scripted"),
+    )
+
+
+class ScriptedProvider(LLMProvider):
+    """Replays one response per turn after latency seconds, like a model that always answers the same.
+
+    Records the tool results it was sent and the messages of its first turn, for tests.
+    """
+
+    def __init__(self, responses: list[AgentResponse], latency: float = 0.0):
+        self.responses = list(responses)
+        self.latency = latency
+        self.sent_results: list[list[dict]] = []
+        self.first_messages: list[dict] | None = None
+
+    @classmethod
+    def from_file(cls, path: str | Path, latency: float = 0.0) -> "ScriptedProvider":
+        """Load a JSONL recording made by RecordingProvider."""
+        lines = Path(path).read_text().splitlines()
+        return cls([response_from_dict(json.loads(line)) for line in lines if line.strip()], latency)
+
+    def convert_tools(self, tools):
+        return tools
+
+    def format_tool_results(self, tool_results):
+        self.sent_results.append(tool_results)
+        return [{"role": "user", "content": json.dumps(tool_results)}]
+
+    def create_message(self, system, messages, tools):
+        if not self.responses:
+            raise RuntimeError("ScriptedProvider ran out of responses")
+        if self.first_messages is None:
+            self.first_messages = list(messages)
+        time.sleep(self.latency)
+        return self.responses.pop(0)
+
+
+class RecordingProvider(LLMProvider):
+    """Wraps a real provider and appends every response to a JSONL file for later replay."""
+
+    def __init__(self, inner: LLMProvider, path: str | Path):
+        self.inner = inner
+        self.path = Path(path)
+        self.message_format = inner.message_format
+
+    def convert_tools(self, tools):
+        return self.inner.convert_tools(tools)
+
+    def format_tool_results(self, tool_results):
+        return self.inner.format_tool_results(tool_results)
+
+    def create_message(self, system, messages, tools):
+        response = self.inner.create_message(system, messages, tools)
+        with self.path.open("a") as f:
+            f.write(json.dumps(response_to_dict(response)) + "\n")
+        return response
+
+
+class FakeDocker:
+    """The subset of docker.DockerClient the factory and GC use, with simulated latency.
+
+    images are tags (or `docker system df` image records) already on the daemon;
+    dangling holds {"labels", "size"} records for images.prune. Images named in
+    in_use_by_container can't be removed without force, like on a real daemon.
+    """
+
+    def __init__(self, images: Iterable[str | dict] = (), build_latency: float = 0.0, start_latency: float = 0.0,
+                 dangling: Iterable[dict] = (), in_use_by_container: Iterable[str] = ()):
+        self.build_latency = build_latency
+        self.start_latency = start_latency
+        self._images = {record["RepoTags"][0]: record for record in map(_image_record, images)}
+        self._containers: dict[str, SimpleNamespace] = {}
+        self.dangling = list(dangling)
+        self.in_use_by_container = set(in_use_by_container)
+        self.removed: list[str] = []  # image tags, in removal order
+        self.removed_containers: list[str] = []  # container names
+        self.run_kwargs: dict = {}  # of the last containers.run
+        self._lock = threading.Lock()
+        self.images = SimpleNamespace(build=self._build, get=self._get_image, remove=self._remove_image, prune=self._prune)
+        self.containers = SimpleNamespace(run=self._run, get=self._get_container, list=self._list_containers)
+
+    def _build(self, tag, **kwargs):
+        time.sleep(self.build_latency)
+        with self._lock:
+            self._images[tag] = _image_record(tag)
+
+    def _get_image(self, tag):
+        if tag not in self._images:
+            raise docker.errors.ImageNotFound(tag)
+
+    def _remove_image(self, tag, force=False):
+        if tag in self.in_use_by_container and not force:
+            raise docker.errors.APIError("conflict: image is being used by running container")
+        with self._lock:
+            self._images.pop(tag, None)
+            self.removed.append(tag)
+
+    def _prune(self, filters):
+        pruned = [image for image in self.dangling if _has_label(image["labels"], filters)]
+        self.dangling = [image for image in self.dangling if image not in pruned]
+        return {"SpaceReclaimed": sum(image["size"] for image in pruned)}
+
+    def _run(self, image, name, **kwargs):
+        self.run_kwargs = kwargs
+        created = datetime.now(timezone.utc).isoformat()
+        return self.add_container(name, "running", kwargs.get("labels") or {}, created)
+
+    def add_container(self, name: str, status: str = "exited", labels: dict | None = None, created: str = "") -> SimpleNamespace:
+        """Put a container on the daemon, e.g. a leftover from a crashed run."""
+        container_id = uuid.uuid4().hex
+        container = SimpleNamespace(id=container_id, name=name, status=status, labels=labels or {},
+                                    attrs={"Created": created}, stop=lambda timeout=10: None,
+                                    remove=lambda: self._remove_container(container_id))
+        with self._lock:
+            self._containers[container_id] = container
+        return container
+
+    def _remove_container(self, container_id):
+        with self._lock:
+            container = self._containers.pop(container_id, None)
+            if container is not None:
+                self.removed_containers.append(container.name)
+
+    def _get_container(self, container_id):
+        try:
+            return self._containers[container_id]
+        except KeyError:
+            raise docker.errors.NotFound(container_id) from None
+
+    def _list_containers(self, all=False, filters=None):
+        filters = filters or {}
+        statuses = filters.get("status", ["running"] if not all else [])
+        statuses = [statuses] if isinstance(statuses, str) else statuses
+        return [c for c in list(self._containers.values())
+                if _has_label(c.labels, filters) and (not statuses or c.status in statuses)]
+
+    def df(self):
+        return {"Images": list(self._images.values())}
+
+    def info(self):
+        return {"DockerRootDir": "/"}
+
+    @property
+    def running(self) -> int:
+        return len(self._containers)
+
+
+def _image_record(image: str | dict) -> dict:
+    if isinstance(image, dict):
+        return image
+    return {"RepoTags": [image], "Created": int(time.time()), "Size": 0, "SharedSize": 0}
+
+
+def _has_label(labels: dict, filters: dict) -> bool:
+    key, _, value = filters.get("label", "").partition("=")
+    return not key or labels.get(key) == value
+
+
+def make_spec(name: str = "skill", execute_code: str = "return {}", **fields) -> SkillSpec:
+    """A SkillSpec with defaults for everything a test doesn't care about."""
+    fields.setdefault("description", name)
+    return SkillSpec(name=name, execute_code=execute_code, **fields)
+
+
+def skill_transport(latency: float = 0.0, response: Callable[[httpx.Request], dict] | None = None) -> httpx.MockTransport:
+    """Answers every skill request (health and execute) after latency seconds."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        time.sleep(latency)
+        if request.url.path.endswith("/health"):
+            return httpx.Response(200, json={"status": "ok", "codecs": ["json"], "encodings": []})
+        body = response(request) if response else {"ok": True, "bytes": len(request.content)}
+        return httpx.Response(200, json=body)
+    return httpx.MockTransport(handler)
+
+
+@contextmanager
+def offline_backend(
+    workdir: Path,
+    provider_factory: Callable[[], LLMProvider],
+    hosts_count: int = 2,
+    build_latency: float = 0.0,
+    start_latency: float = 0.0,
+    skill_latency: float = 0.0,
+) -> Iterator[list[FakeDocker]]:
+    """Point the orchestrator at fake Docker hosts, a fake skill network and provider_factory().
+
+    provider_factory is called once per run_agent call, so sessions on different threads
+    can each replay their own script. Everything is restored on exit.
+    """
+    daemons = [FakeDocker([config.SKILL_BASE_IMAGE], build_latency, start_latency) for _ in range(hosts_count)]
+    pool = HostPool([
+        DockerHost(f"bench{i}", f"tcp://bench{i}.invalid:2375", HostBudget(10**7, 10**4), lambda url, d=daemon: d)
+        for i, daemon in enumerate(daemons)
+    ])
+
+    def healthy_after_start(port, timeout=config.SKILL_STARTUP_TIMEOUT, address="localhost"):
+        time.sleep(start_latency)
+        return {"status": "ok", "codecs": ["json"], "encodings": []}
+
+    patches = [
+        (agent, "get_provider", provider_factory),
+        (agent, "maybe_collect_garbage", lambda in_use: None),
+        (hosts, "_pool", pool),
+        (factory, "wait_for_healthy", healthy_after_start),
+        (factory, "BUILDS_DIR", workdir / "builds"),
+        (skill_client, "_client", httpx.Client(transport=skill_transport(skill_latency))),
+        (config, "SHARED_FILES_DIR", str(workdir / "shared_files")),
+        (config, "ARTIFACTS_DIR", str(workdir / "artifacts")),
+        (config, "TRACE_FILE", ""),
+        (config, "SPECULATIVE_CANDIDATES", 1),
+    ]
+    saved = [(target, name, getattr(target, name)) for target, name, _ in patches]
+    quiet = agent.console.quiet
+    for target, name, value in patches:
+        setattr(target, name, value)
+    agent.console.quiet = True
+    try:
+        yield daemons
+    finally:
+        for target, name, value in saved:
+            setattr(target, name, value)
+        agent.console.quiet = quiet
@@ -0,0 +1,212 @@
+"""Drive run_agent, SkillRegistry and the factory under concurrent sessions and measure them.
+
+A run has two phases, both through run_agent with scripted model turns:
+
+1. deploy — M sessions each create one skill, concurrently (placement, rendering,
+   fake build/start, registry).
+2. sessions — N sessions run at once; each lists skills, calls calls_per_session
+   skills one turn at a time, runs a two-step pipeline and finishes.
+
+Latencies are wall-clock. "overhead" subtracts the simulated LLM and skill latency a
+session must wait for, leaving the time spent in Helix itself. Peak memory comes
+from a second run under tracemalloc, which is not timed.
+"""
+
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from bench.fakes import ScriptedProvider, offline_backend
+from models.skill import SkillSpec
+from orchestrator.agent import run_agent
+from orchestrator.providers import AgentResponse, ToolCall, Usage
+from orchestrator.registry import SkillRegistry
+from skill_factory.factory import render_skill
+
+SKILL_CODE = 'return {"echo": body, "n": len(str(body))}'
+
+
+@dataclass
+class BenchConfig:
+    sessions: int = 16
+    skills: int = 8
+    calls_per_session: int = 4
+    hosts: int = 2
+    llm_latency: float = 0.02  # seconds per model turn
+    build_latency: float = 0.05
+    start_latency: float = 0.02
+    skill_latency: float = 0.005  # seconds per skill HTTP call
+
+
+def percentiles(values: list[float]) -> dict:
+    """p50/p90/p95/p99/max in milliseconds (nearest rank)."""
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def rank(p: float) -> float:
+        return ordered[min(len(ordered) - 1, max(0, round(p * len(ordered)) - 1))]
+
+    return {
+        "p50_ms": round(rank(0.50) * 1000, 2),
+        "p90_ms": round(rank(0.90) * 1000, 2),
+        "p95_ms": round(rank(0.95) * 1000, 2),
+        "p99_ms": round(rank(0.99) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+def _turn(*calls: tuple[str, dict]) -> AgentResponse:
+    tool_calls = [ToolCall(id=f"t{i}", name=name, input=args) for i, (name, args) in enumerate(calls)]
+    return AgentResponse(tool_calls=tool_calls, raw_message={"role": "assistant", "content": "..."},
+                         usage=Usage(input_tokens=200, output_tokens=40, cache_read_tokens=3000), model="scripted")
+
+
+def _final(text: str) -> AgentResponse:
+    return AgentResponse(text_parts=[text], is_done=True, raw_message={"role": "assistant", "content": text},
+                         usage=Usage(input_tokens=200, output_tokens=20, cache_read_tokens=3000), model="scripted")
+
+
+def deploy_script(name: str) -> list[AgentResponse]:
+    return [
+        _turn(("create_new_skill", {"name": name, "description": f"bench skill {name}", "execute_code": SKILL_CODE})),
+        _final(f"created {name}"),
+    ]
+
+
+def session_script(index: int, skill_names: list[str], calls: int) -> list[AgentResponse]:
+    script = [_turn(("list_available_skills", {}))]
+    for k in range(calls):
+        name = skill_names[(index + k) % len(skill_names)]
+        script.append(_turn(("call_skill", {"skill_name": name, "payload": {"session": index, "call": k}})))
+    if len(skill_names) >= 2:
+        first, second = skill_names[index % len(skill_names)], skill_names[(index + 1) % len(skill_names)]
+        script.append(_turn(("run_pipeline", {
+            "steps": [
+                {"id": "a", "skill": first, "payload": {"x": index}},
+                {"id": "b", "skill": second, "inputs": {"prev": "a.n"}},
+            ],
+        })))
+    script.append(_final("done"))
+    return script
+
+
+def _timed_runs(scripts: list[list[AgentResponse]], registry: SkillRegistry, local: threading.local) -> tuple[list[float], float, list[str]]:
+    """Run each script as its own run_agent session, all at once. Returns (latencies, wall seconds, errors)."""
+    errors: list[str] = []
+
+    def session(script: list[AgentResponse]) -> float:
+        local.script = script
+        started = time.perf_counter()
+        try:
+            run_agent("benchmark", registry)
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, len(scripts))) as pool:
+        latencies = list(pool.map(session, scripts))
+    return latencies, time.perf_counter() - started, errors
+
+
+def _run_phases(cfg: BenchConfig) -> dict:
+    """Deploy the skills, then run the sessions, each phase through run_agent under the offline backend."""
+    local = threading.local()
+
+    def provider_factory():
+        return ScriptedProvider(local.script, latency=cfg.llm_latency)
+
+    registry = SkillRegistry()
+    names = [f"bench-skill-{i}" for i in range(cfg.skills)]
+    with tempfile.TemporaryDirectory(prefix="helix-bench-") as workdir, \
+            offline_backend(Path(workdir), provider_factory, cfg.hosts, cfg.build_latency,
+                            cfg.start_latency, cfg.skill_latency) as daemons:
+        deploy = _timed_runs([deploy_script(name) for name in names], registry, local)
+        scripts = [session_script(i, names, cfg.calls_per_session) for i in range(cfg.sessions)]
+        sessions = _timed_runs(scripts, registry, local)
+        containers = sum(d.running for d in daemons)
+    return {"deploy": deploy, "sessions": sessions, "containers": containers}
+
+
+def _peak_memory(cfg: BenchConfig) -> int:
+    """Peak traced bytes over a second, untimed run (tracing slows everything it measures)."""
+    tracemalloc.start()
+    try:
+        _run_phases(cfg)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmark(cfg: BenchConfig) -> dict:
+    """Run both phases under the offline backend and return the measurements."""
+    render_skill(SkillSpec(name="warmup", description="", execute_code=SKILL_CODE))  # compile templates untimed
+    timed = _run_phases(cfg)
+    deploy_latencies, deploy_wall, deploy_errors = timed["deploy"]
+    session_latencies, session_wall, session_errors = timed["sessions"]
+    containers = timed["containers"]
+    peak = _peak_memory(cfg)
+
+    pipeline_calls = 2 if cfg.skills >= 2 else 0
+    skill_calls = cfg.sessions * (cfg.calls_per_session + pipeline_calls)
+    turns = cfg.calls_per_session + (1 if pipeline_calls else 0) + 2
+    waited = turns * cfg.llm_latency + (cfg.calls_per_session + pipeline_calls) * cfg.skill_latency
+    return {
+        "config": asdict(cfg),
+        "deploy": {
+            "skills": cfg.skills,
+            "containers": containers,
+            "wall_s": round(deploy_wall, 3),
+            "latency": percentiles(deploy_latencies),
+            "errors": deploy_errors,
+        },
+        "sessions": {
+            "count": cfg.sessions,
+            "wall_s": round(session_wall, 3),
+            "sessions_per_s": round(cfg.sessions / session_wall, 2),
+            "skill_calls_per_s": round(skill_calls / session_wall, 2),
+            "latency": percentiles(session_latencies),
+            "overhead": percentiles([max(0.0, t - waited) for t in session_latencies]),
+            "errors": session_errors,
+        },
+        "memory": {"peak_mb": round(peak / 1e6, 2)},
+    }
+
+
+# (section, key, metric, higher_is_better)
+_TRACKED = [
+    ("deploy", "latency", "p50_ms", False),
+    ("deploy", "latency", "p95_ms", False),
+    ("sessions", "latency", "p50_ms", False),
+    ("sessions", "latency", "p95_ms", False),
+    ("sessions", "overhead", "p50_ms", False),
+    ("sessions", "overhead", "p95_ms", False),
+    ("sessions", None, "sessions_per_s", True),
+    ("memory", None, "peak_mb", False),
+]
+
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.3, noise_ms: float = 5.0) -> list[str]:
+    """Metrics that got worse than the baseline by more than tolerance. Empty if none did.
+
+    Millisecond metrics within noise_ms of the baseline never count as regressions.
+    """
+    regressions = []
+    for section, key, metric, higher_is_better in _TRACKED:
+        try:
+            now = results[section][key][metric] if key else results[section][metric]
+            then = baseline[section][key][metric] if key else baseline[section][metric]
+        except KeyError:
+            continue
+        if metric.endswith("_ms") and abs(now - then) <= noise_ms:
+            continue
+        worse = now < then * (1 - tolerance) if higher_is_better else now > then * (1 + tolerance)
+        if worse:
+            label = ".".join(p for p in (section, key, metric) if p)
+            regressions.append(f"{label}: {then} -> {now}")
+    return regressions
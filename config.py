@@ -6,25 +6,129 @@ LLM_PROVIDER = os.environ.get("LLM_PROVIDER", "anthropic")
 # Anthropic
 ANTHROPIC_API_KEY = os.environ.get("ANTHROPIC_API_KEY", "")
 ANTHROPIC_MODEL = "claude-sonnet-4-5-20250929"
+# Cache breakpoints on the system prompt, tool schemas and conversation prefix
+ANTHROPIC_PROMPT_CACHING = os.environ.get("ANTHROPIC_PROMPT_CACHING", "1") != "0"
 
 # Cerebras (OpenAI-compatible)
 CEREBRAS_API_KEY = os.environ.get("CEREBRAS_API_KEY", "")
 CEREBRAS_MODEL = os.environ.get("CEREBRAS_MODEL", "zai-glm-4.7")
 CEREBRAS_BASE_URL = "https://api.cerebras.ai/v1"
 
+# Hybrid routing — a fast model for routing/call turns, a strong model for code generation.
+# Providers are "name" or "name:model", e.g. "anthropic:claude-haiku-4-5".
+LLM_ROUTING = os.environ.get("LLM_ROUTING", "single")  # "single" (LLM_PROVIDER only) or "hybrid"
+LLM_FAST_PROVIDER = os.environ.get("LLM_FAST_PROVIDER", "cerebras")
+LLM_STRONG_PROVIDER = os.environ.get("LLM_STRONG_PROVIDER", "anthropic")
+
 # Shared
-TELEGRAM_BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN", "")
 MAX_TOKENS = 4096
+CONTEXT_BUDGET_TOKENS = 60000  # compact old tool results once the conversation exceeds this
+TOOL_RESULT_MAX_TOKENS = 4000  # larger tool results are clipped to a preview + retrievable handle
+CONTEXT_KEEP_RECENT_MESSAGES = 4  # never compact the newest messages
+STREAM_RESPONSES = os.environ.get("STREAM_RESPONSES", "1") != "0"  # stream text, dispatch tools early
+
+# Telegram gateway — bounded agent runs across chats, one at a time within a chat
+TELEGRAM_BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN", "")
+TELEGRAM_MAX_CONCURRENT = int(os.environ.get("TELEGRAM_MAX_CONCURRENT", "4"))  # agent runs at once, all chats
+TELEGRAM_MAX_QUEUE_PER_CHAT = 3  # messages waiting behind a chat's current one before "busy"
+TELEGRAM_MAX_PENDING = 50  # messages waiting across all chats before "busy"
+TELEGRAM_DEDUPE_WINDOW = 30  # seconds a redelivered update (same update_id) is ignored
+TELEGRAM_HISTORY_TURNS = 6  # earlier exchanges per chat sent back to the model...
+TELEGRAM_HISTORY_MAX_TOKENS = CONTEXT_BUDGET_TOKENS // 4  # ...within this much of the context budget
+TELEGRAM_HISTORY_IDLE_TTL = 6 * 3600  # seconds before a quiet chat's history is forgotten
+# Webhook mode when set (e.g. https://bot.example.com/telegram); long polling otherwise
+TELEGRAM_WEBHOOK_URL = os.environ.get("TELEGRAM_WEBHOOK_URL", "")
+TELEGRAM_WEBHOOK_LISTEN = os.environ.get("TELEGRAM_WEBHOOK_LISTEN", "0.0.0.0")
+TELEGRAM_WEBHOOK_PORT = int(os.environ.get("TELEGRAM_WEBHOOK_PORT", "8443"))
+TELEGRAM_WEBHOOK_SECRET = os.environ.get("TELEGRAM_WEBHOOK_SECRET", "")
+
+# HTTP API (python -m integrations.api_server) — jobs run on a shared worker pool
+API_HOST = os.environ.get("HELIX_API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("HELIX_API_PORT", "8080"))
+API_TOKEN = os.environ.get("HELIX_API_TOKEN", "")  # required as "Authorization: Bearer <token>" when set
+API_WORKERS = int(os.environ.get("HELIX_API_WORKERS", "4"))  # jobs running at once
+API_MAX_QUEUED = 200  # jobs waiting before submissions get 429
+API_JOB_RETENTION = 1000  # finished jobs kept for GET /v1/jobs/<id>...
+API_JOB_TTL = 3600  # ...for at most this many seconds after they finish
+API_JOB_MAX_EVENTS = 500  # newest events kept per job for /events; older text deltas are dropped
+API_MAX_BODY_BYTES = 10 * 1024 * 1024
 
 # Docker
-DOCKER_NETWORK = "agent-net"
+# Daemons skills are placed on: comma-separated "url" or "name=url" ("local", unix:// or tcp://).
+# Remote hosts must see SHARED_FILES_DIR and ARTIFACTS_DIR at the same paths (e.g. an NFS mount).
+DOCKER_HOSTS = os.environ.get("HELIX_DOCKER_HOSTS", "local")
+DOCKER_NETWORK = "agent-net"  # must exist on every host
+DOCKER_HOST_RETRY_MIN = 5  # seconds an unreachable host is skipped after its first failure
+DOCKER_HOST_RETRY_MAX = 300  # ...doubling per consecutive failure, up to this
 SKILL_BASE_IMAGE = "python:3.12-slim"
 CONTAINER_TIMEOUT = 60  # seconds — kill builds/runs that exceed this
 SKILL_STARTUP_TIMEOUT = 15  # seconds — max wait for /health to respond
+SKILL_WARMUP_TIMEOUT = 30  # extra seconds allowed when a skill warms dependencies/sample payloads
+# "slim": multi-stage build with a precompiled venv; "standard": single-stage pip install
+SKILL_IMAGE_PROFILE = os.environ.get("SKILL_IMAGE_PROFILE", "slim")
+
+# Resource classes — per-container limits, picked by SkillSpec.resource_class or inferred from dependencies
+RESOURCE_CLASSES = {
+    "small": {"memory_mb": 256, "cpus": 0.5, "pids": 128},
+    "medium": {"memory_mb": 768, "cpus": 1.0, "pids": 256},
+    "large": {"memory_mb": 2048, "cpus": 2.0, "pids": 512},
+}
+# Capacity of each Docker host for skill containers; deploys past it wait, then fail
+HOST_MEMORY_BUDGET_MB = int(os.environ.get("HOST_MEMORY_BUDGET_MB", "8192"))
+HOST_CPU_BUDGET = float(os.environ.get("HOST_CPU_BUDGET", str(os.cpu_count() or 2)))
+PLACEMENT_QUEUE_TIMEOUT = 60  # seconds a deploy waits for capacity before it is refused
+
+# Packing — small, non-interactive skills with compatible dependencies share one host container
+SKILL_PACKING = os.environ.get("SKILL_PACKING", "0") == "1"
+PACK_MAX_SKILLS = 8  # skills per shared host container
+PACK_RESOURCE_CLASS = "medium"  # limits for a shared host container
+
+# Shared input files — @path references are mounted read-only into every skill container
+SHARED_FILES_DIR = os.environ.get(
+    "SHARED_FILES_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "shared_files")
+)
+SKILL_FILES_MOUNT = "/data"
+FILE_PREVIEW_BYTES = 600  # how much of a shared file the model sees
+
+# Artifact store — binary skill outputs, deduplicated by sha256, LRU-evicted above the cap
+ARTIFACTS_DIR = os.environ.get(
+    "ARTIFACTS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "artifacts")
+)
+SKILL_ARTIFACTS_MOUNT = "/artifacts"
+ARTIFACT_STORE_MAX_BYTES = int(os.environ.get("ARTIFACT_STORE_MAX_BYTES", str(512 * 1024 * 1024)))
+ARTIFACT_INLINE_MIN_BYTES = 1024  # shorter strings are never treated as inline binaries
+
+# Skill transport — msgpack bodies and zstd/gzip compression when both sides support them
+TRANSPORT_COMPRESS_MIN_BYTES = 16 * 1024  # smaller bodies are sent uncompressed
+
+# Garbage collection of unreferenced skill images and build dirs (runs before builds)
+GC_DISK_BUDGET_BYTES = int(os.environ.get("GC_DISK_BUDGET_BYTES", str(5 * 1024**3)))  # Helix-owned images + build dirs
+GC_MIN_FREE_BYTES = int(os.environ.get("GC_MIN_FREE_BYTES", str(2 * 1024**3)))  # keep this much free on Docker's disk
+GC_INTERVAL = 300  # seconds between collections
+GC_GRACE_PERIOD = 600  # seconds — never collect images, containers or build dirs younger than this
+
+# Telemetry — Prometheus /metrics on localhost (0 disables) and a JSONL span log ("" disables)
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "9464"))
+TRACE_FILE = os.environ.get(
+    "TRACE_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "traces", "helix.jsonl")
+)
+TRACE_FILE_MAX_BYTES = 50 * 1024 * 1024  # rotated to TRACE_FILE.1 past this size
+
+# Load testing (bench <skill> / benchmark_skill) — concurrency doubles from 1 up to the max
+BENCH_MAX_CONCURRENCY = 16
+BENCH_CONCURRENCY_LIMIT = 64  # hard cap on what a caller may ask for
+BENCH_REQUESTS_PER_LEVEL = 100
+BENCH_MAX_ERROR_RATE = 0.2  # stop raising concurrency once this share of calls fail
 
 # Port allocation
 PORT_RANGE_START = 9001
 PORT_RANGE_END = 9100
 
+# Pipelines
+PIPELINE_MAX_PARALLEL = 4  # concurrent skill calls within one run_pipeline
+
 # Skill Factory
 MAX_BUILD_RETRIES = 3  # feed errors back to Claude and retry
+SKILL_DRAIN_TIMEOUT = 30  # seconds an old version may finish in-flight calls after update_skill
+# >1 builds this many candidate implementations in parallel and keeps the first that passes
+SPECULATIVE_CANDIDATES = int(os.environ.get("SPECULATIVE_CANDIDATES", "1"))
@@ -1,5 +1,9 @@
+import os
 import sys
 from pathlib import Path
 
+# Tests record spans in memory only; no trace file
+os.environ.setdefault("TRACE_FILE", "")
+
 # Ensure project root is on sys.path so tests can import modules directly
 sys.path.insert(0, str(Path(__file__).parent))
@@ -0,0 +1,137 @@
+"""
+Test the agent loop against a scripted provider — no API or Docker needed.
+"""
+
+import json
+import threading
+
+import pytest
+
+from bench.fakes import ScriptedProvider, make_spec
+from models.skill import Skill, SkillStatus
+from orchestrator import agent
+from orchestrator.providers import AgentResponse, ToolCall
+from orchestrator.registry import SkillRegistry
+
+
+@pytest.fixture
+def scripted(monkeypatch):
+    def install(responses):
+        provider = ScriptedProvider(responses)
+        monkeypatch.setattr(agent, "get_provider", lambda: provider)
+        return provider
+    return install
+
+
+def _tool_turn(*names):
+    calls = [ToolCall(id=f"t{i}", name=name, input={}) for i, name in enumerate(names)]
+    return AgentResponse(tool_calls=calls, raw_message={"role": "assistant", "content": ""})
+
+
+def _final_turn(text):
+    return AgentResponse(text_parts=[text], is_done=True, raw_message={"role": "assistant", "content": text})
+
+
+class TestStreaming:
+    def test_text_is_streamed_and_returned(self, scripted):
+        scripted([_tool_turn("list_available_skills"), _final_turn("done")])
+        chunks = []
+        result = agent.run_agent("hi", SkillRegistry(), on_text=chunks.append)
+        assert result == "done"
+        assert "".join(chunks) == "done\n"
+
+    def test_tool_results_keep_call_order(self, scripted):
+        provider = scripted([_tool_turn("list_available_skills", "nope"), _final_turn("ok")])
+        agent.run_agent("hi", SkillRegistry())
+        (results,) = provider.sent_results
+        assert [r["id"] for r in results] == ["t0", "t1"]
+        assert results[0]["content"] == "No skills registered yet."
+        assert "Unknown tool" in results[1]["content"]
+
+    def test_blocking_mode_still_dispatches(self, scripted, monkeypatch):
+        monkeypatch.setattr(agent.config, "STREAM_RESPONSES", False)
+        scripted([_tool_turn("list_available_skills"), _final_turn("ok")])
+        assert agent.run_agent("hi", SkillRegistry()) == "ok"
+
+
+    def test_history_precedes_the_new_message(self, scripted):
+        provider = scripted([_final_turn("ok")])
+        history = [{"role": "user", "content": "earlier"}, {"role": "assistant", "content": "reply"}]
+        agent.run_agent("now", SkillRegistry(), history=history)
+        assert provider.first_messages == history + [{"role": "user", "content": "now"}]
+
+
+class TestUpdateSkill:
+    def test_update_swaps_and_retires_old_version(self, monkeypatch):
+        built, removed = [], []
+
+        def build_verified(spec, instance=None, smoke_payload=None):
+            built.append(instance)
+            return Skill(name=spec.name, description=spec.description, endpoint="new", port=9002,
+                         container_id=instance, status=SkillStatus.RUNNING)
+
+        monkeypatch.setattr(agent, "build_verified", build_verified)
+        monkeypatch.setattr(agent, "remove_skill", removed.append)
+        registry = SkillRegistry()
+        old = Skill(name="math", description="adds", endpoint="old", port=9001, container_id="v1")
+        registry.register(old)
+
+        result = json.loads(agent.handle_update_skill(registry, name="math", execute_code="return {}"))
+        assert result["status"] == "updated"
+        assert result["version"] == 2
+        assert built == ["v2"]
+        assert registry.lookup("math").description == "adds"
+
+        for thread in threading.enumerate():
+            if thread.name == "retire-math":
+                thread.join()
+        assert removed == [old]
+
+    def test_code_only_update_keeps_the_rest_of_the_spec(self, monkeypatch):
+        built = []
+
+        def build_verified(spec, instance=None, smoke_payload=None):
+            built.append(spec)
+            return Skill(name=spec.name, description=spec.description, endpoint="new", port=9002,
+                         container_id=instance, status=SkillStatus.RUNNING, spec=spec)
+
+        monkeypatch.setattr(agent, "build_verified", build_verified)
+        monkeypatch.setattr(agent, "remove_skill", lambda skill: None)
+        registry = SkillRegistry()
+        spec = make_spec("plot", "return {}", dependencies=["matplotlib"], view_post_code="return HTMLResponse('x')",
+                         resource_class="large")
+        registry.register(Skill(name="plot", description="plot", endpoint="old", port=9001, container_id="v1", spec=spec))
+
+        agent.handle_update_skill(registry, name="plot", execute_code="return {'v': 2}")
+        assert built[0] == spec.model_copy(update={"execute_code": "return {'v': 2}"})
+        assert registry.lookup("plot").spec.dependencies == ["matplotlib"]
+
+    def test_update_unknown_skill(self):
+        result = json.loads(agent.handle_update_skill(SkillRegistry(), name="nope", execute_code=""))
+        assert "not found" in result["error"]
+
+
+class TestTracing:
+    def test_turn_spans_and_token_counters(self, scripted, tmp_path, monkeypatch):
+        from orchestrator.providers import Usage
+        import telemetry
+
+        trace_file = tmp_path / "traces.jsonl"
+        monkeypatch.setattr(telemetry.config, "TRACE_FILE", str(trace_file))
+        telemetry.reset()
+        tool_turn = _tool_turn("list_available_skills")
+        tool_turn.usage = Usage(input_tokens=100, output_tokens=20, cache_read_tokens=900)
+        tool_turn.model = "m1"
+        scripted([tool_turn, _final_turn("ok")])
+        agent.run_agent("hi", SkillRegistry())
+        telemetry.flush_traces()
+
+        spans = {}
+        for record in map(json.loads, trace_file.read_text().splitlines()):
+            spans.setdefault(record["name"], record)  # first turn's spans
+        assert {"agent.run", "agent.turn", "llm.call", "tool.list_available_skills"} <= set(spans)
+        assert len({r["trace_id"] for r in spans.values()}) == 1
+        assert spans["tool.list_available_skills"]["parent_id"] == spans["agent.turn"]["span_id"]
+        metrics = telemetry.render_prometheus()
+        assert 'helix_llm_tokens_total{kind="cache_read",model="m1"} 900' in metrics
+        telemetry.reset()
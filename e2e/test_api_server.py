@@ -0,0 +1,116 @@
+"""
+Test the HTTP API against a fake agent and fake skills on a real local socket — no API or Docker needed.
+"""
+
+import json
+import socket
+import threading
+
+import httpx
+import pytest
+
+from integrations import api_server
+from integrations.api_server import ApiServer, JobQueue
+from models.skill import Skill, SkillStatus
+from orchestrator.registry import SkillRegistry
+
+
+def fake_run_agent(task, registry, on_text=None, **kwargs):
+    if task == "explode":
+        raise RuntimeError("model unavailable")
+    for word in task.split():
+        on_text(word + " ")
+    return f"did: {task}"
+
+
+def fake_post_execute(skill, payload, binary=False):
+    return httpx.Response(200, json={"skill": skill.name, "echo": payload})
+
+
+@pytest.fixture
+def api(monkeypatch):
+    monkeypatch.setattr(api_server, "run_agent", fake_run_agent)
+    monkeypatch.setattr(api_server, "post_execute", fake_post_execute)
+    registry = SkillRegistry()
+    registry.register(Skill(name="echo", description="echo", endpoint="http://echo/execute", port=0,
+                            status=SkillStatus.RUNNING))
+    server = ApiServer(("127.0.0.1", 0), registry, JobQueue(registry, workers=2, max_queued=5), token="secret")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    with httpx.Client(base_url=f"http://{host}:{port}", headers={"Authorization": "Bearer secret"}, timeout=5) as client:
+        yield client, server
+    api_server.shutdown_api(server)
+
+
+def _wait(client, job_id) -> dict:
+    # the event stream ends once the job finishes
+    client.get(f"/v1/jobs/{job_id}/events")
+    return client.get(f"/v1/jobs/{job_id}").json()
+
+
+class TestJobs:
+    def test_task_runs_and_streams_progress(self, api):
+        client, _ = api
+        resp = client.post("/v1/tasks", json={"task": "make a chart"})
+        assert resp.status_code == 202
+        job_id = resp.json()["job_id"]
+
+        events = client.get(f"/v1/jobs/{job_id}/events").text
+        assert "event: text" in events and '"delta": "chart "' in events
+        assert events.rstrip().endswith('data: {"status": "done"}')
+        job = client.get(f"/v1/jobs/{job_id}").json()
+        assert (job["status"], job["result"]) == ("done", "did: make a chart")
+
+    def test_failed_task(self, api):
+        client, _ = api
+        job = _wait(client, client.post("/v1/tasks", json={"task": "explode"}).json()["job_id"])
+        assert (job["status"], job["error"]) == ("failed", "model unavailable")
+
+    def test_batch_mixes_tasks_and_skill_calls(self, api):
+        client, _ = api
+        lines = [{"task": "one"}, {"skill": "echo", "payload": {"x": 1}}, {"skill": "missing"}]
+        resp = client.post("/v1/batch", content="\n".join(json.dumps(line) for line in lines))
+        jobs = [_wait(client, job_id) for job_id in resp.json()["job_ids"]]
+        assert jobs[0]["result"] == "did: one"
+        assert jobs[1]["result"] == {"skill": "echo", "echo": {"x": 1}}
+        assert "not found" in jobs[2]["error"]
+
+    def test_validation_backpressure_and_auth(self, api):
+        client, server = api
+        assert client.post("/v1/tasks", json={"nope": 1}).status_code == 400
+        assert client.post("/v1/batch", content='{"task": "a"}\nnot json').json()["error"].startswith("Line 2")
+        assert client.post("/v1/batch", content="\n".join(['{"task": "t"}'] * 6)).status_code == 429
+        base = str(client.base_url).rstrip("/")
+        assert httpx.get(f"{base}/v1/skills").status_code == 401
+        assert httpx.get(f"{base}/v1/skills", headers={"Authorization": "Bearer secreT"}).status_code == 401
+        assert httpx.get(f"{base}/health").status_code == 200
+        assert client.get("/v1/jobs/unknown").status_code == 404
+
+    def test_negative_content_length_rejected(self, api):
+        _, server = api
+        with socket.create_connection(server.server_address[:2], timeout=5) as sock:
+            sock.sendall(b"POST /v1/tasks HTTP/1.1\r\nHost: x\r\nAuthorization: Bearer secret\r\n"
+                         b"Content-Length: -1\r\n\r\n")
+            assert sock.recv(1024).startswith(b"HTTP/1.0 400")
+
+
+    def test_event_log_is_capped_and_finished_jobs_expire(self, api, monkeypatch):
+        client, server = api
+        monkeypatch.setattr(api_server.config, "API_JOB_MAX_EVENTS", 5)
+        job_id = client.post("/v1/tasks", json={"task": " ".join(f"w{i}" for i in range(50))}).json()["job_id"]
+        events = client.get(f"/v1/jobs/{job_id}/events").text
+        assert '"delta": "w0 "' not in events and '"delta": "w49 "' in events
+        assert '"text": "did: w0 w1' in events  # the final result still reaches late readers
+        assert len(server.jobs.get(job_id).events) == 5
+
+        server.jobs.ttl = 0
+        _wait(client, client.post("/v1/tasks", json={"task": "next"}).json()["job_id"])
+        assert client.get(f"/v1/jobs/{job_id}").status_code == 404
+
+
+class TestDirectSkills:
+    def test_list_and_execute(self, api):
+        client, _ = api
+        assert [s["name"] for s in client.get("/v1/skills").json()] == ["echo"]
+        assert client.post("/v1/skills/echo/execute", json={"a": 2}).json() == {"skill": "echo", "echo": {"a": 2}}
+        assert client.post("/v1/skills/missing/execute", json={}).status_code == 404
@@ -0,0 +1,70 @@
+"""
+Test the artifact store: dedupe, LRU eviction and pulling binaries out of skill results.
+"""
+
+import base64
+import hashlib
+import json
+
+import pytest
+
+from orchestrator import agent
+from orchestrator.artifacts import ArtifactStore
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 2000
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ArtifactStore(tmp_path / "artifacts", max_bytes=10_000)
+    monkeypatch.setattr(agent, "get_artifact_store", lambda: store)
+    return store
+
+
+class TestArtifactStore:
+    def test_put_dedupes_by_content(self, store):
+        a = store.put(PNG)
+        b = store.put(PNG)
+        assert a.digest == b.digest == hashlib.sha256(PNG).hexdigest()
+        assert a.mime == "image/png"
+        assert len(list(store.root.iterdir())) == 1
+
+    def test_lru_eviction_under_cap(self, store):
+        first = store.put(b"a" * 4000)
+        second = store.put(b"b" * 4000)
+        store.get(first.digest)  # first is now most recently used
+        store.put(b"c" * 4000)
+        assert store.get(second.digest) is None
+        assert not second.path.exists()
+        assert store.get(first.digest) is not None
+
+    def test_picks_up_blobs_written_by_skills(self, store):
+        digest = hashlib.sha256(PNG).hexdigest()
+        (store.root / digest).write_bytes(PNG)
+        assert store.get(digest).size == len(PNG)
+        assert store.get("../../etc/passwd") is None
+
+
+class TestOffload:
+    def test_base64_field_becomes_ref(self, store):
+        sink = []
+        result = json.dumps({"qr": base64.b64encode(PNG).decode(), "text": "hi"})
+        cleaned = json.loads(agent._offload_artifacts(result, sink))
+        assert cleaned == {"qr": {"artifact": sink[0].digest, "mime": "image/png", "size": len(PNG)}, "text": "hi"}
+
+    def test_data_uri_in_html(self, store):
+        sink = []
+        html = f'<img src="data:image/png;base64,{base64.b64encode(PNG).decode()}">'
+        cleaned = agent._offload_artifacts(html, sink)
+        assert cleaned == f'<img src="artifact:{sink[0].digest}">'
+
+    def test_skill_saved_ref_is_resolved(self, store):
+        digest = hashlib.sha256(b"%PDF-1.4 ...").hexdigest()
+        (store.root / digest).write_bytes(b"%PDF-1.4 ...")
+        sink = []
+        agent._offload_artifacts(json.dumps({"report": {"artifact": digest, "mime": "application/pdf"}}), sink)
+        assert sink[0].path == store.root / digest
+
+    def test_plain_results_untouched(self, store):
+        text = '{"a":  1}'
+        assert agent._offload_artifacts(text, []) == text
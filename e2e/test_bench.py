@@ -0,0 +1,41 @@
+"""
+Smoke-test the offline benchmark harness — scripted LLM, fake Docker, no network.
+"""
+
+from bench.fakes import RecordingProvider, ScriptedProvider
+from bench.harness import BenchConfig, compare, percentiles, run_benchmark
+from orchestrator.providers import AgentResponse, ToolCall, Usage
+
+
+class TestHarness:
+    def test_small_run_completes_cleanly(self):
+        cfg = BenchConfig(sessions=3, skills=2, calls_per_session=2, llm_latency=0, build_latency=0,
+                          start_latency=0, skill_latency=0)
+        results = run_benchmark(cfg)
+        assert results["deploy"]["errors"] == results["sessions"]["errors"] == []
+        assert results["deploy"]["containers"] == 2
+        assert results["sessions"]["latency"]["p50_ms"] > 0
+        assert results["memory"]["peak_mb"] > 0
+
+    def test_compare_flags_only_real_regressions(self):
+        baseline = {"sessions": {"latency": {"p50_ms": 100.0}, "sessions_per_s": 50.0}}
+        assert compare({"sessions": {"latency": {"p50_ms": 104.0}, "sessions_per_s": 48.0}}, baseline) == []
+        regressions = compare({"sessions": {"latency": {"p50_ms": 200.0}, "sessions_per_s": 20.0}}, baseline)
+        assert regressions == ["sessions.latency.p50_ms: 100.0 -> 200.0", "sessions.sessions_per_s: 50.0 -> 20.0"]
+
+    def test_percentiles(self):
+        assert percentiles([i / 1000 for i in range(1, 101)])["p95_ms"] == 95.0
+
+
+class TestRecordReplay:
+    def test_recorded_responses_replay(self, tmp_path):
+        recorded = AgentResponse(tool_calls=[ToolCall(id="t0", name="list_available_skills", input={})],
+                                 usage=Usage(input_tokens=5, cache_read_tokens=50), model="m")
+        path = tmp_path / "session.jsonl"
+        recorder = RecordingProvider(ScriptedProvider([recorded]), path)
+        recorder.create_message("system", [], [])
+
+        replayed = ScriptedProvider.from_file(path).create_message("system", [], [])
+        assert replayed.tool_calls == recorded.tool_calls
+        assert replayed.usage == recorded.usage
+        assert replayed.model == "m"
@@ -0,0 +1,76 @@
+"""
+Test the context budget: clipping oversized tool results and compacting history.
+"""
+
+import json
+
+from orchestrator.context import ContextBudget, describe_shape
+
+
+def _tool_exchange(i: int, result: str) -> list[dict]:
+    return [
+        {"role": "assistant", "content": [{"type": "tool_use", "id": f"t{i}", "name": "call_skill", "input": {}}]},
+        {"role": "user", "content": [{"type": "tool_result", "tool_use_id": f"t{i}", "content": result}]},
+    ]
+
+
+class TestClipping:
+    def test_small_result_untouched(self):
+        budget = ContextBudget(max_result_tokens=100)
+        assert budget.clip_result("short") == "short"
+
+    def test_large_result_clipped_and_fetchable(self):
+        budget = ContextBudget(max_result_tokens=1000)
+        rows = [{"id": i, "name": f"row {i}"} for i in range(2000)]
+        result = json.dumps({"rows": rows})
+
+        clipped = budget.clip_result(result)
+        assert len(clipped) < len(result)
+        assert 'handle "result-1"' in clipped
+        assert "rows: list[2000] of {id: int, name: str}" in clipped
+        assert budget.fetch("result-1", offset=0, length=20) == result[:20]
+        assert budget.fetch("missing") is None
+
+    def test_describe_shape_limits_depth(self):
+        assert describe_shape({"a": {"b": {"c": {"d": 1}}}}) == "{a: {b: {c: dict[1]}}}"
+
+
+class TestCompaction:
+    def test_under_budget_is_noop(self):
+        budget = ContextBudget(budget_tokens=10_000)
+        messages = [{"role": "user", "content": "hi"}, *_tool_exchange(1, "x" * 400)]
+        assert budget.compact(messages) == 0
+
+    def test_old_results_stubbed_recent_kept(self):
+        budget = ContextBudget(budget_tokens=1000, keep_recent=2)
+        messages = [{"role": "user", "content": "hi"}]
+        for i in range(5):
+            messages.extend(_tool_exchange(i, "x" * 2000))
+
+        freed = budget.compact(messages)
+        assert freed > 0
+        assert budget.total_tokens(messages) <= 1000
+        assert messages[2]["content"][0]["content"].startswith("[compacted")
+        assert messages[-1]["content"][0]["content"] == "x" * 2000
+        assert budget.fetch("result-1") == "x" * 2000
+
+    def test_openai_tool_messages_compacted(self):
+        budget = ContextBudget(budget_tokens=500, keep_recent=1)
+        messages = [{"role": "user", "content": "hi"}]
+        for i in range(3):
+            messages.append({"role": "tool", "tool_call_id": f"t{i}", "content": "y" * 2000})
+
+        budget.compact(messages)
+        assert messages[1]["content"].startswith("[compacted")
+        assert messages[-1]["content"] == "y" * 2000
+
+    def test_request_after_earlier_exchanges_is_kept(self):
+        budget = ContextBudget(budget_tokens=500, keep_recent=1)
+        request = {"role": "user", "content": [{"type": "tool_result", "tool_use_id": "file", "content": "z" * 2000}]}
+        messages = [{"role": "user", "content": "earlier"}, {"role": "assistant", "content": "ok"}, request]
+        for i in range(3):
+            messages.extend(_tool_exchange(i, "x" * 2000))
+
+        budget.compact(messages, request_index=2)
+        assert request["content"][0]["content"] == "z" * 2000
+        assert messages[4]["content"][0]["content"].startswith("[compacted")
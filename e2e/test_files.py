@@ -0,0 +1,45 @@
+"""
+Test shared file handles for @file references — no Docker needed.
+"""
+
+import os
+
+import pytest
+
+import config
+from orchestrator.files import share_file
+
+
+@pytest.fixture
+def shared_dir(tmp_path, monkeypatch):
+    shared = tmp_path / "shared"
+    monkeypatch.setattr(config, "SHARED_FILES_DIR", str(shared))
+    return shared
+
+
+class TestShareFile:
+    def test_file_is_linked_not_inlined(self, tmp_path, shared_dir):
+        source = tmp_path / "data.csv"
+        source.write_text("id,name\n" + "".join(f"{i},row{i}\n" for i in range(10_000)))
+
+        shared = share_file(source)
+        target = shared_dir / shared.container_path.rsplit("/", 1)[1]
+        assert target.read_bytes() == source.read_bytes()
+        assert os.path.samefile(target, source)
+        assert shared.container_path.startswith(f"{config.SKILL_FILES_MOUNT}/")
+        assert shared.container_path.endswith("-data.csv")
+
+        described = shared.describe()
+        assert shared.container_path in described
+        assert "row9999" not in described
+        assert len(described) < config.FILE_PREVIEW_BYTES + 300
+
+    def test_same_file_same_handle(self, tmp_path, shared_dir):
+        source = tmp_path / "a.json"
+        source.write_text("{}")
+        assert share_file(source).handle == share_file(source).handle
+
+    def test_binary_preview(self, tmp_path, shared_dir):
+        source = tmp_path / "img.png"
+        source.write_bytes(b"\x89PNG\0\0\0")
+        assert share_file(source).preview == "(binary file)"
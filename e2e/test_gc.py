@@ -0,0 +1,131 @@
+"""
+Test garbage collection of skill images and build dirs against a fake Docker client.
+"""
+
+import os
+
+import docker
+import pytest
+
+from bench.fakes import FakeDocker
+from models.skill import Skill
+from skill_factory import factory, gc, hosts
+from skill_factory.hosts import DockerHost, HostPool
+from skill_factory.placement import HostBudget
+
+MB = 1024 * 1024
+MANAGED = {"helix.managed": "true"}
+
+
+def _image(tag: str, created: int, size_mb: int, shared_mb: int = 100) -> dict:
+    return {"RepoTags": [tag], "Created": created, "Size": (size_mb + shared_mb) * MB, "SharedSize": shared_mb * MB}
+
+
+@pytest.fixture
+def builds(tmp_path, monkeypatch):
+    monkeypatch.setattr(factory, "BUILDS_DIR", tmp_path)
+    monkeypatch.setattr(gc, "BUILDS_DIR", tmp_path)
+    return tmp_path
+
+
+def _old_dir(path):
+    path.mkdir()
+    (path / "main.py").write_text("x")
+    os.utime(path, (1, 1))
+
+
+def _skill(name: str, tag: str | None, container_id: str | None = None) -> Skill:
+    return Skill(name=name, description="", endpoint="", port=0, image_name=tag, container_id=container_id or name)
+
+
+class TestCollectGarbage:
+    def test_evicts_lru_unreferenced_until_under_budget(self, builds):
+        for name in ("old", "mid", "new", "live"):
+            (builds / name).mkdir()
+        client = FakeDocker([
+            _image("helix-skill-old:latest", created=1, size_mb=50),
+            _image("helix-skill-mid:latest", created=2, size_mb=50),
+            _image("helix-skill-new:latest", created=3, size_mb=50),
+            _image("helix-skill-live:latest", created=0, size_mb=50),
+            _image("python:3.12-slim", created=0, size_mb=0),
+        ])
+        in_use = [_skill("live", "helix-skill-live:latest")]
+
+        report = gc.collect_garbage(in_use, budget_bytes=120 * MB, min_free_bytes=0, client=client)
+
+        assert client.removed == ["helix-skill-old:latest", "helix-skill-mid:latest"]
+        assert sorted(report.removed_build_dirs) == ["mid", "old"]
+        assert (builds / "live").exists() and (builds / "new").exists()
+
+    def test_orphan_build_dirs_always_removed(self, builds):
+        _old_dir(builds / "crashed")
+        report = gc.collect_garbage([], budget_bytes=10**12, min_free_bytes=0, client=FakeDocker())
+        assert report.removed_build_dirs == ["crashed"]
+
+    def test_deploys_in_progress_are_left_alone(self, builds, monkeypatch):
+        _old_dir(builds / "building")
+        (builds / "just-built").mkdir()  # built moments ago, skill not registered yet
+        monkeypatch.setitem(factory._deploying, builds / "building", ("helix-building", "helix-skill-building:latest"))
+        client = FakeDocker([_image("helix-skill-building:latest", created=1, size_mb=50)])
+        client.add_container("helix-building", "created", MANAGED)
+
+        report = gc.collect_garbage([], budget_bytes=0, min_free_bytes=0, client=client)
+        assert (client.removed_containers, client.removed, report.removed_build_dirs) == ([], [], [])
+
+    def test_each_host_collects_only_its_own_images(self, builds, monkeypatch):
+        for name in ("a", "b", "orphan"):
+            _old_dir(builds / name)
+        host_a = FakeDocker([_image("helix-skill-a:latest", created=1, size_mb=50)])
+        host_b = FakeDocker([_image("helix-skill-b:latest", created=1, size_mb=50)])
+        pool = HostPool([DockerHost(name, f"tcp://{name}:2375", HostBudget(1024, 1.0), lambda url, c=c: c)
+                         for name, c in (("a", host_a), ("b", host_b))])
+        monkeypatch.setattr(hosts, "_pool", pool)
+
+        report = gc.collect_garbage([_skill("b", "helix-skill-b:latest")], budget_bytes=0, min_free_bytes=0)
+        assert (host_a.removed, host_b.removed) == (["helix-skill-a:latest"], [])
+        assert sorted(report.removed_build_dirs) == ["a", "orphan"]
+
+        def unreachable(url):
+            raise docker.errors.DockerException("connection refused")
+
+        _old_dir(builds / "a")
+        pool.hosts["a"]._client, pool.hosts["a"]._client_factory = None, unreachable
+        report = gc.collect_garbage([_skill("b", "helix-skill-b:latest")], budget_bytes=0, min_free_bytes=0)
+        assert report.removed_build_dirs == []  # its image may be on the host we couldn't list
+
+    def test_free_space_is_only_measured_on_local_hosts(self, builds, monkeypatch):
+        local = FakeDocker([_image("helix-skill-a:latest", created=1, size_mb=50)])
+        remote = FakeDocker([_image("helix-skill-b:latest", created=1, size_mb=50)])
+        remote.info = lambda: pytest.fail("a remote DockerRootDir is not a local path")
+        monkeypatch.setattr(hosts, "_pool", HostPool([
+            DockerHost("local", "local", HostBudget(1024, 1.0), lambda url: local),
+            DockerHost("gpu", "tcp://10.0.0.7:2375", HostBudget(1024, 1.0), lambda url: remote),
+        ]))
+        # Under budget but short of free space: only the host whose disk we can see frees some
+        gc.collect_garbage([], budget_bytes=10**12, min_free_bytes=10**18)
+        assert (local.removed, remote.removed) == (["helix-skill-a:latest"], [])
+
+    def test_images_used_by_containers_are_skipped(self, builds):
+        client = FakeDocker(
+            [_image("helix-skill-a:v1", created=1, size_mb=50), _image("helix-skill-b:latest", created=2, size_mb=50)],
+            in_use_by_container={"helix-skill-a:v1"},
+        )
+        gc.collect_garbage([], budget_bytes=60 * MB, min_free_bytes=0, client=client)
+        assert client.removed == ["helix-skill-b:latest"]
+
+    def test_stopped_leftover_containers_removed(self, builds):
+        client = FakeDocker()
+        client.add_container("helix-old", labels=MANAGED)
+        live = client.add_container("helix-live", labels=MANAGED)
+        client.add_container("helix-up", "running", MANAGED)
+        gc.collect_garbage([_skill("live", None, container_id=live.id)], client=client)
+        assert client.removed_containers == ["helix-old"]
+
+    def test_only_helix_labelled_leftovers_are_collected(self, builds):
+        client = FakeDocker(dangling=[{"labels": MANAGED, "size": 5 * MB}, {"labels": {}, "size": 7 * MB}])
+        client.add_container("helix-old", labels=MANAGED)
+        client.add_container("other-helix-db", labels={})
+        report = gc.collect_garbage([], client=client)
+        assert client.removed_containers == ["helix-old"]
+        assert report.freed_bytes == 5 * MB
+        assert client.dangling == [{"labels": {}, "size": 7 * MB}]
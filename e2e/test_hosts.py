@@ -0,0 +1,101 @@
+"""
+Test placement across several Docker hosts with fake daemons — no Docker needed.
+"""
+
+import json
+import time
+
+import docker
+import pytest
+
+from bench.fakes import FakeDocker, make_spec
+from orchestrator import agent
+from skill_factory import factory, hosts
+from skill_factory.hosts import DockerHost, HostPool, HostUnavailableError, parse_hosts
+from skill_factory.placement import HostBudget, PlacementError
+
+
+def _host(name, url, daemon, memory_mb=2048) -> DockerHost:
+    return DockerHost(name, url, HostBudget(memory_mb, 4.0), lambda base_url: daemon)
+
+
+class TestHostPool:
+    def test_parse_hosts(self):
+        parsed = parse_hosts("local, gpu=tcp://10.0.0.7:2375,unix:///var/run/other.sock",
+                             client_factory=lambda url: None)
+        assert [(h.name, h.address) for h in parsed] == [("local", "localhost"), ("gpu", "10.0.0.7"), ("host2", "localhost")]
+        assert not parsed[1].is_local
+
+    def test_least_loaded_and_cached_base_image_first(self):
+        warm = _host("warm", "tcp://10.0.0.1:2375", FakeDocker(images=["python:3.12-slim"]))
+        cold = _host("cold", "tcp://10.0.0.2:2375", FakeDocker())
+        pool = HostPool([cold, warm])
+        assert pool.place("a", "small", base_image="python:3.12-slim") is warm
+
+        other_a = _host("a", "tcp://10.0.0.1:2375", FakeDocker())
+        other_b = _host("b", "tcp://10.0.0.2:2375", FakeDocker())
+        pool = HostPool([other_a, other_b])
+        assert pool.place("s1", "medium").name == "a"
+        assert pool.place("s2", "small").name == "b"  # a is busier now
+        assert pool.usage()["a"]["skills"] == 1
+
+    def test_spills_to_next_host_then_refuses(self):
+        pool = HostPool([_host("a", "tcp://h1:2375", FakeDocker(), 1024), _host("b", "tcp://h2:2375", FakeDocker(), 1024)])
+        assert {pool.place(k, "medium").name for k in ("s1", "s2")} == {"a", "b"}
+        with pytest.raises(PlacementError, match="No Docker host"):
+            pool.place("s3", "medium")
+
+    def test_unreachable_host_is_skipped_until_its_backoff_ends(self, monkeypatch):
+        attempts = []
+
+        def refuse(url):
+            attempts.append(url)
+            raise docker.errors.DockerException("connection refused")
+
+        down = DockerHost("down", "tcp://10.0.0.9:2375", HostBudget(2048, 4.0), refuse)
+        pool = HostPool([down, _host("up", "tcp://10.0.0.1:2375", FakeDocker())])
+        assert [pool.place(k, "small").name for k in ("s1", "s2", "s3")] == ["up"] * 3
+        assert len(attempts) == 1  # later placements don't wait on the dead host again
+        assert not down.available and down.retry_in() > 0
+
+        monkeypatch.setattr(down, "_down_until", 0.0)
+        with pytest.raises(HostUnavailableError, match="down: unreachable"):
+            HostPool([down]).place("s4", "small")
+        assert len(attempts) == 2
+        assert down.retry_in() > hosts.config.DOCKER_HOST_RETRY_MIN  # backoff doubled
+
+    def test_no_reachable_host_fails_without_queueing(self):
+        def refuse(url):
+            raise docker.errors.DockerException("connection refused")
+
+        pool = HostPool([DockerHost("down", "tcp://10.0.0.9:2375", HostBudget(2048, 4.0), refuse)])
+        started = time.monotonic()
+        with pytest.raises(HostUnavailableError) as raised:
+            pool.place("s1", "small", timeout=60)
+        assert time.monotonic() - started < 1
+        assert "Docker is not reachable" in json.loads(agent._build_failed(raised.value))["hint"]
+
+
+class TestMultiHostBuild:
+    @pytest.fixture
+    def daemons(self, monkeypatch, tmp_path):
+        daemons = {"a": FakeDocker(), "b": FakeDocker()}
+        pool = HostPool([_host(name, f"tcp://{name}.internal:2375", d) for name, d in daemons.items()])
+        monkeypatch.setattr(hosts, "_pool", pool)
+        monkeypatch.setattr(factory, "BUILDS_DIR", tmp_path / "builds")
+        monkeypatch.setattr(factory.config, "SHARED_FILES_DIR", str(tmp_path / "files"))
+        monkeypatch.setattr(factory.config, "ARTIFACTS_DIR", str(tmp_path / "artifacts"))
+        monkeypatch.setattr(factory, "wait_for_healthy", lambda port, timeout, address: {"codecs": ["json"]})
+        return daemons
+
+    def test_skills_spread_and_addressed_by_host(self, daemons):
+        first = factory.build_and_run(make_spec("one"))
+        second = factory.build_and_run(make_spec("two"))
+        assert {first.host, second.host} == {"a", "b"}
+        assert first.endpoint == f"http://{first.host}.internal:{first.port}/execute"
+        assert first.url("/health").endswith(f".internal:{first.port}/health")
+
+        factory.remove_skill(second)
+        assert daemons[second.host].removed == [second.image_name]
+        assert daemons[first.host].removed == []
+        assert hosts.get_host_pool().usage()[second.host]["skills"] == 0
@@ -0,0 +1,83 @@
+"""
+Test the skill load generator against a fake skill with limited capacity — no Docker needed.
+"""
+
+import threading
+import time
+
+import httpx
+import pytest
+
+from models.skill import Skill, SkillStatus
+from orchestrator import agent, loadgen
+from orchestrator.loadgen import LoadTestError, benchmark_skill, concurrency_levels
+from orchestrator.registry import SkillRegistry
+
+SERVICE_TIME = 0.01
+WORKERS = 2  # the fake skill serves two requests at a time
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = SkillRegistry()
+    registry.register(Skill(name="echo", description="echo", endpoint="echo", port=0, status=SkillStatus.RUNNING,
+                            sample_payloads=[{"x": 1}]))
+    workers = threading.Semaphore(WORKERS)
+
+    def post_execute(skill, payload, binary=False):
+        with workers:
+            time.sleep(SERVICE_TIME)
+        if payload.get("fail"):
+            return httpx.Response(500, text="boom")
+        return httpx.Response(200, json=payload)
+
+    monkeypatch.setattr(loadgen, "post_execute", post_execute)
+    return registry
+
+
+class TestLoadGenerator:
+    def test_concurrency_levels(self):
+        assert concurrency_levels(1) == [1]
+        assert concurrency_levels(8) == [1, 2, 4, 8]
+        assert concurrency_levels(12) == [1, 2, 4, 8, 12]
+
+    def test_saturation_curve_stored_on_skill(self, registry):
+        result = benchmark_skill(registry, "echo", concurrency=8, requests_per_level=20)
+        by_concurrency = {level.concurrency: level for level in result.levels}
+        assert by_concurrency[2].throughput_rps > 1.5 * by_concurrency[1].throughput_rps
+        assert result.saturation_concurrency in (2, 4)
+        assert result.error_rate == 0
+        assert sum(result.histogram_ms.values()) == sum(level.requests for level in result.levels)
+        assert registry.lookup("echo").benchmark is result
+        assert registry.list_skills()[0]["capacity"]["saturation_concurrency"] == result.saturation_concurrency
+
+    def test_errors_stop_the_climb(self, registry):
+        result = benchmark_skill(registry, "echo", payloads=[{"fail": True}], concurrency=8, requests_per_level=5)
+        assert [level.concurrency for level in result.levels] == [1]
+        assert result.error_rate == 1.0
+        assert result.sample_errors == ["HTTP 500: boom"]
+
+    def test_rate_limit_paces_requests(self, registry):
+        started = time.perf_counter()
+        result = benchmark_skill(registry, "echo", concurrency=1, requests_per_level=6, rate=50)
+        assert time.perf_counter() - started >= 0.1
+        assert result.rate_limit_rps == 50
+
+    def test_needs_payloads(self, registry):
+        registry.lookup("echo").sample_payloads = []
+        with pytest.raises(LoadTestError, match="no sample payloads"):
+            benchmark_skill(registry, "echo")
+        with pytest.raises(LoadTestError, match="not found"):
+            benchmark_skill(registry, "missing")
+
+    def test_agent_tool(self, registry):
+        out = agent.handle_benchmark_skill(registry, "echo", concurrency=2, requests_per_level=4)
+        assert '"peak_throughput_rps"' in out
+        assert "error" in agent.handle_benchmark_skill(registry, "missing")
+
+    def test_bench_command_parsing(self):
+        from main import parse_bench_command
+
+        assert parse_bench_command("bench echo concurrency=4 rate=50") == {"name": "echo", "concurrency": 4, "rate": 50.0}
+        assert parse_bench_command("bench press tracker skill please") is None  # a prompt, not the command
+        assert parse_bench_command("benchmark echo") is None
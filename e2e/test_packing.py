@@ -0,0 +1,114 @@
+"""
+Test packing mode: dependency grouping, group rebuilds, and the shared host app
+run in-process through FastAPI's TestClient — no Docker needed.
+"""
+
+import importlib.util
+
+import pytest
+
+try:
+    from fastapi.testclient import TestClient
+except ImportError:  # the shared host app's own dependency, not the orchestrator's
+    TestClient = None
+
+from bench.fakes import make_spec
+from models.skill import Skill
+from skill_factory import packing
+from skill_factory.factory import render_group
+from skill_factory.packing import Packer, merge_dependencies, packable
+
+COUNTER_CODE = '_state["n"] = _state.get("n", 0) + body.get("by", 1)\nreturn {"n": _state["n"]}'
+
+
+class FakeBuild:
+    def __init__(self):
+        self.builds: list[tuple[str, list[str], list[str], str]] = []
+
+    def __call__(self, group_name, specs, dependencies, instance):
+        self.builds.append((group_name, [s.name for s in specs], dependencies, instance))
+        return [Skill(name=s.name, description=s.description, endpoint=f"http://h:1/s/{s.name}/execute", port=1,
+                      container_id=f"{group_name}-{instance}") for s in specs]
+
+
+class TestGrouping:
+    def test_merge_dependencies(self):
+        assert merge_dependencies(["requests"], ["requests==2.31", "httpx"]) == ["httpx", "requests==2.31"]
+        assert merge_dependencies(["pyyaml==6.0"], ["PyYAML==5.4"]) is None
+
+    def test_packable(self, monkeypatch):
+        monkeypatch.setattr(packing.config, "SKILL_PACKING", True)
+        assert packable(make_spec("a", COUNTER_CODE, dependencies=["requests"]))
+        assert not packable(make_spec("b", COUNTER_CODE, dependencies=["pandas"]))  # medium resource class
+        assert not packable(make_spec("c", COUNTER_CODE, view_post_code="return HTMLResponse('x')"))
+        monkeypatch.setattr(packing.config, "SKILL_PACKING", False)
+        assert not packable(make_spec("a", COUNTER_CODE))
+
+    def test_compatible_skills_share_a_group(self):
+        build = FakeBuild()
+        packer = Packer(max_group_size=2, build=build)
+        packer.deploy(make_spec("a", COUNTER_CODE, dependencies=["requests"]))
+        skills = packer.deploy(make_spec("b", COUNTER_CODE, dependencies=["requests==2.31"]))
+        assert [s.name for s in skills] == ["a", "b"]
+        assert build.builds[-1] == ("pack1", ["a", "b"], ["requests==2.31"], "g2")
+
+        packer.deploy(make_spec("c", COUNTER_CODE))  # pack1 is full
+        packer.deploy(make_spec("d", COUNTER_CODE, dependencies=["requests==2.0"]))  # conflicts with pack1, joins pack2
+        assert packer.group_of("c").name == packer.group_of("d").name == "pack2"
+
+    def test_update_moves_member_and_rebuilds_old_group(self):
+        build = FakeBuild()
+        packer = Packer(build=build)
+        packer.deploy(make_spec("a", COUNTER_CODE, dependencies=["pyyaml==6.0"]))
+        packer.deploy(make_spec("b", COUNTER_CODE))
+        skills = packer.deploy(make_spec("a", COUNTER_CODE, dependencies=["pyyaml==6.0", "lxml-stubs"]))  # still compatible: stays
+        assert {s.container_id for s in skills} == {"pack1-g3"}
+
+        packer.deploy(make_spec("c", COUNTER_CODE, dependencies=["pyyaml==5.4"]))  # new group
+        skills = packer.deploy(make_spec("b", COUNTER_CODE, dependencies=["pyyaml==5.4"]))  # now only fits pack2
+        assert packer.group_of("b").name == "pack2"
+        assert [(s.name, s.container_id) for s in skills] == [("c", "pack2-g2"), ("b", "pack2-g2"), ("a", "pack1-g4")]
+
+    def test_failed_verify_rolls_back(self, monkeypatch):
+        removed = []
+        monkeypatch.setattr(packing, "remove_skill", removed.append)
+        packer = Packer(build=FakeBuild())
+        packer.deploy(make_spec("a", COUNTER_CODE))
+
+        def reject(skill):
+            raise RuntimeError("smoke test failed")
+
+        with pytest.raises(RuntimeError):
+            packer.deploy(make_spec("b", COUNTER_CODE), verify=reject)
+        assert packer.group_of("b") is None
+        assert list(packer.group_of("a").specs) == ["a"]
+        assert removed[0].container_id == "pack1-g2"
+
+
+@pytest.mark.skipif(TestClient is None, reason="fastapi is not installed")
+class TestHostContainer:
+    @pytest.fixture
+    def host_app(self, tmp_path):
+        files = render_group("pack1", [make_spec("a", COUNTER_CODE), make_spec("b-two", COUNTER_CODE)], [])
+        for name, content in files.items():
+            (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / name).write_text(content)
+        spec = importlib.util.spec_from_file_location("pack1_main", tmp_path / "main.py")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module.app
+
+    def test_skills_mounted_with_separate_state(self, host_app):
+        with TestClient(host_app) as client:
+            health = client.get("/health").json()
+            assert set(health["skills"]) == {"a", "b-two"}
+            assert client.get("/s/a/health").status_code == 200
+
+            client.post("/s/a/execute", json={"by": 5})
+            assert client.post("/s/a/execute", json={}).json() == {"n": 6}
+            assert client.post("/s/b-two/execute", json={}).json() == {"n": 1}
+            client.post("/s/a/execute", json={}, headers={"X-Helix-Profile": "1"})
+            assert client.get("/s/a/profile").json()["calls"] == 1
+
+    def test_health_waits_for_every_skill(self, host_app):
+        assert TestClient(host_app).get("/health").status_code == 503
@@ -0,0 +1,84 @@
+"""
+Test the pipeline executor against fake skills — no Docker needed.
+"""
+
+import threading
+
+import httpx
+import pytest
+
+from models.skill import Skill, SkillStatus
+from orchestrator import pipeline
+from orchestrator.pipeline import PipelineError, run_pipeline
+from orchestrator.registry import SkillRegistry
+
+# name -> function(payload) -> result
+FAKE_SKILLS = {
+    "parse": lambda p: {"rows": [{"v": int(x)} for x in p["csv"].split(",")]},
+    "total": lambda p: {"sum": sum(r["v"] for r in p["rows"])},
+    "count": lambda p: {"n": len(p["rows"])},
+    "report": lambda p: {"text": f"{p['stats']['sum']} over {p['stats']['n']} rows"},
+    "meet": lambda p: {"ok": True},  # replaced per test
+    "broken": lambda p: None,
+}
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = SkillRegistry()
+    for name in FAKE_SKILLS:
+        registry.register(Skill(name=name, description=name, endpoint=name, port=0, status=SkillStatus.RUNNING))
+
+    def post_execute(skill, payload, binary=False):
+        result = FAKE_SKILLS[skill.name](payload)
+        if result is None:
+            return httpx.Response(500, json={"error": "boom"})
+        return httpx.Response(200, json=result)
+
+    monkeypatch.setattr(pipeline, "post_execute", post_execute)
+    return registry
+
+
+class TestRunPipeline:
+    def test_fan_out_and_join(self, registry):
+        steps = [
+            {"id": "p", "skill": "parse", "payload": {"csv": "1,2,3"}},
+            {"id": "t", "skill": "total", "inputs": {"rows": "p.rows"}},
+            {"id": "c", "skill": "count", "inputs": {"rows": "p.rows"}},
+            {"id": "r", "skill": "report", "inputs": {"stats.sum": "t.sum", "stats.n": "c.n"}},
+        ]
+        out = run_pipeline(registry, steps)
+        assert out["result"] == {"text": "6 over 3 rows"}
+        assert out["steps"]["p"]["shape"] == "{rows: list[3] of {v: int}}"
+
+    def test_independent_steps_run_concurrently(self, registry, monkeypatch):
+        # All three steps must be in flight at once to get past the barrier
+        barrier = threading.Barrier(3, timeout=5)
+        monkeypatch.setitem(FAKE_SKILLS, "meet", lambda p: {"ok": True, "arrival": barrier.wait()})
+        steps = [{"id": f"s{i}", "skill": "meet"} for i in range(3)]
+        out = run_pipeline(registry, steps)
+        assert set(out["result"]) == {"s0", "s1", "s2"}
+        assert sorted(step["arrival"] for step in out["result"].values()) == [0, 1, 2]
+
+    def test_list_index_paths(self, registry):
+        steps = [
+            {"id": "p", "skill": "parse", "payload": {"csv": "4,5"}},
+            {"id": "t", "skill": "total", "inputs": {"rows": "p.rows"}, "payload": {}},
+        ]
+        assert pipeline.resolve_path({"rows": [{"v": 4}]}, "rows.0.v") == 4
+        assert run_pipeline(registry, steps, output="t")["result"] == {"sum": 9}
+
+    @pytest.mark.parametrize("steps, message", [
+        ([{"id": "a", "skill": "missing"}], "not found"),
+        ([{"id": "a", "skill": "parse"}, {"id": "a", "skill": "parse"}], "unique id"),
+        ([{"id": "a", "skill": "total", "inputs": {"rows": "zzz.rows"}}], "unknown step"),
+        ([{"id": "a", "skill": "total", "inputs": {"rows": "b"}},
+          {"id": "b", "skill": "total", "inputs": {"rows": "a"}}], "cycle"),
+    ])
+    def test_invalid_pipelines_rejected(self, registry, steps, message):
+        with pytest.raises(PipelineError, match=message):
+            run_pipeline(registry, steps)
+
+    def test_failing_step_reports_step_id(self, registry):
+        with pytest.raises(PipelineError, match="Step 'b' \\(broken\\) returned HTTP 500"):
+            run_pipeline(registry, [{"id": "b", "skill": "broken"}])
@@ -0,0 +1,85 @@
+"""
+Test resource classes, container limits and the host placement budget — no Docker needed.
+"""
+
+import threading
+import time
+
+import pytest
+
+from bench.fakes import FakeDocker, make_spec
+from skill_factory import factory, hosts
+from skill_factory.hosts import DockerHost, HostPool
+from skill_factory.placement import HostBudget, PlacementError, container_limits, infer_resource_class
+
+
+@pytest.fixture
+def budget():
+    return HostBudget(memory_mb=1024, cpus=2.0)
+
+
+class TestResourceClasses:
+    def test_inferred_from_dependencies(self):
+        assert infer_resource_class(make_spec()) == "small"
+        assert infer_resource_class(make_spec(dependencies=["requests", "Pillow>=10"])) == "medium"
+        assert infer_resource_class(make_spec(dependencies=["pandas", "torch==2.3"])) == "large"
+
+    def test_explicit_class_wins(self):
+        assert infer_resource_class(make_spec(dependencies=["torch"], resource_class="small")) == "small"
+        with pytest.raises(ValueError):
+            infer_resource_class(make_spec(resource_class="huge"))
+
+    def test_container_limits(self):
+        limits = container_limits("small")
+        assert limits["mem_limit"] == limits["memswap_limit"] == "256m"
+        assert limits["nano_cpus"] == 500_000_000
+        assert limits["pids_limit"] == 128
+
+
+class TestHostBudget:
+    def test_refuses_when_full(self, budget):
+        budget.reserve("a", "medium")
+        with pytest.raises(PlacementError, match="exhausted"):
+            budget.reserve("b", "medium")
+        budget.reserve("c", "small")
+        assert budget.usage()["memory_mb"] == 768 + 256
+
+    def test_queued_deploy_gets_released_capacity(self, budget):
+        budget.reserve("a", "medium")
+        threading.Timer(0.1, budget.release, args=("a",)).start()
+        started = time.monotonic()
+        budget.reserve("b", "medium", timeout=5)
+        assert 0.05 < time.monotonic() - started < 5
+        assert budget.usage()["skills"] == 1
+
+    def test_class_larger_than_host(self, budget):
+        with pytest.raises(PlacementError, match="whole host"):
+            budget.reserve("a", "large")
+
+
+class TestBuildAndRunLimits:
+    @pytest.fixture
+    def fake_docker(self, monkeypatch, tmp_path, budget):
+        fake = FakeDocker()
+        monkeypatch.setattr(hosts, "_pool", HostPool([DockerHost("local", "local", budget, lambda url: fake)]))
+        monkeypatch.setattr(factory, "BUILDS_DIR", tmp_path / "builds")
+        monkeypatch.setattr(factory.config, "SHARED_FILES_DIR", str(tmp_path / "files"))
+        monkeypatch.setattr(factory.config, "ARTIFACTS_DIR", str(tmp_path / "artifacts"))
+        return fake
+
+    def test_limits_applied_and_released(self, fake_docker, budget, monkeypatch):
+        monkeypatch.setattr(factory, "wait_for_healthy", lambda port, timeout, address: {"codecs": ["json"]})
+        skill = factory.build_and_run(make_spec(dependencies=["numpy"]))
+        assert skill.resource_class == "medium"
+        assert fake_docker.run_kwargs["mem_limit"] == "768m"
+        assert fake_docker.run_kwargs["labels"] == {factory.MANAGED_LABEL: "true"}
+        assert budget.usage()["skills"] == 1
+
+        factory.remove_skill(skill)
+        assert budget.usage()["skills"] == 0
+
+    def test_failed_start_releases_budget(self, fake_docker, budget, monkeypatch):
+        monkeypatch.setattr(factory, "wait_for_healthy", lambda port, timeout, address: None)
+        with pytest.raises(RuntimeError, match="failed to start"):
+            factory.build_and_run(make_spec())
+        assert budget.usage()["skills"] == 0
@@ -0,0 +1,142 @@
+"""
+Test request-scoped profiling in the rendered skill template and its aggregation in the
+orchestrator, in-process — no Docker needed.
+
+Requests are served on the calling thread: since Python 3.12 cProfile sees every
+thread, and TestClient's extra event-loop thread would blur the stats.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from models.skill import Skill, SkillSpec, SkillStatus
+from orchestrator import agent, profiler, skill_client
+from orchestrator.profiler import ProfileStore, SkillProfile, profile_skill
+from orchestrator.registry import SkillRegistry
+from skill_factory.factory import render_skill
+
+try:
+    import fastapi
+except ImportError:  # the skill runtime's own dependency, not the orchestrator's
+    fastapi = None
+
+SLOW_CODE = '''\
+def slow_part(n):
+    time.sleep(0.01)
+    return n * 2
+
+total = sum(slow_part(i) for i in range(body.get("n", 3)))
+return {"total": total}'''
+
+
+requires_fastapi = pytest.mark.skipif(fastapi is None, reason="fastapi is not installed")
+
+
+def _load_app(spec: SkillSpec):
+    namespace: dict = {}
+    exec(compile(render_skill(spec)["main.py"], "main.py", "exec"), namespace)
+    return namespace["app"]
+
+
+class InThreadASGI(httpx.BaseTransport):
+    """Sync transport that runs the ASGI app on the calling thread."""
+
+    def __init__(self, app):
+        self.app = app
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        async def send():
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=self.app), base_url="http://skill") as c:
+                resp = await c.request(request.method, request.url, headers=request.headers, content=request.read())
+                return httpx.Response(resp.status_code, headers=resp.headers, content=resp.content)
+        return asyncio.run(send())
+
+
+@pytest.fixture
+def client(monkeypatch):
+    app = _load_app(SkillSpec(name="slow", description="slow", execute_code=SLOW_CODE))
+    with httpx.Client(transport=InThreadASGI(app), base_url="http://skill") as client:
+        monkeypatch.setattr(skill_client, "_client", client)
+        monkeypatch.setattr(profiler, "_store", ProfileStore())
+        yield client
+
+
+@pytest.fixture
+def registry(client):
+    registry = SkillRegistry()
+    registry.register(Skill(name="slow", description="slow", endpoint="http://skill/execute", port=0,
+                            status=SkillStatus.RUNNING, sample_payloads=[{"n": 3}]))
+    return registry
+
+
+def _functions(report: dict) -> dict:
+    return {f["function"]: f for f in report["functions"]}
+
+
+@requires_fastapi
+class TestSkillRuntime:
+    def test_header_profiles_one_call(self, client):
+        client.post("/execute", json={})
+        assert client.get("/profile").json()["calls"] == 0
+
+        assert client.post("/execute", json={"n": 2}, headers={"X-Helix-Profile": "1"}).json() == {"total": 2}
+        functions = _functions(client.get("/profile").json())
+        assert functions["execute_code:1 (slow_part)"]["calls"] == 2
+        assert functions["execute_code"]["cumulative_ms"] >= 20
+        assert functions["<built-in method time.sleep>"]["self_ms"] >= 20
+
+    def test_toggle_and_reset(self, client):
+        client.post("/profile", json={"enabled": True})
+        client.post("/execute", json={})
+        client.post("/execute", json={})
+        report = client.get("/profile", params={"reset": True}).json()
+        assert (report["calls"], report["enabled"]) == (2, True)
+        assert client.get("/profile").json()["calls"] == 0
+
+    def test_concurrent_calls_are_counted_with_the_profile(self):
+        app = _load_app(SkillSpec(name="waits", description="waits",
+                                  execute_code='import asyncio\nawait asyncio.sleep(0.01)\nreturn {}'))
+        profiled = {"x-helix-profile": "1"}
+
+        async def run(*headers):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://skill") as c:
+                await asyncio.gather(*(c.post("/execute", json={}, headers=h) for h in headers))
+                return (await c.get("/profile", params={"reset": True})).json()["calls"]
+
+        # The profile opened by the first call also sees the others, so they count too
+        assert asyncio.run(run(profiled, {}, {})) == 3
+        # A profile can't start while another call is already running
+        assert asyncio.run(run({}, profiled)) == 0
+
+
+class TestAggregation:
+    def test_merge_and_version_reset(self):
+        store = ProfileStore()
+        skill = Skill(name="s", description="s", endpoint="http://h/execute", port=0)
+        report = {"calls": 2, "functions": [{"function": "execute_code", "calls": 2, "self_ms": 1.0, "cumulative_ms": 40.0},
+                                            {"function": "execute_code:3 (f)", "calls": 6, "self_ms": 30.0, "cumulative_ms": 30.0}]}
+        store.record(skill, report)
+        profile = store.record(skill, report)
+        assert (profile.calls, profile.mean_ms()) == (4, 20.0)
+        assert profile.hotspots(1) == [{"function": "execute_code:3 (f)", "calls": 12, "self_ms": 60.0,
+                                        "cumulative_ms": 60.0, "share": 0.75}]
+        assert "execute_code:3 (f): 60.0 ms over 12 call(s), 75%" in profile.describe()
+
+        skill.version = 2
+        assert store.record(skill, report).calls == 2
+
+    @requires_fastapi
+    def test_profile_skill_end_to_end(self, registry):
+        profile = profile_skill(registry, "slow", requests=2)
+        assert isinstance(profile, SkillProfile)
+        assert profile.calls == 2
+        assert profile.hotspots(1)[0]["function"] == "<built-in method time.sleep>"
+        assert profiler.get_profile_store().get("slow") is profile
+
+    @requires_fastapi
+    def test_agent_tool(self, registry):
+        out = agent.handle_profile_skill(registry, "slow", payloads=[{"n": 1}], requests=1)
+        assert '"mean_ms"' in out
+        assert "not found" in agent.handle_profile_skill(registry, "missing")
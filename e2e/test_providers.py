@@ -0,0 +1,156 @@
+"""
+Test the provider adapters' request shaping — no API calls needed.
+"""
+
+import json
+
+from orchestrator.providers import (
+    AgentResponse,
+    LLMProvider,
+    RoutingProvider,
+    ToolCall,
+    Usage,
+    _cacheable_messages,
+    _cacheable_tools,
+    _to_openai_messages,
+)
+
+_BREAKPOINT = {"type": "ephemeral"}
+
+
+class TestPromptCaching:
+    def test_breakpoint_on_last_tool_only(self):
+        tools = [{"name": "a"}, {"name": "b"}]
+        cached = _cacheable_tools(tools)
+        assert "cache_control" not in cached[0]
+        assert cached[1]["cache_control"] == _BREAKPOINT
+        assert "cache_control" not in tools[1]  # original schemas untouched
+
+    def test_string_content_becomes_cacheable_block(self):
+        messages = [{"role": "user", "content": "hello"}]
+        cached = _cacheable_messages(messages)
+        assert cached[0]["content"] == [{"type": "text", "text": "hello", "cache_control": _BREAKPOINT}]
+        assert messages[0]["content"] == "hello"
+
+    def test_breakpoint_moves_to_newest_block(self):
+        messages = [
+            {"role": "user", "content": "hello"},
+            {"role": "assistant", "content": [{"type": "tool_use", "id": "t1", "name": "x", "input": {}}]},
+            {"role": "user", "content": [
+                {"type": "tool_result", "tool_use_id": "t1", "content": "1"},
+                {"type": "tool_result", "tool_use_id": "t2", "content": "2"},
+            ]},
+        ]
+        cached = _cacheable_messages(messages)
+        assert cached[:2] == messages[:2]
+        assert "cache_control" not in cached[2]["content"][0]
+        assert cached[2]["content"][1]["cache_control"] == _BREAKPOINT
+        assert "cache_control" not in messages[2]["content"][1]
+
+
+class FakeProvider(LLMProvider):
+    def __init__(self, name: str, tool_name: str | None = None, message_format: str = "anthropic"):
+        self.name = name
+        self.tool_name = tool_name
+        self.message_format = message_format
+        self.seen: list[list] = []
+
+    def convert_tools(self, tools):
+        return tools
+
+    def format_tool_results(self, tool_results):
+        return []
+
+    def create_message(self, system, messages, tools):
+        self.seen.append(messages)
+        names = self.tool_name if isinstance(self.tool_name, tuple) else (self.tool_name,) if self.tool_name else ()
+        calls = [ToolCall(id=f"c{i}", name=name, input={}) for i, name in enumerate(names, 1)]
+        return AgentResponse(text_parts=[self.name], tool_calls=calls, model=self.name,
+                             raw_message={"role": "assistant", "content": self.name},
+                             usage=Usage(input_tokens=100, output_tokens=10))
+
+
+class TestRouting:
+    def _router(self, fast_tool=None, strong_tool=None):
+        router = RoutingProvider(FakeProvider("fast", fast_tool), FakeProvider("strong", strong_tool))
+        router.convert_tools([])
+        return router
+
+    def test_routing_turn_stays_on_fast_model(self):
+        router = self._router(fast_tool="call_skill")
+        response = router.create_message("sys", [{"role": "user", "content": "hi"}], [])
+        assert (response.model, response.phase) == ("fast", "route")
+        assert router.strong.seen == []
+
+    def test_codegen_escalates_then_returns_to_fast(self):
+        router = self._router(fast_tool="create_new_skill", strong_tool="create_new_skill")
+        response = router.create_message("sys", [{"role": "user", "content": "hi"}], [])
+        assert (response.model, response.phase) == ("strong", "codegen")
+
+        router.observe_tool_result(response.tool_calls[0], json.dumps({"status": "created"}))
+        router.fast.tool_name = "call_skill"
+        assert router.create_message("sys", [], []).model == "fast"
+
+    def test_streams_until_the_codegen_call_and_bills_the_discarded_turn(self):
+        router = self._router(fast_tool="create_new_skill", strong_tool="create_new_skill")
+        shown, dispatched = [], []
+        response = router.stream_message("sys", [], [], on_text=shown.append, on_tool_call=dispatched.append)
+        assert shown == ["fast", "strong"]  # the fast model's text before its codegen call still streams
+        assert [(tc.id, tc.name) for tc in dispatched] == [("c1", "create_new_skill")]  # the strong model's call
+        assert (response.model, response.discarded.model, response.discarded.usage.input_tokens) == ("strong", "fast", 100)
+
+        router.observe_tool_result(response.tool_calls[0], json.dumps({"status": "created"}))
+        router.fast.tool_name = "call_skill"
+        shown.clear()
+        response = router.stream_message("sys", [], [], on_text=shown.append)
+        assert (shown, response.discarded) == (["fast"], None)
+
+    def test_calls_already_dispatched_end_the_turn_before_escalating(self):
+        router = self._router(fast_tool=("call_skill", "create_new_skill"), strong_tool="create_new_skill")
+        dispatched = []
+        response = router.stream_message("sys", [], [], on_tool_call=dispatched.append)
+        assert [tc.name for tc in dispatched] == [tc.name for tc in response.tool_calls] == ["call_skill"]
+        assert [b["name"] for b in response.raw_message["content"] if b["type"] == "tool_use"] == ["call_skill"]
+        assert router.strong.seen == []
+        assert router.stream_message("sys", [], []).model == "strong"  # the codegen call goes to the next turn
+
+    def test_escalation_lasts_one_turn(self):
+        router = self._router(fast_tool="create_new_skill", strong_tool="create_new_skill")
+        response = router.create_message("sys", [], [])
+        router.observe_tool_result(response.tool_calls[0], json.dumps({"error": "build failed"}))
+        router.strong.tool_name = None  # the strong model answers without building
+        assert router.stream_message("sys", [], []).model == "strong"
+        router.fast.tool_name = "call_skill"
+        assert router.stream_message("sys", [], []).model == "fast"
+
+    def test_failed_build_keeps_strong_model(self):
+        router = self._router(fast_tool="create_new_skill", strong_tool="create_new_skill")
+        response = router.create_message("sys", [], [])
+        router.observe_tool_result(response.tool_calls[0], json.dumps({"error": "build failed"}))
+        assert router.create_message("sys", [], []).model == "strong"
+        assert len(router.fast.seen) == 1
+
+    def test_openai_provider_gets_translated_history(self):
+        router = RoutingProvider(FakeProvider("fast", message_format="openai"), FakeProvider("strong"))
+        router.convert_tools([])
+        response = router.create_message("sys", [{"role": "user", "content": "hi"}], [])
+        assert response.raw_message == {"role": "assistant", "content": [{"type": "text", "text": "fast"}]}
+
+
+class TestMessageTranslation:
+    def test_tool_exchange_round_trip(self):
+        messages = [
+            {"role": "user", "content": "hi"},
+            {"role": "assistant", "content": [
+                {"type": "text", "text": "checking"},
+                {"type": "tool_use", "id": "t1", "name": "list_available_skills", "input": {}},
+            ]},
+            {"role": "user", "content": [{"type": "tool_result", "tool_use_id": "t1", "content": "[]"}]},
+        ]
+        assert _to_openai_messages(messages) == [
+            {"role": "user", "content": "hi"},
+            {"role": "assistant", "content": "checking", "tool_calls": [
+                {"id": "t1", "type": "function", "function": {"name": "list_available_skills", "arguments": "{}"}},
+            ]},
+            {"role": "tool", "tool_call_id": "t1", "content": "[]"},
+        ]
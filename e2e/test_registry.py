@@ -2,10 +2,12 @@
 Test the Skill Registry: register, lookup, list, health check, and pruning.
 """
 
+import threading
+
 import docker
 import pytest
 
-from models.skill import SkillSpec, SkillStatus
+from models.skill import Skill, SkillSpec, SkillStatus
 from orchestrator.registry import SkillRegistry
 from skill_factory.factory import build_and_run, remove_skill
 
@@ -76,3 +78,45 @@ class TestRegistryHealthCheck:
         pruned = registry.health_check()
         assert "test-greeter" in pruned
         assert registry.lookup("test-greeter").status == SkillStatus.STOPPED
+
+
+def _fake_skill(container_id: str, version: int = 1) -> Skill:
+    return Skill(name="svc", description="d", endpoint="", port=0, container_id=container_id,
+                 version=version, status=SkillStatus.RUNNING)
+
+
+class TestRegistryBlueGreen:
+    """Unit tests — no Docker needed."""
+
+    def test_swap_returns_previous_version(self, registry):
+        registry.register(_fake_skill("blue"))
+        previous = registry.swap(_fake_skill("green", version=2))
+        assert previous.container_id == "blue"
+        assert registry.lookup("svc").container_id == "green"
+
+    def test_drain_waits_for_inflight_calls(self, registry):
+        blue = _fake_skill("blue")
+        registry.register(blue)
+        release = threading.Event()
+        leased = threading.Event()
+
+        def call():
+            with registry.lease("svc"):
+                leased.set()
+                release.wait()
+
+        caller = threading.Thread(target=call)
+        caller.start()
+        leased.wait()
+        registry.swap(_fake_skill("green", version=2))
+
+        assert registry.drain(blue, timeout=0.05) is False
+        with registry.lease("svc") as skill:  # new calls go to green
+            assert skill.container_id == "green"
+        release.set()
+        assert registry.drain(blue, timeout=2) is True
+        caller.join()
+
+    def test_lease_missing_skill_yields_none(self, registry):
+        with registry.lease("nope") as skill:
+            assert skill is None
@@ -0,0 +1,66 @@
+"""
+Test speculative candidate builds with a fake builder — no Docker needed.
+"""
+
+import threading
+import time
+
+import pytest
+
+from bench.fakes import make_spec
+from models.skill import Skill, SkillStatus
+from orchestrator import speculative
+
+
+@pytest.fixture
+def fake_builds(monkeypatch):
+    """Builds sleep for the number of seconds named in execute_code; 'fail' raises.
+
+    Returns wait_removed(n): the removed instances, once n of them have been torn down.
+    """
+    removed: list[str] = []
+    changed = threading.Condition()
+
+    def build_verified(spec, instance=None, smoke_payload=None):
+        if spec.execute_code == "fail":
+            raise RuntimeError("bad code")
+        time.sleep(float(spec.execute_code))
+        return Skill(name=spec.name, description=spec.description, endpoint="", port=0,
+                     container_id=instance, status=SkillStatus.RUNNING)
+
+    def remove_skill(skill):
+        with changed:
+            removed.append(skill.container_id)
+            changed.notify_all()
+
+    def wait_removed(count, timeout=5.0):
+        with changed:
+            changed.wait_for(lambda: len(removed) >= count, timeout)
+        return sorted(removed)
+
+    monkeypatch.setattr(speculative, "build_verified", build_verified)
+    monkeypatch.setattr(speculative, "remove_skill", remove_skill)
+    return wait_removed
+
+
+class TestRaceCandidates:
+    def test_fastest_candidate_wins_and_losers_are_removed(self, fake_builds):
+        candidates = {2: make_spec("adder", "0.01"), 3: make_spec("adder", "0.3")}
+        skill = speculative.race_candidates(make_spec("adder", "0.5"), candidates.__getitem__, count=3)
+        assert skill.container_id == "c2"
+
+        # the slower builds are torn down in the background as they finish
+        assert fake_builds(2) == ["c1", "c3"]
+
+    def test_failed_candidates_fall_through(self, fake_builds):
+        skill = speculative.race_candidates(make_spec("adder", "fail"), lambda i: make_spec("adder", "0.01"), count=2)
+        assert skill.container_id == "c2"
+
+    def test_all_failures_reported(self, fake_builds):
+        def generate(i):
+            raise RuntimeError("no tool call")
+
+        with pytest.raises(RuntimeError, match="All candidates failed") as exc:
+            speculative.race_candidates(make_spec("adder", "fail"), generate, count=2)
+        assert "bad code" in str(exc.value)
+        assert "no tool call" in str(exc.value)
@@ -0,0 +1,50 @@
+"""
+Test that starting Helix stays cheap — heavy integrations are imported on first use, not at startup.
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from orchestrator import providers
+
+ROOT = Path(__file__).parent.parent
+DEFERRED = ["telegram", "docker", "jinja2", "anthropic", "openai", "http.server"]
+IMPORT_BUDGET_S = 1.5  # generous: a cold `import main` takes ~0.35s here
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import main
+print(json.dumps({"seconds": time.perf_counter() - started, "modules": sorted(sys.modules)}))
+"""
+
+
+def _import_main() -> dict:
+    out = subprocess.run([sys.executable, "-c", _PROBE], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+class TestStartup:
+    def test_heavy_modules_not_imported(self):
+        loaded = set(_import_main()["modules"])
+        assert [name for name in DEFERRED if name in loaded] == []
+
+    def test_import_time_budget(self):
+        fastest = min(_import_main()["seconds"] for _ in range(3))
+        assert fastest < IMPORT_BUDGET_S, f"import main took {fastest:.2f}s"
+
+    def test_sdk_providers_are_shared(self, monkeypatch):
+        built = []
+
+        class FakeProvider:
+            def __init__(self, model):
+                built.append(model)
+
+        monkeypatch.setitem(providers._PROVIDERS, "fake", FakeProvider)
+        monkeypatch.setattr(providers, "_instances", {})
+        first = providers._make_provider("fake:small")
+        assert providers._make_provider("fake:small") is first
+        assert providers._make_provider("fake:large") is not first
+        assert built == ["small", "large"]
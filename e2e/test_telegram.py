@@ -0,0 +1,156 @@
+"""
+Test the Telegram dispatch layer and per-chat history with fake updates — no Telegram or API needed.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from integrations import telegram_bot
+from integrations.telegram_bot import ChatDispatcher
+from orchestrator.registry import SkillRegistry
+
+
+class Recorder:
+    """Jobs that log start/end and can be held open until released."""
+
+    def __init__(self):
+        self.log: list[str] = []
+        self.running = 0
+        self.peak = 0
+
+    def job(self, name: str, hold: float = 0.01):
+        async def run():
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            self.log.append(f"start {name}")
+            await asyncio.sleep(hold)
+            self.log.append(f"end {name}")
+            self.running -= 1
+        return run
+
+
+async def _settle(dispatcher: ChatDispatcher) -> None:
+    while dispatcher._workers:
+        await asyncio.sleep(0.005)
+
+
+class TestChatDispatcher:
+    def test_global_cap_and_per_chat_order(self):
+        async def scenario():
+            dispatcher, rec = ChatDispatcher(max_concurrent=2, max_queue_per_chat=10), Recorder()
+            for chat in (1, 2, 3):
+                for i in range(3):
+                    assert dispatcher.submit(chat, f"m{i}", rec.job(f"{chat}.{i}")) == ChatDispatcher.ACCEPTED
+            await _settle(dispatcher)
+            return rec
+
+        rec = asyncio.run(scenario())
+        assert rec.peak == 2
+        for chat in (1, 2, 3):
+            order = [entry for entry in rec.log if entry.split()[1].startswith(f"{chat}.")]
+            assert order == [f"{kind} {chat}.{i}" for i in range(3) for kind in ("start", "end")]
+
+    def test_busy_and_duplicates(self):
+        async def scenario():
+            dispatcher, rec = ChatDispatcher(max_concurrent=1, max_queue_per_chat=1, max_pending=2), Recorder()
+            outcomes = [dispatcher.submit(1, "a", rec.job("a", hold=0.05))]
+            await asyncio.sleep(0.01)  # a is running
+            outcomes += [
+                dispatcher.submit(1, "a ", rec.job("a again")),  # same text
+                dispatcher.submit(1, "b", rec.job("b")),  # waits
+                dispatcher.submit(1, "c", rec.job("c")),  # chat queue full
+                dispatcher.submit(2, "x", rec.job("x")),  # waits
+                dispatcher.submit(3, "y", rec.job("y")),  # two waiting overall
+            ]
+            await _settle(dispatcher)
+            return outcomes, rec, dispatcher._pending
+
+        outcomes, rec, pending = asyncio.run(scenario())
+        assert outcomes == ["accepted", "duplicate", "accepted", "busy", "accepted", "busy"]
+        assert rec.log.count("end b") == rec.log.count("end x") == 1
+        assert pending == 0
+
+    def test_repeated_text_runs_again_once_finished(self):
+        async def scenario():
+            dispatcher, rec = ChatDispatcher(), Recorder()
+            outcomes = [dispatcher.submit(1, "yes", rec.job("yes 1"), update_id=10)]
+            await _settle(dispatcher)
+            outcomes.append(dispatcher.submit(1, "yes", rec.job("yes 2"), update_id=11))  # answers a new question
+            outcomes.append(dispatcher.submit(1, "yes", rec.job("yes 2 again"), update_id=11))  # Telegram redelivery
+            await _settle(dispatcher)
+            outcomes.append(dispatcher.submit(1, "yes", rec.job("late redelivery"), update_id=10))
+            return outcomes, rec
+
+        outcomes, rec = asyncio.run(scenario())
+        assert outcomes == ["accepted", "accepted", "redelivered", "redelivered"]
+        assert [entry for entry in rec.log if entry.startswith("end")] == ["end yes 1", "end yes 2"]
+
+    def test_close_drops_waiting(self):
+        async def scenario():
+            dispatcher, rec = ChatDispatcher(max_concurrent=1), Recorder()
+            dispatcher.submit(1, "a", rec.job("a", hold=0.05))
+            dispatcher.submit(1, "b", rec.job("b"))
+            await asyncio.sleep(0.01)
+            await dispatcher.close()
+            return rec, dispatcher
+
+        rec, dispatcher = asyncio.run(scenario())
+        assert "start b" not in rec.log
+        assert not dispatcher.active(1)
+
+
+class FakeMessage:
+    def __init__(self, text, sent):
+        self.text = text
+        self.sent = sent
+
+    async def reply_text(self, text):
+        self.sent.append(text)
+        return SimpleNamespace(edit_text=self._noop, delete=self._noop)
+
+    async def _noop(self, *args):
+        pass
+
+
+class TestMessageHandler:
+    def test_history_is_kept_per_chat(self, monkeypatch):
+        calls = []
+
+        def fake_run_agent(text, registry, on_text=None, history=None, **kwargs):
+            calls.append((text, history))
+            return f"re: {text}"
+
+        monkeypatch.setattr(telegram_bot, "run_agent", fake_run_agent)
+        sent: list[str] = []
+
+        async def scenario():
+            dispatcher = ChatDispatcher()
+            handler = telegram_bot._make_message_handler(SkillRegistry(), dispatcher)
+            for update_id, (chat, text) in enumerate(((1, "first"), (2, "other"), (1, "second"))):
+                update = SimpleNamespace(message=FakeMessage(text, sent), effective_chat=SimpleNamespace(id=chat),
+                                         update_id=update_id)
+                await handler(update, None)
+            await _settle(dispatcher)
+
+        asyncio.run(scenario())
+        assert calls[-1] == ("second", [{"role": "user", "content": "first"}, {"role": "assistant", "content": "re: first"}])
+        assert ("other", []) in calls
+        assert "re: second" in sent
+        assert any(text.startswith("Queued") for text in sent)
+
+    def test_history_is_trimmed_to_budget_and_idle_chats_forgotten(self, monkeypatch):
+        histories = telegram_bot.ChatHistories(max_turns=3, max_tokens=100, idle_ttl=60)
+        for i in range(5):
+            histories.record(1, f"q{i}", f"a{i}")
+        assert [m["content"] for m in histories.get(1)] == ["q2", "a2", "q3", "a3", "q4", "a4"]
+
+        histories.record(1, "long", "x" * 1000)  # over budget on its own: only the newest exchange is kept
+        assert [m["content"] for m in histories.get(1)] == ["long", "x" * 1000]
+
+        clock = [time.monotonic()]
+        monkeypatch.setattr(telegram_bot.time, "monotonic", lambda: clock[0])
+        histories.record(2, "hi", "hello")
+        clock[0] += 61
+        histories.record(3, "new", "chat")
+        assert (histories.get(1), histories.get(2), len(histories)) == ([], [], 1)
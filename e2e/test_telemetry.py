@@ -0,0 +1,95 @@
+"""
+Test spans, the JSONL trace file and Prometheus exposition — no network needed
+beyond a localhost metrics server.
+"""
+
+import json
+import socket
+import threading
+
+import httpx
+import pytest
+
+import telemetry
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    telemetry.reset()
+    yield
+    telemetry.reset()
+
+
+class TestSpans:
+    def test_nested_spans_share_a_trace(self, tmp_path, monkeypatch):
+        trace_file = tmp_path / "traces.jsonl"
+        monkeypatch.setattr(telemetry.config, "TRACE_FILE", str(trace_file))
+        with telemetry.span("outer", user="u1") as outer:
+            with telemetry.span("inner") as inner:
+                inner.set(status=200)
+        telemetry.flush_traces()
+        records = [json.loads(line) for line in trace_file.read_text().splitlines()]
+        assert [r["name"] for r in records] == ["inner", "outer"]  # written as they finish
+        assert records[0]["trace_id"] == records[1]["trace_id"] == outer.trace_id
+        assert records[0]["parent_id"] == outer.span_id
+        assert records[0]["attrs"] == {"status": 200}
+        assert records[1]["attrs"] == {"user": "u1"}
+
+    def test_errors_are_recorded_and_reraised(self):
+        with pytest.raises(ValueError):
+            with telemetry.span("boom"):
+                raise ValueError("bad")
+        assert 'helix_span_errors_total{span="boom"} 1' in telemetry.render_prometheus()
+
+    def test_propagate_carries_the_parent_into_threads(self):
+        seen = []
+
+        def child():
+            with telemetry.span("child") as s:
+                seen.append(s)
+
+        with telemetry.span("parent") as parent:
+            thread = threading.Thread(target=telemetry.propagate(child))
+            thread.start()
+            thread.join()
+        assert seen[0].parent_id == parent.span_id
+
+    def test_trace_file_rotates(self, tmp_path, monkeypatch):
+        trace_file = tmp_path / "traces.jsonl"
+        monkeypatch.setattr(telemetry.config, "TRACE_FILE", str(trace_file))
+        monkeypatch.setattr(telemetry.config, "TRACE_FILE_MAX_BYTES", 300)
+        for i in range(10):
+            with telemetry.span("s", i=i):
+                pass
+        telemetry.flush_traces()
+        rotated = (tmp_path / "traces.jsonl.1").read_text().splitlines()
+        current = trace_file.read_text().splitlines()
+        assert rotated and current
+        assert json.loads(current[-1])["attrs"]["i"] == 9
+
+
+class TestPrometheus:
+    def test_histogram_and_counter_format(self):
+        telemetry.observe("helix_test_seconds", 0.02, span="x")
+        telemetry.observe("helix_test_seconds", 3, span="x")
+        telemetry.count("helix_tokens_total", 120, kind="input")
+        text = telemetry.render_prometheus()
+        assert "# TYPE helix_test_seconds histogram" in text
+        assert 'helix_test_seconds_bucket{span="x",le="0.025"} 1' in text
+        assert 'helix_test_seconds_bucket{span="x",le="+Inf"} 2' in text
+        assert 'helix_test_seconds_count{span="x"} 2' in text
+        assert 'helix_tokens_total{kind="input"} 120' in text
+
+    def test_metrics_endpoint(self):
+        assert telemetry.start_metrics_server(port=0) is None  # disabled
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        server = telemetry.start_metrics_server(port=port)
+        try:
+            telemetry.count("helix_up_total")
+            resp = httpx.get(f"http://127.0.0.1:{server.server_address[1]}/metrics")
+            assert resp.status_code == 200
+            assert "helix_up_total 1" in resp.text
+        finally:
+            server.shutdown()
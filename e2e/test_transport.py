@@ -0,0 +1,102 @@
+"""
+Test codec negotiation between the orchestrator and the rendered skill template,
+in-process through FastAPI's TestClient — no Docker needed.
+"""
+
+import pytest
+
+pytest.importorskip("fastapi")  # the skill runtime's own dependency, not the orchestrator's
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from models.skill import Skill, SkillSpec, SkillStatus  # noqa: E402
+from orchestrator import skill_client  # noqa: E402
+from skill_factory.factory import import_name, render_skill  # noqa: E402
+
+ROWS_CODE = 'rows = [{"id": i, "name": f"row {i}"} for i in range(body["n"])]\nreturn {"rows": rows}'
+
+
+def _load_app(spec: SkillSpec):
+    source = render_skill(spec)["main.py"]
+    namespace: dict = {}
+    exec(compile(source, "main.py", "exec"), namespace)
+    return namespace["app"]
+
+
+@pytest.fixture
+def skill_app():
+    return _load_app(SkillSpec(name="rows", description="rows", execute_code=ROWS_CODE))
+
+
+@pytest.fixture
+def client(skill_app, monkeypatch):
+    with TestClient(skill_app, base_url="http://skill") as client:  # runs the warmup lifespan
+        monkeypatch.setattr(skill_client, "_client", client)
+        yield client
+
+
+def _skill(client) -> Skill:
+    health = client.get("/health").json()
+    return Skill(name="rows", description="rows", endpoint="http://skill/execute", port=0,
+                 status=SkillStatus.RUNNING, codecs=health["codecs"], encodings=health["encodings"])
+
+
+class TestTransport:
+    def test_health_advertises_codecs(self, client):
+        health = client.get("/health").json()
+        assert "json" in health["codecs"]
+        assert "gzip" in health["encodings"]
+
+    def test_legacy_skill_gets_plain_json(self, client):
+        legacy = Skill(name="rows", description="rows", endpoint="http://skill/execute", port=0)
+        resp = skill_client.post_execute(legacy, {"n": 3})
+        assert resp.headers["content-type"] == "application/json"
+        assert skill_client.decode_response(resp)["rows"][2] == {"id": 2, "name": "row 2"}
+
+    def test_large_msgpack_round_trip(self, client):
+        pytest.importorskip("msgpack")
+        pytest.importorskip("zstandard")
+        payload = {"n": 5000, "padding": "x" * 50_000}  # compressed on the way in
+        body, headers = skill_client._encode_request(_skill(client), payload)
+        assert headers["content-encoding"] == "zstd"
+        assert len(body) < 10_000
+
+        resp = skill_client.post_execute(_skill(client), payload, binary=True)
+        assert resp.headers["content-type"] == "application/msgpack"
+        assert len(skill_client.decode_response(resp)["rows"]) == 5000
+
+    def test_gzip_request_body(self, client):
+        skill = _skill(client)
+        skill.codecs, skill.encodings = ["json"], ["gzip"]
+        resp = skill_client.post_execute(skill, {"n": 2, "padding": "y" * 50_000})
+        assert resp.status_code == 200
+        assert len(resp.json()["rows"]) == 2
+
+    def test_execute_errors_still_json(self, client):
+        resp = client.post("/execute", json={})
+        assert resp.status_code == 500
+        assert "error" in resp.json()
+
+
+class TestWarmup:
+    def test_health_unavailable_until_warm(self, skill_app):
+        client = TestClient(skill_app)  # lifespan not started
+        assert client.get("/health").status_code == 503
+        with client:
+            assert client.get("/health").status_code == 200
+
+    def test_warmup_payloads_run_and_fill_state(self):
+        code = '_state["calls"] = _state.get("calls", 0) + 1\nreturn {"calls": _state["calls"]}'
+        app = _load_app(SkillSpec(name="counter", description="c", execute_code=code,
+                                  dependencies=["helix-no-such-pkg>=1.0"], warmup_payloads=[{}, {}]))
+        with TestClient(app) as client:
+            warmup = client.get("/health").json()["warmup"]
+            assert "helix_no_such_pkg" in warmup.get("import_errors", {})  # reported, not fatal
+            assert "payload_errors" not in warmup
+            assert client.post("/execute", json={}).json() == {"calls": 3}  # warmup's _state is kept
+
+    def test_import_name(self):
+        assert import_name("Pillow>=10.0") == "PIL"
+        assert import_name("beautifulsoup4") == "bs4"
+        assert import_name("requests[socks]") == "requests"
+        assert import_name("typing-extensions==4.9") == "typing_extensions"
@@ -0,0 +1,473 @@
+"""
+Helix HTTP API
+
+Standalone: python -m integrations.api_server
+
+Agent tasks and skill calls are submitted as jobs and run on a shared worker pool;
+submissions return a job id at once. Skills can also be called directly, without
+the LLM or the queue.
+
+    POST /v1/tasks                    {"task": "..."} -> 202 {"job_id", "status"}
+    POST /v1/batch                    JSONL, one {"task": ...} or {"skill": ..., "payload": {...}} per line
+    GET  /v1/jobs/<id>                status, result or error, artifacts
+    GET  /v1/jobs/<id>/events         Server-Sent Events: status changes, streamed model text, the final result
+    GET  /v1/skills                   registered skills
+    POST /v1/skills/<name>/execute    call a skill's /execute directly; its response is passed through
+    GET  /v1/artifacts/<digest>       download a binary skill output
+    GET  /health
+"""
+from dotenv import load_dotenv
+load_dotenv()
+
+import hmac  # noqa: E402
+import json  # noqa: E402
+import logging  # noqa: E402
+import queue  # noqa: E402
+import re  # noqa: E402
+import threading  # noqa: E402
+import time  # noqa: E402
+import uuid  # noqa: E402
+from collections import OrderedDict, deque  # noqa: E402
+from itertools import islice  # noqa: E402
+from dataclasses import dataclass, field  # noqa: E402
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # noqa: E402
+
+import config  # noqa: E402
+import telemetry  # noqa: E402
+from orchestrator.agent import run_agent  # noqa: E402
+from orchestrator.artifacts import get_artifact_store  # noqa: E402
+from orchestrator.registry import SkillRegistry  # noqa: E402
+from orchestrator.skill_client import decode_response, missing_codecs, post_execute  # noqa: E402
+from skill_factory.factory import remove_skill  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+SSE_HEARTBEAT = 15  # seconds between keep-alive comments on an idle event stream
+
+
+class QueueFull(Exception):
+    """Raised when a submission would exceed API_MAX_QUEUED waiting jobs."""
+
+
+@dataclass
+class Job:
+    spec: dict  # {"task": str} or {"skill": str, "payload": dict}
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    status: str = "queued"  # queued | running | done | failed
+    result: object = None
+    error: str | None = None
+    artifacts: list[dict] = field(default_factory=list)
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    # The newest API_JOB_MAX_EVENTS events; event_count numbers them from the job's start
+    events: deque[tuple[str, dict]] = field(default_factory=lambda: deque(maxlen=config.API_JOB_MAX_EVENTS))
+    event_count: int = 0
+    _changed: threading.Condition = field(default_factory=threading.Condition, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def emit(self, event: str, data: dict) -> None:
+        with self._changed:
+            self.events.append((event, data))
+            self.event_count += 1
+            self._changed.notify_all()
+
+    def set_status(self, status: str, **data) -> None:
+        with self._changed:  # readers that see the new status also see its event
+            self.status = status
+            self.emit("status", {"status": status, **data})
+
+    def events_since(self, index: int, timeout: float) -> tuple[list[tuple[str, dict]], int]:
+        """Events from index on and the index after them, waiting up to timeout for one if there are none yet.
+
+        A reader that fell more than API_JOB_MAX_EVENTS behind skips the events no longer kept.
+        """
+        with self._changed:
+            if self.event_count <= index and not self.finished:
+                self._changed.wait(timeout)
+            first = self.event_count - len(self.events)
+            return list(islice(self.events, max(0, index - first), None)), self.event_count
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            **self.spec,
+            "result": self.result,
+            "error": self.error,
+            "artifacts": self.artifacts,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def parse_job_spec(spec) -> dict:
+    """Validate one submission. Raises ValueError with a message for the client."""
+    if isinstance(spec, dict) and isinstance(spec.get("task"), str) and spec["task"].strip():
+        return {"task": spec["task"]}
+    if isinstance(spec, dict) and isinstance(spec.get("skill"), str):
+        payload = spec.get("payload", {})
+        if not isinstance(payload, dict):
+            raise ValueError("'payload' must be a JSON object")
+        return {"skill": spec["skill"], "payload": payload}
+    raise ValueError('Each job needs {"task": "..."} or {"skill": "...", "payload": {...}}')
+
+
+class JobQueue:
+    """Jobs waiting for and running on a fixed pool of worker threads."""
+
+    def __init__(
+        self,
+        registry: SkillRegistry,
+        workers: int = config.API_WORKERS,
+        max_queued: int = config.API_MAX_QUEUED,
+        retention: int = config.API_JOB_RETENTION,
+        ttl: float = config.API_JOB_TTL,
+    ):
+        self.registry = registry
+        self.max_queued = max_queued
+        self.retention = retention
+        self.ttl = ttl
+        self._queue: queue.Queue[Job | None] = queue.Queue()
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._waiting = 0
+        self._lock = threading.Lock()
+        self._workers = [
+            threading.Thread(target=self._work, name=f"api-worker-{i}", daemon=True) for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, specs: list[dict]) -> list[Job]:
+        """Queue jobs for already-validated specs, all or none. Raises QueueFull."""
+        jobs = [Job(spec) for spec in specs]
+        with self._lock:
+            if self._waiting + len(jobs) > self.max_queued:
+                raise QueueFull(f"{self._waiting} job(s) already waiting (limit {self.max_queued})")
+            self._waiting += len(jobs)
+            for job in jobs:
+                self._jobs[job.id] = job
+            self._forget_old()
+        for job in jobs:
+            self._queue.put(job)
+        telemetry.count("helix_api_jobs_total", len(jobs))
+        return jobs
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            running = sum(1 for job in self._jobs.values() if job.status == "running")
+            return {"waiting": self._waiting, "running": running, "workers": len(self._workers)}
+
+    def close(self) -> None:
+        """Let running jobs finish, drop waiting ones and stop the workers."""
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                self._finish(job, error="server shutting down")
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join(timeout=5)
+
+    def _forget_old(self) -> None:
+        """Drop finished jobs past their TTL, then the oldest beyond the retention count."""
+        expired = time.time() - self.ttl
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for index, job_id in enumerate(finished):
+            if index < len(finished) - self.retention or self._jobs[job_id].finished_at < expired:
+                del self._jobs[job_id]
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            with self._lock:
+                self._waiting -= 1
+            job.started_at = time.time()
+            job.set_status("running")
+            try:
+                with telemetry.span("api.job", kind="task" if "task" in job.spec else "skill"):
+                    if "task" in job.spec:
+                        self._run_task(job)
+                    else:
+                        self._run_skill(job)
+            except Exception as e:
+                self._finish(job, error=str(e))
+            else:
+                self._finish(job)
+
+    def _run_task(self, job: Job) -> None:
+        artifacts = []
+        job.result = run_agent(job.spec["task"], self.registry, on_text=lambda delta: job.emit("text", {"delta": delta}),
+                               _artifact_sink=artifacts)
+        seen = set()
+        for artifact in artifacts:
+            if artifact.digest not in seen:
+                seen.add(artifact.digest)
+                job.artifacts.append({**artifact.ref(), "url": f"/v1/artifacts/{artifact.digest}"})
+
+    def _run_skill(self, job: Job) -> None:
+        with self.registry.lease(job.spec["skill"]) as skill:
+            if skill is None:
+                raise LookupError(f"Skill '{job.spec['skill']}' not found in registry.")
+            resp = post_execute(skill, job.spec["payload"])
+        if resp.status_code >= 400:
+            raise RuntimeError(f"Skill returned HTTP {resp.status_code}: {resp.text[:500]}")
+        job.result = decode_response(resp)
+
+    def _finish(self, job: Job, error: str | None = None) -> None:
+        job.error = error
+        job.finished_at = time.time()
+        if job.started_at is None:
+            with self._lock:
+                self._waiting -= 1
+        if "task" in job.spec and not error:
+            job.emit("result", {"text": job.result})  # for readers whose text deltas were dropped
+        job.set_status("failed" if error else "done", **({"error": error} if error else {}))
+        with self._lock:
+            self._forget_old()
+
+
+# --- HTTP ---
+
+class ApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], registry: SkillRegistry, jobs: JobQueue, token: str = config.API_TOKEN):
+        super().__init__(address, _Handler)
+        self.registry = registry
+        self.jobs = jobs
+        self.token = token
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: ApiServer
+
+    ROUTES = [
+        ("GET", re.compile(r"/health"), "_health"),
+        ("POST", re.compile(r"/v1/tasks"), "_submit_task"),
+        ("POST", re.compile(r"/v1/batch"), "_submit_batch"),
+        ("GET", re.compile(r"/v1/jobs/(\w+)"), "_get_job"),
+        ("GET", re.compile(r"/v1/jobs/(\w+)/events"), "_job_events"),
+        ("GET", re.compile(r"/v1/skills"), "_list_skills"),
+        ("POST", re.compile(r"/v1/skills/([\w.\-]+)/execute"), "_execute_skill"),
+        ("GET", re.compile(r"/v1/artifacts/([0-9a-f]{64})"), "_get_artifact"),
+    ]
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_POST(self):
+        self._route("POST")
+
+    def _route(self, method: str) -> None:
+        path = self.path.split("?", 1)[0]
+        if self.server.token and path != "/health" and not self._authorized():
+            self._send_json(401, {"error": "Missing or wrong bearer token."})
+            return
+        for route_method, pattern, name in self.ROUTES:
+            match = pattern.fullmatch(path)
+            if match and route_method == method:
+                try:
+                    getattr(self, name)(*match.groups())
+                except Exception as e:
+                    logger.exception("API %s %s failed", method, path)
+                    self._send_json(500, {"error": str(e)})
+                return
+        self._send_json(404, {"error": f"No route for {method} {path}"})
+
+    # --- helpers ---
+
+    def _authorized(self) -> bool:
+        supplied = self.headers.get("Authorization", "").encode()
+        return hmac.compare_digest(supplied, f"Bearer {self.server.token}".encode())
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload) -> None:
+        self._send(status, json.dumps(payload, default=str).encode(), "application/json")
+
+    def _read_body(self) -> bytes | None:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        # The body isn't read on these errors, so the connection can't be reused
+        if length < 0:
+            self.close_connection = True
+            self._send_json(400, {"error": "Invalid Content-Length."})
+            return None
+        if length > config.API_MAX_BODY_BYTES:
+            self.close_connection = True
+            self._send_json(413, {"error": f"Body larger than {config.API_MAX_BODY_BYTES} bytes."})
+            return None
+        return self.rfile.read(length)
+
+    def _read_json(self):
+        body = self._read_body()
+        if body is None:
+            return None
+        try:
+            return json.loads(body or b"{}")
+        except ValueError as e:
+            self._send_json(400, {"error": f"Invalid JSON: {e}"})
+            return None
+
+    def _queue(self, specs: list[dict]) -> list[Job] | None:
+        try:
+            return self.server.jobs.submit(specs)
+        except QueueFull as e:
+            self._send_json(429, {"error": f"Too many queued jobs: {e}. Retry later."})
+            return None
+
+    # --- routes ---
+
+    def _health(self) -> None:
+        self._send_json(200, {"status": "ok", "skills": len(self.server.registry.skills()), **self.server.jobs.stats()})
+
+    def _submit_task(self) -> None:
+        body = self._read_json()
+        if body is None:
+            return
+        try:
+            spec = parse_job_spec(body)
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        jobs = self._queue([spec])
+        if jobs:
+            self._send_json(202, {"job_id": jobs[0].id, "status": jobs[0].status})
+
+    def _submit_batch(self) -> None:
+        body = self._read_body()
+        if body is None:
+            return
+        specs = []
+        for number, line in enumerate(body.decode("utf-8", errors="replace").splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                specs.append(parse_job_spec(json.loads(line)))
+            except ValueError as e:
+                self._send_json(400, {"error": f"Line {number}: {e}"})
+                return
+        if not specs:
+            self._send_json(400, {"error": "Empty batch."})
+            return
+        jobs = self._queue(specs)
+        if jobs:
+            self._send_json(202, {"job_ids": [job.id for job in jobs]})
+
+    def _job_or_404(self, job_id: str) -> Job | None:
+        job = self.server.jobs.get(job_id)
+        if job is None:
+            self._send_json(404, {"error": f"Unknown job '{job_id}'."})
+        return job
+
+    def _get_job(self, job_id: str) -> None:
+        job = self._job_or_404(job_id)
+        if job:
+            self._send_json(200, job.to_dict())
+
+    def _job_events(self, job_id: str) -> None:
+        job = self._job_or_404(job_id)
+        if job is None:
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        index = 0
+        try:
+            while True:
+                events, index = job.events_since(index, SSE_HEARTBEAT)
+                if not events:
+                    self.wfile.write(b": keep-alive\n\n")
+                for event, data in events:
+                    self.wfile.write(f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode())
+                self.wfile.flush()
+                if job.finished and index >= job.event_count:
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client went away; the job keeps running
+
+    def _list_skills(self) -> None:
+        self._send_json(200, self.server.registry.list_skills())
+
+    def _execute_skill(self, name: str) -> None:
+        payload = self._read_json()
+        if payload is None:
+            return
+        if not isinstance(payload, dict):
+            self._send_json(400, {"error": "The payload must be a JSON object."})
+            return
+        with self.server.registry.lease(name) as skill:
+            if skill is None:
+                self._send_json(404, {"error": f"Skill '{name}' not found in registry."})
+                return
+            resp = post_execute(skill, payload)
+        self._send(resp.status_code, resp.content, resp.headers.get("content-type", "application/json"))
+
+    def _get_artifact(self, digest: str) -> None:
+        artifact = get_artifact_store().get(digest)
+        if artifact is None or not artifact.path.exists():
+            self._send_json(404, {"error": f"Unknown artifact '{digest}'."})
+            return
+        self._send(200, artifact.path.read_bytes(), artifact.mime)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def serve(registry: SkillRegistry, host: str = config.API_HOST, port: int = config.API_PORT) -> ApiServer:
+    """Start the API in a daemon thread. Returns the server; call shutdown_api() to stop it."""
+    server = ApiServer((host, port), registry, JobQueue(registry))
+    threading.Thread(target=server.serve_forever, name="api", daemon=True).start()
+    return server
+
+
+def shutdown_api(server: ApiServer) -> None:
+    server.shutdown()
+    server.jobs.close()
+    server.server_close()
+
+
+# --- Standalone mode ---
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        level=logging.INFO,
+    )
+    telemetry.start_metrics_server()
+    if missing_codecs():
+        logger.warning("Skill transport falls back to JSON: %s not installed", ", ".join(missing_codecs()))
+    _registry = SkillRegistry()
+    _server = serve(_registry)
+    logger.info("Helix API listening on http://%s:%s", *_server.server_address[:2])
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        shutdown_api(_server)
+        for _skill in _registry.skills():
+            try:
+                remove_skill(_skill)
+            except Exception:
+                pass
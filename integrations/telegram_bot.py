@@ -9,7 +9,12 @@ load_dotenv()
 
 import asyncio  # noqa: E402
 import logging  # noqa: E402
+import mimetypes  # noqa: E402
 import threading  # noqa: E402
+import time  # noqa: E402
+from collections import OrderedDict, deque  # noqa: E402
+from typing import Awaitable, Callable  # noqa: E402
+from urllib.parse import urlparse  # noqa: E402
 
 from telegram import Update  # noqa: E402
 from telegram.ext import (  # noqa: E402
@@ -21,7 +26,9 @@ from telegram.ext import (  # noqa: E402
 )
 
 import config  # noqa: E402
+import telemetry  # noqa: E402
 from orchestrator.agent import run_agent  # noqa: E402
+from orchestrator.context import estimate_tokens  # noqa: E402
 from orchestrator.registry import SkillRegistry  # noqa: E402
 from skill_factory.factory import remove_skill  # noqa: E402
 
@@ -73,19 +80,208 @@ def _make_clear_handler(registry: SkillRegistry):
     return handler
 
 
-def _make_message_handler(registry: SkillRegistry):
-    async def handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-        user_text = update.message.text
-        thinking_msg = await update.message.reply_text("Working on it... (this may take a minute)")
+class _StreamingReply:
+    """Mirror streamed model text into the "Working on it..." message.
+
+    on_text is called from the agent's worker thread; edits are scheduled onto the
+    bot's event loop and throttled to stay under Telegram's edit rate limits.
+    """
+
+    EDIT_INTERVAL = 1.5  # seconds between message edits
+
+    def __init__(self, message, loop: asyncio.AbstractEventLoop):
+        self._message = message
+        self._loop = loop
+        self._text = ""
+        self._last_edit = 0.0
 
+    def on_text(self, delta: str) -> None:
+        self._text += delta
+        now = time.monotonic()
+        if now - self._last_edit < self.EDIT_INTERVAL or not self._text.strip():
+            return
+        self._last_edit = now
+        asyncio.run_coroutine_threadsafe(self._edit(self._text[-4096:]), self._loop)
+
+    async def _edit(self, text: str) -> None:
         try:
-            response = await asyncio.to_thread(run_agent, user_text, registry)
+            await self._message.edit_text(text)
+        except Exception:
+            pass  # unchanged text, message deleted, or rate limited — the final reply still arrives
+
 
-            if len(response) <= 4096:
-                await update.message.reply_text(response)
+async def _send_artifacts(update: Update, artifacts: list) -> None:
+    """Deliver binary skill outputs as photos or documents, once each."""
+    seen = set()
+    for artifact in artifacts:
+        if artifact.digest in seen or not artifact.path.exists():
+            continue
+        seen.add(artifact.digest)
+        with artifact.path.open("rb") as f:
+            if artifact.mime in ("image/png", "image/jpeg", "image/webp", "image/gif"):
+                await update.message.reply_photo(f)
             else:
-                for i in range(0, len(response), 4096):
-                    await update.message.reply_text(response[i:i + 4096])
+                extension = mimetypes.guess_extension(artifact.mime) or ""
+                await update.message.reply_document(f, filename=f"{artifact.digest[:12]}{extension}")
+
+
+class ChatDispatcher:
+    """Schedules agent runs for incoming messages.
+
+    At most max_concurrent jobs run at once across all chats. Within a chat, jobs run
+    one at a time in arrival order. A message is refused as busy when its chat already
+    has max_queue_per_chat messages waiting, or max_pending are waiting overall. It is
+    a duplicate while the same chat's identical text is still waiting or running, and
+    a redelivery if Telegram sent its update_id within dedupe_window seconds. All
+    methods must be called on the bot's event loop.
+    """
+
+    ACCEPTED = "accepted"
+    BUSY = "busy"
+    DUPLICATE = "duplicate"
+    REDELIVERED = "redelivered"
+
+    def __init__(
+        self,
+        max_concurrent: int = config.TELEGRAM_MAX_CONCURRENT,
+        max_queue_per_chat: int = config.TELEGRAM_MAX_QUEUE_PER_CHAT,
+        max_pending: int = config.TELEGRAM_MAX_PENDING,
+        dedupe_window: float = config.TELEGRAM_DEDUPE_WINDOW,
+    ):
+        self.max_queue_per_chat = max_queue_per_chat
+        self.max_pending = max_pending
+        self.dedupe_window = dedupe_window
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._queues: dict[int, deque] = {}  # chat -> (job, text, submitted_at) waiting to run
+        self._running: dict[int, str] = {}  # chat -> text of the job running now
+        self._workers: dict[int, asyncio.Task] = {}  # chat -> task draining its queue
+        self._seen_updates: dict[int, float] = {}  # update_id -> when accepted
+        self._pending = 0
+
+    def active(self, chat_id: int) -> bool:
+        """Whether the chat has a message running or waiting."""
+        return chat_id in self._workers
+
+    def _in_flight(self, chat_id: int, text: str) -> bool:
+        waiting = (queued_text for _, queued_text, _ in self._queues.get(chat_id, ()))
+        return self._running.get(chat_id) == text or text in waiting
+
+    def submit(self, chat_id: int, text: str, job: Callable[[], Awaitable[None]], update_id: int | None = None) -> str:
+        """Queue job for the chat. Returns ACCEPTED, BUSY, DUPLICATE or REDELIVERED."""
+        now = time.monotonic()
+        self._seen_updates = {uid: at for uid, at in self._seen_updates.items() if now - at < self.dedupe_window}
+        text = text.strip()
+        if update_id is not None and update_id in self._seen_updates:
+            outcome = self.REDELIVERED
+        elif self._in_flight(chat_id, text):
+            outcome = self.DUPLICATE
+        elif len(self._queues.get(chat_id, ())) >= self.max_queue_per_chat or self._pending >= self.max_pending:
+            outcome = self.BUSY
+        else:
+            outcome = self.ACCEPTED
+            if update_id is not None:
+                self._seen_updates[update_id] = now
+            self._queues.setdefault(chat_id, deque()).append((job, text, now))
+            self._pending += 1
+            if chat_id not in self._workers:
+                self._workers[chat_id] = asyncio.get_running_loop().create_task(self._drain(chat_id))
+        telemetry.count("helix_telegram_messages_total", outcome=outcome)
+        return outcome
+
+    async def _drain(self, chat_id: int) -> None:
+        queue = self._queues[chat_id]
+        try:
+            while queue:
+                async with self._slots:
+                    job, self._running[chat_id], submitted_at = queue.popleft()
+                    self._pending -= 1
+                    telemetry.observe("helix_telegram_queue_wait_seconds", time.monotonic() - submitted_at)
+                    try:
+                        await job()
+                    except Exception:
+                        logger.exception("Telegram job for chat %s failed", chat_id)
+                    finally:
+                        del self._running[chat_id]
+        finally:
+            self._pending -= len(queue)
+            del self._queues[chat_id]
+            del self._workers[chat_id]
+
+    async def close(self) -> None:
+        """Drop waiting messages and stop the workers. Agent runs already in a thread finish on their own."""
+        workers = list(self._workers.values())
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+class ChatHistories:
+    """Recent exchanges per chat, sent back to the model as history.
+
+    Each chat keeps at most max_turns exchanges and max_tokens of text, dropping the
+    oldest first; a chat idle for idle_ttl seconds is forgotten. Only touched on the
+    bot's event loop.
+    """
+
+    def __init__(
+        self,
+        max_turns: int = config.TELEGRAM_HISTORY_TURNS,
+        max_tokens: int = config.TELEGRAM_HISTORY_MAX_TOKENS,
+        idle_ttl: float = config.TELEGRAM_HISTORY_IDLE_TTL,
+    ):
+        self.max_turns = max_turns
+        self.max_tokens = max_tokens
+        self.idle_ttl = idle_ttl
+        self._chats: OrderedDict[int, tuple[deque, float]] = OrderedDict()  # least recently active first
+
+    def __len__(self) -> int:
+        return len(self._chats)
+
+    def get(self, chat_id: int) -> list[dict]:
+        self._forget_idle()
+        entry = self._chats.get(chat_id)
+        return [message for turn in entry[0] for message in turn] if entry else []
+
+    def record(self, chat_id: int, user_text: str, response: str) -> None:
+        """Add one exchange, then trim the chat back inside its turn and token limits."""
+        history = self._chats.pop(chat_id, (deque(), 0.0))[0]
+        history.append(({"role": "user", "content": user_text}, {"role": "assistant", "content": response}))
+        while len(history) > self.max_turns or (
+                len(history) > 1 and sum(estimate_tokens(m["content"]) for turn in history for m in turn) > self.max_tokens):
+            history.popleft()
+        self._chats[chat_id] = (history, time.monotonic())
+        self._forget_idle()
+
+    def _forget_idle(self) -> None:
+        now = time.monotonic()
+        while self._chats and now - next(iter(self._chats.values()))[1] > self.idle_ttl:
+            self._chats.popitem(last=False)
+
+
+async def _reply_chunked(update: Update, text: str) -> None:
+    for i in range(0, max(len(text), 1), 4096):
+        await update.message.reply_text(text[i:i + 4096] or "(no response)")
+
+
+def _make_message_handler(registry: SkillRegistry, dispatcher: ChatDispatcher):
+    histories = ChatHistories()  # a chat's jobs never overlap, so each sees its own last turn
+
+    async def run(update: Update, user_text: str) -> None:
+        chat_id = update.effective_chat.id
+        thinking_msg = await update.message.reply_text("Working on it... (this may take a minute)")
+        stream = _StreamingReply(thinking_msg, asyncio.get_running_loop())
+
+        artifacts = []
+
+        try:
+            response = await asyncio.to_thread(
+                run_agent, user_text, registry, on_text=stream.on_text, history=histories.get(chat_id),
+                _artifact_sink=artifacts,
+            )
+            if response.strip():
+                histories.record(chat_id, user_text, response)
+            await _reply_chunked(update, response)
+            await _send_artifacts(update, artifacts)
         except Exception as e:
             await update.message.reply_text(f"Error: {e}")
         finally:
@@ -93,35 +289,67 @@ def _make_message_handler(registry: SkillRegistry):
                 await thinking_msg.delete()
             except Exception:
                 pass
+
+    async def handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        user_text = update.message.text
+        chat_id = update.effective_chat.id
+        queued = dispatcher.active(chat_id)
+        outcome = dispatcher.submit(chat_id, user_text, lambda: run(update, user_text), update.update_id)
+        if outcome == ChatDispatcher.BUSY:
+            await update.message.reply_text("I'm busy with other messages right now. Please try again in a minute.")
+        elif outcome == ChatDispatcher.DUPLICATE:
+            await update.message.reply_text("Already on it.")
+        elif outcome == ChatDispatcher.ACCEPTED and queued:
+            await update.message.reply_text("Queued — I'll get to this after your previous message.")
     return handler
 
 
 # --- Bot lifecycle ---
 
 async def _run_bot_async(registry: SkillRegistry, stop_event: threading.Event) -> None:
-    """Build the Telegram app, start polling, wait for stop signal, shut down."""
+    """Build the Telegram app, start receiving updates, wait for stop signal, shut down."""
     app = ApplicationBuilder().token(config.TELEGRAM_BOT_TOKEN).build()
+    dispatcher = ChatDispatcher()
 
     app.add_handler(CommandHandler("start", _make_start_handler()))
     app.add_handler(CommandHandler("skills", _make_skills_handler(registry)))
     app.add_handler(CommandHandler("clear", _make_clear_handler(registry)))
-    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, _make_message_handler(registry)))
+    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, _make_message_handler(registry, dispatcher)))
 
     await app.initialize()
-    await app.updater.start_polling()
+    mode = await _start_updates(app)
     await app.start()
-    logger.info("Helix Telegram bot started (polling mode).")
+    logger.info("Helix Telegram bot started (%s mode).", mode)
 
     while not stop_event.is_set():
         await asyncio.sleep(0.5)
 
     logger.info("Telegram bot shutting down...")
+    await dispatcher.close()
     await app.updater.stop()
     await app.stop()
     await app.shutdown()
     logger.info("Telegram bot stopped.")
 
 
+async def _start_updates(app) -> str:
+    """Receive updates by webhook if TELEGRAM_WEBHOOK_URL is set, else by long polling."""
+    if config.TELEGRAM_WEBHOOK_URL:
+        try:
+            await app.updater.start_webhook(
+                listen=config.TELEGRAM_WEBHOOK_LISTEN,
+                port=config.TELEGRAM_WEBHOOK_PORT,
+                url_path=urlparse(config.TELEGRAM_WEBHOOK_URL).path.lstrip("/"),
+                webhook_url=config.TELEGRAM_WEBHOOK_URL,
+                secret_token=config.TELEGRAM_WEBHOOK_SECRET or None,
+            )
+            return "webhook"
+        except RuntimeError as e:  # python-telegram-bot[webhooks] not installed
+            logger.error("Webhook mode unavailable (%s); falling back to polling.", e)
+    await app.updater.start_polling()
+    return "polling"
+
+
 def start_bot(registry: SkillRegistry, stop_event: threading.Event) -> None:
     """Run the Telegram bot in the current thread (blocking).
 
@@ -150,6 +378,7 @@ if __name__ == "__main__":
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
         level=logging.INFO,
     )
+    telemetry.start_metrics_server()
     _standalone_registry = SkillRegistry()
     _stop = threading.Event()
     try:
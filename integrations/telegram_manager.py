@@ -3,7 +3,6 @@ import logging
 import threading
 
 from orchestrator.registry import SkillRegistry
-from integrations.telegram_bot import start_bot
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +23,8 @@ class TelegramManager:
             if self.is_running:
                 return "Telegram bot is already running."
 
+            from integrations.telegram_bot import start_bot  # python-telegram-bot is slow to import
+
             self._stop_event.clear()
             self._thread = threading.Thread(
                 target=start_bot,
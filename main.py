@@ -1,3 +1,4 @@
+import json
 import re
 from pathlib import Path
 
@@ -5,19 +6,27 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from rich.console import Console # noqa: E402
+from rich.table import Table  # noqa: E402
 
+import config  # noqa: E402
+import telemetry  # noqa: E402
 from orchestrator.agent import run_agent # noqa: E402
+from orchestrator.files import share_file  # noqa: E402
+from orchestrator.loadgen import LoadTestError, benchmark_skill  # noqa: E402
 from orchestrator.registry import SkillRegistry # noqa: E402
+from orchestrator.skill_client import missing_codecs  # noqa: E402
 from skill_factory.factory import remove_skill  # noqa: E402
+from skill_factory.gc import collect_garbage  # noqa: E402
 from integrations.telegram_manager import TelegramManager  # noqa: E402
 
 console = Console()
 
 
 def cleanup(registry: SkillRegistry) -> None:
-    """Stop and remove all running skill containers."""
+    """Stop and remove all running skill containers, then collect leftovers from crashed runs."""
     skills = registry.list_skills()
     if not skills:
+        collect_leftovers()
         return
     console.print(f"[yellow]Cleaning up {len(skills)} skill container(s)...[/yellow]")
     for skill_info in skills:
@@ -28,6 +37,16 @@ def cleanup(registry: SkillRegistry) -> None:
                 console.print(f"  Removed {skill.name}")
             except Exception:
                 pass
+    collect_leftovers()
+
+
+def collect_leftovers() -> None:
+    try:
+        report = collect_garbage([])
+    except Exception:
+        return
+    if report.freed_bytes:
+        console.print(f"[dim]GC: {report.summary()}[/dim]")
 
 
 HELIX_BANNER = r"""#########################################################################
@@ -47,8 +66,9 @@ HELIX_BANNER = r"""#############################################################
 
 
 def expand_file_references(text: str) -> str | None:
-    """Replace @filepath patterns with the file's contents.
+    """Replace @filepath patterns with a handle to the shared file and a short preview.
 
+    Skills read the file from the shared volume, so its size never reaches the prompt.
     Returns the expanded string, or None if a referenced file is missing.
     """
     pattern = r"@([\w./\-]+)"
@@ -61,12 +81,81 @@ def expand_file_references(text: str) -> str | None:
         if not path.exists():
             console.print(f"[red]File not found: {filepath}[/red]")
             return None
-        contents = path.read_text()
-        text = text.replace(f"@{filepath}", f"\n\n[Contents of {filepath}]:\n{contents}")
+        shared = share_file(path)
+        text = text.replace(f"@{filepath}", f"\n\n{shared.describe()}")
 
     return text
 
 
+def stream_text(delta: str) -> None:
+    """Print streamed model text as it arrives."""
+    console.print(delta, end="", markup=False, highlight=False)
+
+
+def print_artifacts(artifacts: list) -> None:
+    """List binary outputs produced during the turn, with where to find them on disk."""
+    seen = set()
+    for artifact in artifacts:
+        if artifact.digest in seen:
+            continue
+        seen.add(artifact.digest)
+        console.print(f"[magenta]Artifact ({artifact.mime}, {artifact.size} bytes): {artifact.path}[/magenta]")
+
+
+BENCH_USAGE = "Usage: bench <skill> [concurrency=N] [requests=N] [rate=R] [payload=JSON]"
+
+
+def parse_bench_command(text: str) -> dict | None:
+    """'bench qr concurrency=8 rate=50' -> benchmark_skill kwargs. None if not a well-formed bench command."""
+    head, has_payload, payload_text = text.partition(" payload=")
+    command, *args = head.split() or [""]
+    if command.lower() != "bench" or not args:
+        return None
+    kwargs: dict = {"name": args[0]}
+    try:
+        for option in args[1:]:
+            key, _, value = option.partition("=")
+            if key == "concurrency":
+                kwargs["concurrency"] = int(value)
+            elif key == "requests":
+                kwargs["requests_per_level"] = int(value)
+            elif key == "rate":
+                kwargs["rate"] = float(value)
+            else:
+                return None
+        if has_payload:
+            payload = json.loads(payload_text)
+            kwargs["payloads"] = payload if isinstance(payload, list) else [payload]
+    except ValueError:
+        return None
+    return kwargs
+
+
+def run_bench_command(kwargs: dict, registry: SkillRegistry) -> None:
+    """Load-test a skill from the prompt and print its saturation curve."""
+    try:
+        result = benchmark_skill(registry, **kwargs)
+    except LoadTestError as e:
+        console.print(f"[red]{e}[/red]")
+        return
+
+    table = Table(title=f"{kwargs['name']} v{result.version}")
+    for column in ("concurrency", "requests", "errors", "req/s", "p50 ms", "p95 ms", "p99 ms", "max ms"):
+        table.add_column(column, justify="right")
+    for level in result.levels:
+        table.add_row(*(str(v) for v in (level.concurrency, level.requests, level.errors, level.throughput_rps,
+                                         level.p50_ms, level.p95_ms, level.p99_ms, level.max_ms)))
+    console.print(table)
+    console.print(f"Peak {result.peak_throughput_rps} req/s, saturated at concurrency "
+                  f"{result.saturation_concurrency}, error rate {result.error_rate:.1%}")
+    console.print("[dim]Latency histogram: " + ", ".join(
+        f"≤{bound}ms: {n}" if bound != "+Inf" else f">{list(result.histogram_ms)[-2]}ms: {n}"
+        for bound, n in result.histogram_ms.items() if n
+    ) + "[/dim]")
+    for error in result.sample_errors:
+        console.print(f"[red]  {error}[/red]")
+
+
 def main():
     console.print(f"[green]{HELIX_BANNER}[/green]", highlight=False)
     console.print("\n\n")
@@ -76,6 +165,11 @@ def main():
 
     registry = SkillRegistry()
     telegram_manager = TelegramManager()
+    if telemetry.start_metrics_server():
+        console.print(f"[dim]Metrics: http://127.0.0.1:{config.METRICS_PORT}/metrics[/dim]")
+    if missing_codecs():
+        console.print(f"[yellow]Skill transport falls back to JSON: {', '.join(missing_codecs())} not installed "
+                      "(run `uv sync`)[/yellow]")
 
     try:
         while True:
@@ -85,14 +179,31 @@ def main():
                 continue
             if user_input.lower() in ("quit", "exit"):
                 break
+            # Only "bench <registered skill> [options]" is the command; anything else that
+            # starts with "bench" (e.g. "bench press tracker skill") goes to the agent
+            bench = parse_bench_command(user_input)
+            if bench is not None and registry.lookup(bench["name"]) is not None:
+                run_bench_command(bench, registry)
+                continue
+            if user_input.lower() == "bench":
+                console.print(f"[dim]{BENCH_USAGE}[/dim]")
+                continue
 
             user_input = expand_file_references(user_input)
             if user_input is None:
                 continue
 
+            artifacts = []
             try:
-                response = run_agent(user_input, registry, _telegram_manager=telegram_manager)
-                console.print(f"\n[bold]{response}[/bold]\n")
+                if config.STREAM_RESPONSES:
+                    run_agent(user_input, registry, on_text=stream_text,
+                              _telegram_manager=telegram_manager, _artifact_sink=artifacts)
+                    console.print()
+                else:
+                    response = run_agent(user_input, registry,
+                                         _telegram_manager=telegram_manager, _artifact_sink=artifacts)
+                    console.print(f"\n[bold]{response}[/bold]\n")
+                print_artifacts(artifacts)
             except Exception as e:
                 console.print(f"\n[red]Error: {e}[/red]\n")
     except KeyboardInterrupt:
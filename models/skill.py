@@ -11,16 +11,56 @@ class SkillStatus(str, Enum):
     FAILED = "failed"
 
 
+class LoadLevel(BaseModel):
+    """Load-test results at one concurrency level."""
+    concurrency: int
+    requests: int
+    errors: int
+    throughput_rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+class SkillBenchmark(BaseModel):
+    """Output of orchestrator.loadgen — a saturation curve plus latency histogram for one skill version."""
+    version: int
+    rate_limit_rps: Optional[float] = None  # None: each worker sends as fast as the skill answers
+    levels: list[LoadLevel]  # the saturation curve, by increasing concurrency
+    histogram_ms: dict[str, int]  # latency bucket upper bound in ms ("+Inf" last) -> calls, over all levels
+    error_rate: float
+    peak_throughput_rps: float
+    saturation_concurrency: int  # lowest concurrency reaching 90% of peak throughput
+    sample_errors: list[str] = Field(default_factory=list)
+    measured_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    def at_saturation(self) -> LoadLevel:
+        return next(level for level in self.levels if level.concurrency == self.saturation_concurrency)
+
+
 class Skill(BaseModel):
     name: str
     description: str
     endpoint: str  # e.g. "http://localhost:9001/execute"
     port: int
+    host: str = "local"  # name of the Docker host (skill_factory.hosts) the container runs on
     container_id: Optional[str] = None
     image_name: Optional[str] = None
     status: SkillStatus = SkillStatus.BUILDING
+    version: int = 1  # bumped by update_skill
+    resource_class: str = "small"  # key into config.RESOURCE_CLASSES
+    codecs: list[str] = Field(default_factory=lambda: ["json"])  # body formats /execute accepts
+    encodings: list[str] = Field(default_factory=list)  # request compressions /execute accepts
+    sample_payloads: list[dict] = Field(default_factory=list)  # smoke/warmup bodies, reused by load tests
+    benchmark: Optional[SkillBenchmark] = None  # latest load test of this version
+    spec: Optional["SkillSpec"] = None  # what this version was built from; update_skill starts from it
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+    def url(self, path: str) -> str:
+        """URL of another route on the skill's server, e.g. url("/health")."""
+        return self.endpoint.rsplit("/", 1)[0] + path
+
 
 class SkillSpec(BaseModel):
     """Input to the Skill Factory — what Claude provides when creating a new skill."""
@@ -29,3 +69,8 @@ class SkillSpec(BaseModel):
     execute_code: str  # the Python function body for the /execute handler
     view_post_code: str = "return HTMLResponse(_viewable_html)"  # handles form POST to /view
     dependencies: list[str] = Field(default_factory=list)  # extra pip packages needed
+    warmup_payloads: list[dict] = Field(default_factory=list)  # run through /execute at startup, before /health is ready
+    resource_class: Optional[str] = None  # "small" | "medium" | "large"; inferred from dependencies if unset
+
+
+Skill.model_rebuild()
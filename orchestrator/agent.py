@@ -1,13 +1,28 @@
 import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
 
-import httpx
 from rich.console import Console
 
 import config
-from models.skill import SkillSpec
-from orchestrator.providers import get_provider
+import telemetry
+from models.skill import Skill, SkillSpec
+from orchestrator.artifacts import Artifact, get_artifact_store
+from orchestrator.context import ContextBudget, estimate_tokens
+from orchestrator.loadgen import LoadTestError, benchmark_skill
+from orchestrator.profiler import ProfileError, get_profile_store, profile_skill
+from orchestrator.providers import AgentResponse, LLMProvider, ToolCall, get_provider
+from orchestrator.pipeline import PipelineError, run_pipeline
 from orchestrator.registry import SkillRegistry
-from skill_factory.factory import build_and_run
+from orchestrator.skill_client import post_execute
+from orchestrator.speculative import build_verified, race_candidates, smoke_test
+from skill_factory.factory import remove_skill
+from skill_factory.gc import maybe_collect_garbage
+from skill_factory.hosts import HostUnavailableError
+from skill_factory.packing import get_packer, packable
+from skill_factory.placement import PlacementError
 
 console = Console()
 
@@ -41,6 +56,46 @@ TOOLS = [
             "required": ["skill_name", "payload"],
         },
     },
+    {
+        "name": "run_pipeline",
+        "description": (
+            "Run several existing skills as one pipeline, passing data between them directly "
+            "instead of through you. Independent steps run concurrently. Returns the output "
+            "step's result plus the shape and timing of every step."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "steps": {
+                    "type": "array",
+                    "description": "The pipeline steps, in any order.",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "id": {"type": "string", "description": "Unique step id."},
+                            "skill": {"type": "string", "description": "Name of the skill to call."},
+                            "payload": {"type": "object", "description": "Static JSON body fields."},
+                            "inputs": {
+                                "type": "object",
+                                "description": (
+                                    "Maps a payload field to another step's output: 'step_id' for the "
+                                    "whole result or 'step_id.field.0.name' for part of it. Dotted "
+                                    "payload fields set nested values."
+                                ),
+                                "additionalProperties": {"type": "string"},
+                            },
+                        },
+                        "required": ["id", "skill"],
+                    },
+                },
+                "output": {
+                    "type": "string",
+                    "description": "Step whose result to return (default: every step no other step reads from).",
+                },
+            },
+            "required": ["steps"],
+        },
+    },
     {
         "name": "create_new_skill",
         "description": (
@@ -83,10 +138,181 @@ TOOLS = [
                     "items": {"type": "string"},
                     "description": "Extra pip packages needed (e.g. ['requests', 'pandas']).",
                 },
+                "smoke_payload": {
+                    "type": "object",
+                    "description": (
+                        "Optional sample request body. The skill is only accepted if calling "
+                        "/execute with it succeeds."
+                    ),
+                },
+                "warmup_payloads": {
+                    "type": "array",
+                    "items": {"type": "object"},
+                    "description": (
+                        "Optional representative request bodies run once at container startup, "
+                        "before the skill reports healthy, so the first real call is fast "
+                        "(e.g. loads models or caches). Whatever they store in _state is kept, "
+                        "so don't use them on skills whose _state holds user-visible data."
+                    ),
+                },
+                "resource_class": {
+                    "type": "string",
+                    "enum": list(config.RESOURCE_CLASSES),
+                    "description": (
+                        "CPU/memory limits for the container. Omit to infer from dependencies "
+                        "(ML frameworks -> large, data/image libraries -> medium, else small)."
+                    ),
+                },
             },
             "required": ["name", "description", "execute_code"],
         },
     },
+    {
+        "name": "update_skill",
+        "description": (
+            "Replace an existing skill's code without downtime. The new version is built and "
+            "health-checked next to the running one, then swapped in; the old version finishes "
+            "in-flight calls before it is stopped. Same code rules as create_new_skill. Fields "
+            "you leave out keep the current version's values."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "name": {
+                    "type": "string",
+                    "description": "Name of the skill to update.",
+                },
+                "execute_code": {
+                    "type": "string",
+                    "description": "The complete new /execute handler body.",
+                },
+                "description": {
+                    "type": "string",
+                    "description": "New description (defaults to the current one).",
+                },
+                "view_post_code": {
+                    "type": "string",
+                    "description": "New /view form POST handler (defaults to the current one).",
+                },
+                "dependencies": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "The complete list of extra pip packages for the new version (defaults to the current list).",
+                },
+                "smoke_payload": {
+                    "type": "object",
+                    "description": "Optional sample request body the new version must handle before the swap.",
+                },
+                "warmup_payloads": {
+                    "type": "array",
+                    "items": {"type": "object"},
+                    "description": "Optional request bodies run at startup before the new version reports healthy (defaults to the current ones).",
+                },
+                "resource_class": {
+                    "type": "string",
+                    "enum": list(config.RESOURCE_CLASSES),
+                    "description": "CPU/memory limits for the new version (defaults to the current version's).",
+                },
+            },
+            "required": ["name", "execute_code"],
+        },
+    },
+    {
+        "name": "benchmark_skill",
+        "description": (
+            "Load-test an existing skill: call /execute at rising concurrency (1, 2, 4, ...) and "
+            "report throughput, latency percentiles and error rate per level, the peak throughput "
+            "and the concurrency where the skill saturates. The result is stored with the skill. "
+            "Only run this when the user asks about a skill's performance or capacity."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "skill_name": {
+                    "type": "string",
+                    "description": "Name of the skill to load-test.",
+                },
+                "payloads": {
+                    "type": "array",
+                    "items": {"type": "object"},
+                    "description": "Request bodies to send, in rotation. Defaults to the skill's smoke/warmup payloads.",
+                },
+                "concurrency": {
+                    "type": "integer",
+                    "description": f"Highest concurrency to try (default {config.BENCH_MAX_CONCURRENCY}, max {config.BENCH_CONCURRENCY_LIMIT}).",
+                },
+                "requests_per_level": {
+                    "type": "integer",
+                    "description": f"Calls sent at each concurrency level (default {config.BENCH_REQUESTS_PER_LEVEL}).",
+                },
+                "rate": {
+                    "type": "number",
+                    "description": "Optional cap on requests per second.",
+                },
+            },
+            "required": ["skill_name"],
+        },
+    },
+    {
+        "name": "profile_skill",
+        "description": (
+            "Profile an existing skill's execute_code with cProfile: send a few profiled calls and "
+            "report where the time goes. Functions defined in execute_code are named "
+            "'execute_code:<line> (<name>)' by their line in your code. Use it on a slow skill "
+            "before rewriting it with update_skill."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "skill_name": {
+                    "type": "string",
+                    "description": "Name of the skill to profile.",
+                },
+                "payloads": {
+                    "type": "array",
+                    "items": {"type": "object"},
+                    "description": "Request bodies to profile, in rotation. Defaults to the skill's smoke/warmup payloads.",
+                },
+                "requests": {
+                    "type": "integer",
+                    "description": "Number of profiled calls to send (default 5).",
+                },
+                "live": {
+                    "type": "boolean",
+                    "description": (
+                        "true: also profile every real call from now on, collected at the next "
+                        "profile_skill; false: stop doing so."
+                    ),
+                },
+            },
+            "required": ["skill_name"],
+        },
+    },
+    {
+        "name": "fetch_tool_result",
+        "description": (
+            "Read part of a large tool result that was truncated or compacted. "
+            "Use the handle quoted in the truncated result."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "handle": {
+                    "type": "string",
+                    "description": "The handle from the truncated result (e.g. 'result-3').",
+                },
+                "offset": {
+                    "type": "integer",
+                    "description": "Character offset to start reading from (default 0).",
+                },
+                "length": {
+                    "type": "integer",
+                    "description": "Number of characters to read (capped at the result size limit).",
+                },
+            },
+            "required": ["handle"],
+        },
+    },
     {
         "name": "start_telegram_bot",
         "description": (
@@ -112,6 +338,10 @@ Each skill is a Docker container with a /execute endpoint. Follow this order str
 2. If a skill exists that can handle the task, call it. Do NOT create a duplicate.
 3. Only create a new skill if no existing skill can handle the task.
 
+When a task chains skills (e.g. parse a file, then chart it), prefer one run_pipeline call
+over several call_skill calls: the data moves between skills directly and you only see the
+final result. Create any missing skills first, then run the pipeline.
+
 When creating a skill:
 - Write clean Python for the execute_code field.
 - The code receives 'body' (a dict from the request JSON) and must return a dict.
@@ -119,6 +349,15 @@ When creating a skill:
 - Keep skills focused on a single capability.
 - NEVER start a new HTTP server inside execute_code. The container already runs a web server.
 
+Files the user attaches appear as [File ...: handle ..., path /data/... inside skill containers].
+You only see a preview. Skills read the file directly from that path (open(path),
+pandas.read_csv(path), or _mmap_file(path) for large files); pass the path in the payload.
+Never copy file contents into a payload.
+
+For binary outputs (images, PDFs, archives), do not return base64. Call
+_save_artifact(data_bytes, "image/png") in execute_code and put its return value in the result
+dict. The user receives the file directly; you see only its artifact id, type and size.
+
 If the task involves viewable content (HTML, a webpage, a chart):
 - Store the HTML in the _viewable_html global: _viewable_html = "<html>..."
 - Do NOT include 'global' declarations in your code — they are already declared in the handlers.
@@ -134,9 +373,22 @@ For interactive/stateful web pages (forms, to-do lists, counters, etc.):
 - HTML forms should POST to "/view" with action="/view" method="post".
 - Use name attributes on form inputs so they appear in form_data.
 
+To fix or change an existing skill, call update_skill with the full new code. It keeps serving
+the old version until the new one is healthy. If a skill is slow, call profile_skill first and
+rewrite the hot spots it reports.
+
 IMPORTANT: Never create a skill that duplicates an existing one. If a skill can do the job, use it.\
 """
 
+CANDIDATE_PROMPT = """\
+You are writing one of several independent implementations of a Helix skill. They are built
+in parallel and the first one that builds and passes its checks is kept.
+Call create_new_skill exactly once. Keep the same input and output format as the reference,
+but where reasonable take a different approach (other libraries, simpler code) so that a
+mistake in the reference is unlikely to repeat. The same rules apply as for any skill:
+execute_code receives 'body' (a dict) and must return a dict, and must not start a server.\
+"""
+
 
 # --- Tool handlers ---
 
@@ -147,50 +399,278 @@ def handle_list_skills(registry: SkillRegistry, **kwargs) -> str:
     return json.dumps(skills, indent=2)
 
 
-def handle_call_skill(registry: SkillRegistry, skill_name: str, payload: dict, **kwargs) -> str:
-    skill = registry.lookup(skill_name)
-    if skill is None:
-        return json.dumps({"error": f"Skill '{skill_name}' not found in registry."})
+def _offload_artifacts(value, sink: list[Artifact] | None) -> str:
+    """Swap binary blobs in a skill result for artifact refs; report them to the caller's sink."""
+    text = value if isinstance(value, str) else None
+    if text is not None:
+        try:
+            value = json.loads(text)
+        except ValueError:
+            pass
+
+    found: list[Artifact] = []
+    store = get_artifact_store()
+    cleaned = store.extract_text(value, found) if isinstance(value, str) else store.extract(value, found)
+    if sink is not None:
+        sink.extend(found)
+    if not found and text is not None:
+        return text
+    return cleaned if isinstance(cleaned, str) else json.dumps(cleaned)
+
 
+def handle_call_skill(registry: SkillRegistry, skill_name: str, payload: dict, _artifact_sink: list | None = None, **kwargs) -> str:
+    with registry.lease(skill_name) as skill:
+        if skill is None:
+            return json.dumps({"error": f"Skill '{skill_name}' not found in registry."})
+
+        try:
+            resp = post_execute(skill, payload)
+        except Exception as e:
+            return json.dumps({"error": f"Failed to call skill: {str(e)}"})
+    return _offload_artifacts(resp.text, _artifact_sink)
+
+
+def handle_run_pipeline(registry: SkillRegistry, steps: list[dict], output: str | None = None, _artifact_sink: list | None = None, **kwargs) -> str:
     try:
-        resp = httpx.post(skill.endpoint, json=payload, timeout=30)
-        return resp.text
+        return _offload_artifacts(run_pipeline(registry, steps, output), _artifact_sink)
+    except PipelineError as e:
+        return json.dumps({"error": str(e)})
     except Exception as e:
-        return json.dumps({"error": f"Failed to call skill: {str(e)}"})
+        return json.dumps({"error": f"Pipeline failed: {str(e)}"})
 
 
-def handle_create_skill(registry: SkillRegistry, name: str, description: str, execute_code: str, view_post_code: str | None = None, dependencies: list[str] | None = None, **kwargs) -> str:
-    # Check if skill already exists
-    if registry.lookup(name):
-        return json.dumps({"error": f"Skill '{name}' already exists."})
+def _generate_candidate(provider: LLMProvider, spec: SkillSpec, index: int) -> SkillSpec:
+    """Ask the model for an independent implementation of spec (speculative builds)."""
+    create_tool = next(tool for tool in TOOLS if tool["name"] == "create_new_skill")
+    task = (
+        f"Skill name: {spec.name}\n"
+        f"Description: {spec.description}\n"
+        f"Reference dependencies: {spec.dependencies}\n"
+        f"Reference execute_code:\n{spec.execute_code}"
+    )
+    profile = get_profile_store().get(spec.name)
+    if profile is not None:
+        task += f"\n\nThe reference is too slow. {profile.describe()}"
+    response = provider.create_message(
+        CANDIDATE_PROMPT,
+        [{"role": "user", "content": task}],
+        provider.convert_tools([create_tool]),
+    )
+    for tc in response.tool_calls:
+        if tc.name == "create_new_skill":
+            return SkillSpec(**{**tc.input, "name": spec.name})
+    raise RuntimeError(f"Candidate {index}: model did not call create_new_skill")
+
 
+def _sample_payloads(smoke_payload: dict | None, warmup_payloads: list[dict] | None) -> list[dict]:
+    return ([smoke_payload] if smoke_payload is not None else []) + list(warmup_payloads or [])
+
+
+def _make_spec(name: str, description: str, execute_code: str, view_post_code: str | None, dependencies: list[str] | None, warmup_payloads: list[dict] | None = None, resource_class: str | None = None) -> SkillSpec:
     spec_kwargs = dict(
         name=name,
         description=description,
         execute_code=execute_code,
         dependencies=dependencies or [],
+        warmup_payloads=warmup_payloads or [],
+        resource_class=resource_class,
     )
     if view_post_code:
         spec_kwargs["view_post_code"] = view_post_code
+    return SkillSpec(**spec_kwargs)
 
-    spec = SkillSpec(**spec_kwargs)
 
+def _build_with_retries(spec: SkillSpec, smoke_payload: dict | None, instance: str | None = None) -> Skill:
+    """Build until an attempt passes health (and smoke) checks. Raises RuntimeError with the last error."""
+    error_msg = ""
     for attempt in range(1, config.MAX_BUILD_RETRIES + 1):
         try:
-            console.print(f"[yellow]Building skill '{name}' (attempt {attempt}/{config.MAX_BUILD_RETRIES})...[/yellow]")
-            skill = build_and_run(spec)
-            registry.register(skill)
-            console.print(f"[green]Skill '{name}' deployed on port {skill.port}[/green]")
-            view_url = f"http://localhost:{skill.port}/view"
-            return json.dumps({"status": "created", "name": name, "endpoint": skill.endpoint, "view_url": view_url})
+            console.print(f"[yellow]Building skill '{spec.name}' (attempt {attempt}/{config.MAX_BUILD_RETRIES})...[/yellow]")
+            return build_verified(spec, instance=instance, smoke_payload=smoke_payload)
+        except PlacementError:
+            raise  # already waited for capacity; rebuilding won't free any
         except Exception as e:
             error_msg = str(e)
             console.print(f"[red]Build attempt {attempt} failed: {error_msg[:200]}[/red]")
-            if attempt == config.MAX_BUILD_RETRIES:
-                return json.dumps({
-                    "error": f"Failed after {config.MAX_BUILD_RETRIES} attempts. Last error: {error_msg}",
-                    "hint": "Try simpler code, check dependencies, or use a different approach.",
-                })
+    raise RuntimeError(f"Failed after {config.MAX_BUILD_RETRIES} attempts. Last error: {error_msg}")
+
+
+def _collect_garbage(registry: SkillRegistry) -> None:
+    """Free disk before a build; a GC failure must never block the build itself."""
+    try:
+        report = maybe_collect_garbage(registry.skills())
+    except Exception as e:
+        console.print(f"[red]Garbage collection failed: {e}[/red]")
+        return
+    if report and report.freed_bytes:
+        console.print(f"[dim]GC: {report.summary()}[/dim]")
+
+
+def _build_failed(error: Exception) -> str:
+    if isinstance(error, HostUnavailableError):
+        hint = "Docker is not reachable right now. Tell the user the skill can't be built until Docker is back; don't remove skills."
+    elif isinstance(error, PlacementError):
+        hint = "The host is full. Ask the user whether to remove unused skills, or use a smaller resource_class."
+    else:
+        hint = "Try simpler code, check dependencies, or use a different approach."
+    return json.dumps({"error": str(error), "hint": hint})
+
+
+def handle_create_skill(registry: SkillRegistry, name: str, description: str, execute_code: str, view_post_code: str | None = None, dependencies: list[str] | None = None, smoke_payload: dict | None = None, warmup_payloads: list[dict] | None = None, resource_class: str | None = None, _provider: LLMProvider | None = None, **kwargs) -> str:
+    # Check if skill already exists
+    if registry.lookup(name):
+        return json.dumps({"error": f"Skill '{name}' already exists. Use update_skill to change it."})
+
+    spec = _make_spec(name, description, execute_code, view_post_code, dependencies, warmup_payloads, resource_class)
+    _collect_garbage(registry)
+
+    try:
+        skill = _deploy_packed(registry, spec, smoke_payload) if packable(spec) else None
+        if skill is None and config.SPECULATIVE_CANDIDATES > 1 and _provider is not None:
+            codegen = _provider.for_codegen()
+            skill = race_candidates(
+                spec,
+                lambda i: _generate_candidate(codegen, spec, i),
+                config.SPECULATIVE_CANDIDATES,
+                smoke_payload,
+            )
+        elif skill is None:
+            skill = _build_with_retries(spec, smoke_payload)
+    except Exception as e:
+        return _build_failed(e)
+    skill.sample_payloads = _sample_payloads(smoke_payload, warmup_payloads)
+
+    registry.register(skill)
+    console.print(f"[green]Skill '{name}' deployed on port {skill.port}[/green]")
+    return json.dumps({"status": "created", "name": name, "endpoint": skill.endpoint, "view_url": _view_url(skill)})
+
+
+def handle_update_skill(registry: SkillRegistry, name: str, execute_code: str, description: str | None = None, view_post_code: str | None = None, dependencies: list[str] | None = None, smoke_payload: dict | None = None, warmup_payloads: list[dict] | None = None, resource_class: str | None = None, **kwargs) -> str:
+    """Blue/green update: build the new version beside the running one, then swap the registry entry."""
+    current = registry.lookup(name)
+    if current is None:
+        return json.dumps({"error": f"Skill '{name}' not found. Use create_new_skill."})
+
+    if current.spec is not None:
+        # A partial update (often just execute_code) keeps everything else it left out
+        changes = dict(description=description, execute_code=execute_code, view_post_code=view_post_code,
+                       dependencies=dependencies, warmup_payloads=warmup_payloads, resource_class=resource_class)
+        spec = current.spec.model_copy(update={k: v for k, v in changes.items() if v is not None})
+    else:
+        spec = _make_spec(name, description or current.description, execute_code, view_post_code, dependencies, warmup_payloads, resource_class)
+    version = current.version + 1
+    _collect_garbage(registry)
+    try:
+        skill = _deploy_packed(registry, spec, smoke_payload) if packable(spec) else None
+        packed = skill is not None
+        if not packed:
+            skill = _build_with_retries(spec, smoke_payload, instance=f"v{version}")
+    except Exception as e:
+        return _build_failed(e)
+    skill.version = version
+    skill.sample_payloads = _sample_payloads(smoke_payload, warmup_payloads) or current.sample_payloads
+
+    replaced = [registry.swap(skill)]
+    if not packed and get_packer().group_of(name) is not None:
+        replaced += _swap_in(registry, get_packer().evict(name))  # outgrew packing; rebuild its old group
+    _retire_unused(registry, replaced)
+    console.print(f"[green]Skill '{name}' updated to v{version} on port {skill.port}[/green]")
+    return json.dumps({
+        "status": "updated",
+        "name": name,
+        "version": version,
+        "endpoint": skill.endpoint,
+        "view_url": _view_url(skill),
+    })
+
+
+def _deploy_packed(registry: SkillRegistry, spec: SkillSpec, smoke_payload: dict | None) -> Skill | None:
+    """Deploy spec into a shared host container, swapping its rebuilt siblings in.
+
+    Returns spec's new Skill record (not yet registered), or None if packing failed
+    and the skill should be built on its own.
+    """
+    verify = (lambda skill: smoke_test(skill, smoke_payload)) if smoke_payload is not None else None
+    console.print(f"[yellow]Building skill '{spec.name}' into a shared host container...[/yellow]")
+    try:
+        skills = get_packer().deploy(spec, verify)
+    except PlacementError:
+        raise
+    except Exception as e:
+        console.print(f"[yellow]Packing '{spec.name}' failed, building it alone: {str(e)[:200]}[/yellow]")
+        return None
+    siblings = [s for s in skills if s.name != spec.name]
+    _retire_unused(registry, _swap_in(registry, siblings))
+    return next(s for s in skills if s.name == spec.name)
+
+
+def _swap_in(registry: SkillRegistry, skills: list[Skill]) -> list[Skill | None]:
+    """Swap rebuilt group members into the registry, keeping their versions. Returns what they replaced."""
+    replaced = []
+    for skill in skills:
+        previous = registry.lookup(skill.name)
+        if previous is not None:
+            skill.version = previous.version
+            skill.sample_payloads = previous.sample_payloads
+        replaced.append(registry.swap(skill))
+    return replaced
+
+
+def _retire_unused(registry: SkillRegistry, replaced: list[Skill | None]) -> None:
+    """Retire each replaced container once no registered skill is served by it any more."""
+    in_use = {s.container_id for s in registry.skills()}
+    retiring = set()
+    for previous in replaced:
+        if previous is None or previous.container_id in in_use or previous.container_id in retiring:
+            continue
+        retiring.add(previous.container_id)
+        threading.Thread(target=_retire, args=(registry, previous), name=f"retire-{previous.name}").start()
+
+
+def _retire(registry: SkillRegistry, skill: Skill) -> None:
+    """Let a replaced version finish its in-flight calls, then stop it."""
+    if not registry.drain(skill, config.SKILL_DRAIN_TIMEOUT):
+        console.print(f"[yellow]'{skill.name}' v{skill.version} still busy after {config.SKILL_DRAIN_TIMEOUT}s; stopping anyway[/yellow]")
+    try:
+        remove_skill(skill)
+    except Exception as e:
+        console.print(f"[red]Failed to remove '{skill.name}' v{skill.version}: {e}[/red]")
+
+
+def _view_url(skill: Skill) -> str:
+    return skill.url("/view")
+
+
+def handle_benchmark_skill(registry: SkillRegistry, skill_name: str, payloads: list[dict] | None = None, concurrency: int = config.BENCH_MAX_CONCURRENCY, requests_per_level: int = config.BENCH_REQUESTS_PER_LEVEL, rate: float | None = None, **kwargs) -> str:
+    console.print(f"[yellow]Load-testing '{skill_name}' up to concurrency {concurrency}...[/yellow]")
+    try:
+        result = benchmark_skill(registry, skill_name, payloads, concurrency, requests_per_level, rate)
+    except LoadTestError as e:
+        return json.dumps({"error": str(e)})
+    except Exception as e:
+        return json.dumps({"error": f"Load test failed: {str(e)}"})
+    return result.model_dump_json(exclude={"measured_at"})
+
+
+def handle_profile_skill(registry: SkillRegistry, skill_name: str, payloads: list[dict] | None = None, requests: int = 5, live: bool | None = None, **kwargs) -> str:
+    try:
+        profile = profile_skill(registry, skill_name, payloads, requests, live)
+    except ProfileError as e:
+        return json.dumps({"error": str(e)})
+    except Exception as e:
+        return json.dumps({"error": f"Profiling failed: {str(e)}"})
+    if not profile.calls:
+        return json.dumps({"error": f"No profiled calls for '{skill_name}' yet. Pass payloads to send some."})
+    return json.dumps(profile.summary())
+
+
+def handle_fetch_tool_result(registry: SkillRegistry, handle: str, offset: int = 0, length: int | None = None, _context_budget: ContextBudget | None = None, **kwargs) -> str:
+    if _context_budget is None:
+        return json.dumps({"error": "No stored tool results in this session."})
+    text = _context_budget.fetch(handle, offset, length)
+    if text is None:
+        return json.dumps({"error": f"Unknown handle '{handle}'."})
+    return text
 
 
 def handle_start_telegram(registry: SkillRegistry, _telegram_manager=None, **kwargs) -> str:
@@ -203,40 +683,136 @@ def handle_start_telegram(registry: SkillRegistry, _telegram_manager=None, **kwa
 TOOL_HANDLERS = {
     "list_available_skills": handle_list_skills,
     "call_skill": handle_call_skill,
+    "run_pipeline": handle_run_pipeline,
     "create_new_skill": handle_create_skill,
+    "update_skill": handle_update_skill,
+    "benchmark_skill": handle_benchmark_skill,
+    "profile_skill": handle_profile_skill,
+    "fetch_tool_result": handle_fetch_tool_result,
     "start_telegram_bot": handle_start_telegram,
 }
 
 
 # --- Agent loop ---
 
-def run_agent(user_message: str, registry: SkillRegistry, **extra_context) -> str:
-    """Send a user message through the agent loop. Returns the final text response."""
-    provider = get_provider()
-    tools = provider.convert_tools(TOOLS)
-    messages = [{"role": "user", "content": user_message}]
+def _dispatch_tool(tc: ToolCall, registry: SkillRegistry, extra_context: dict) -> str:
+    console.print(f"[cyan]Calling tool: {tc.name}[/cyan]")
 
-    while True:
-        console.print("[dim]Thinking...[/dim]")
+    handler = TOOL_HANDLERS.get(tc.name)
+    with telemetry.span(f"tool.{tc.name}") as tool_span:
+        if handler is None:
+            result = json.dumps({"error": f"Unknown tool: {tc.name}"})
+        else:
+            result = handler(registry=registry, **extra_context, **tc.input)
+        tool_span.set(result_chars=len(result))
 
-        response = provider.create_message(SYSTEM_PROMPT, messages, tools)
-        messages.append(response.raw_message)
+    console.print(f"[dim]Tool result: {result[:200]}[/dim]")
+    if tc.name != "fetch_tool_result":
+        result = extra_context["_context_budget"].clip_result(result)
+    return result
 
-        if response.is_done:
-            return "\n".join(response.text_parts)
 
-        # Process tool calls
-        tool_results = []
-        for tc in response.tool_calls:
-            console.print(f"[cyan]Calling tool: {tc.name}[/cyan]")
+def _run_turn(provider: LLMProvider, messages: list, tools: list, registry: SkillRegistry, extra_context: dict, on_text: Callable[[str], None] | None):
+    """One model call plus its tool calls. Returns (response, tool_results, seconds)."""
+    console.print("[dim]Thinking...[/dim]")
+    started = time.perf_counter()
+    run_tool = telemetry.propagate(_dispatch_tool)  # tool spans nest under this turn, not the LLM call
 
-            handler = TOOL_HANDLERS.get(tc.name)
-            if handler is None:
-                result = json.dumps({"error": f"Unknown tool: {tc.name}"})
-            else:
-                result = handler(registry=registry, **extra_context, **tc.input)
+    # A single worker keeps tool calls ordered while overlapping them with generation
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pending: list[tuple[str, Future]] = []
 
-            console.print(f"[dim]Tool result: {result[:200]}[/dim]")
-            tool_results.append({"id": tc.id, "content": result})
+        def dispatch(tc: ToolCall) -> None:
+            pending.append((tc.id, executor.submit(run_tool, tc, registry, extra_context)))
 
-        messages.extend(provider.format_tool_results(tool_results))
+        with telemetry.span("llm.call", streaming=config.STREAM_RESPONSES) as llm_span:
+            if config.STREAM_RESPONSES:
+                response = provider.stream_message(SYSTEM_PROMPT, messages, tools, on_text=on_text, on_tool_call=dispatch)
+            else:
+                response = provider.create_message(SYSTEM_PROMPT, messages, tools)
+            _record_usage(llm_span, response)
+        if config.STREAM_RESPONSES:
+            if on_text and response.text_parts:
+                on_text("\n")
+        else:
+            for tc in response.tool_calls:
+                dispatch(tc)
+
+        tool_results = [{"id": tc_id, "content": future.result()} for tc_id, future in pending]
+
+    return response, tool_results, time.perf_counter() - started
+
+
+def _record_usage(llm_span: telemetry.Span, response: AgentResponse) -> None:
+    usage = response.usage
+    llm_span.set(model=response.model, phase=response.phase, tool_calls=len(response.tool_calls),
+                 input_tokens=usage.input_tokens, output_tokens=usage.output_tokens,
+                 cache_read_tokens=usage.cache_read_tokens, cache_write_tokens=usage.cache_write_tokens)
+    for billed in (response, response.discarded):
+        if billed is None:
+            continue
+        labels = {"model": billed.model or "unknown"}
+        telemetry.count("helix_llm_calls_total", **labels)
+        for kind in ("input", "output", "cache_read", "cache_write"):
+            telemetry.count("helix_llm_tokens_total", getattr(billed.usage, f"{kind}_tokens"), kind=kind, **labels)
+    if response.discarded is not None:
+        llm_span.set(discarded_model=response.discarded.model,
+                     discarded_input_tokens=response.discarded.usage.prompt_tokens,
+                     discarded_output_tokens=response.discarded.usage.output_tokens)
+
+
+def run_agent(
+    user_message: str,
+    registry: SkillRegistry,
+    on_text: Callable[[str], None] | None = None,
+    history: list[dict] | None = None,
+    **extra_context,
+) -> str:
+    """Send a user message through the agent loop. Returns the final text response.
+
+    history holds earlier exchanges of the same conversation as plain
+    {"role": "user" | "assistant", "content": text} messages, oldest first.
+
+    With config.STREAM_RESPONSES, text deltas are passed to on_text as they arrive and
+    each tool call starts running as soon as its input is complete, while the rest of
+    the response is still streaming. Tool calls still run one at a time, in order.
+    """
+    provider = get_provider()
+    tools = provider.convert_tools(TOOLS)
+    messages = [*(history or []), {"role": "user", "content": user_message}]
+    budget = ContextBudget()
+    extra_context = {**extra_context, "_context_budget": budget, "_provider": provider}
+    prompt_overhead = estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(tools)
+    phase_latency: dict[str, list[float]] = {}
+
+    with telemetry.span("agent.run", message_chars=len(user_message)) as run_span:
+        turn = 0
+        while True:
+            turn += 1
+            with telemetry.span("agent.turn", turn=turn):
+                response, tool_results, elapsed = _run_turn(provider, messages, tools, registry, extra_context, on_text)
+
+            if response.phase:
+                phase_latency.setdefault(response.phase, []).append(elapsed)
+            for tc, tr in zip(response.tool_calls, tool_results):
+                provider.observe_tool_result(tc, tr["content"])
+
+            budget.calibrate(messages, response.usage.prompt_tokens, prompt_overhead)
+            messages.append(response.raw_message)
+            label = f"{response.phase}/{response.model}" if response.phase else response.model
+            console.print(f"[dim]{label} {elapsed:.1f}s — Tokens: {response.usage.summary()}[/dim]")
+            if response.discarded is not None:
+                console.print(f"[dim]  + discarded {response.discarded.model} turn: {response.discarded.usage.summary()}[/dim]")
+
+            if response.is_done:
+                run_span.set(turns=turn)
+                if phase_latency:
+                    console.print("[dim]Latency by phase: " + ", ".join(
+                        f"{phase} {sum(times):.1f}s over {len(times)} turn(s)" for phase, times in phase_latency.items()
+                    ) + "[/dim]")
+                return "\n".join(response.text_parts)
+
+            messages.extend(provider.format_tool_results(tool_results))
+            freed = budget.compact(messages, request_index=len(history or []))
+            if freed:
+                console.print(f"[dim]Compacted history: freed ~{freed} tokens[/dim]")
@@ -0,0 +1,172 @@
+"""Content-addressed store for binary skill outputs (images, PDFs, ...).
+
+Skills either write blobs to the shared /artifacts volume with _save_artifact and
+return a reference, or return base64 / data: URIs, which are pulled out of the
+response here. Either way the model only sees {"artifact", "mime", "size"}; the
+CLI and Telegram read the bytes from disk.
+"""
+
+import base64
+import binascii
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+import config
+
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+_DATA_URI_RE = re.compile(r"data:([\w.+-]+/[\w.+-]+);base64,([A-Za-z0-9+/=]+)")
+_BASE64_RE = re.compile(r"^[A-Za-z0-9+/\s]+={0,2}$")
+
+_MAGIC = [
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF8", "image/gif"),
+    (b"%PDF", "application/pdf"),
+    (b"PK\x03\x04", "application/zip"),
+    (b"<svg", "image/svg+xml"),
+]
+
+
+def sniff_mime(data: bytes) -> str:
+    for magic, mime in _MAGIC:
+        if data.startswith(magic):
+            return mime
+    if data[:8] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+@dataclass
+class Artifact:
+    digest: str
+    mime: str
+    size: int
+    path: Path
+
+    def ref(self) -> dict:
+        """What goes into tool results instead of the bytes."""
+        return {"artifact": self.digest, "mime": self.mime, "size": self.size}
+
+
+class ArtifactStore:
+    """Blobs on disk keyed by sha256, evicted least-recently-used above max_bytes."""
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._entries: OrderedDict[str, Artifact] = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+        # Seed from disk, oldest first, so a restart keeps LRU order roughly intact
+        for path in sorted(self.root.iterdir(), key=lambda p: p.stat().st_mtime):
+            if _DIGEST_RE.match(path.name):
+                self._track(Artifact(path.name, sniff_mime(_head(path)), path.stat().st_size, path))
+        self._evict()
+
+    def _track(self, artifact: Artifact) -> None:
+        self._entries[artifact.digest] = artifact
+        self._total += artifact.size
+
+    def _evict(self) -> None:
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            _, oldest = self._entries.popitem(last=False)
+            self._total -= oldest.size
+            oldest.path.unlink(missing_ok=True)
+
+    def put(self, data: bytes, mime: str | None = None) -> Artifact:
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            if digest in self._entries:
+                self._entries.move_to_end(digest)
+                return self._entries[digest]
+            path = self.root / digest
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+            artifact = Artifact(digest, mime or sniff_mime(data), len(data), path)
+            self._track(artifact)
+            self._evict()
+            return artifact
+
+    def get(self, digest: str) -> Artifact | None:
+        """Look up an artifact, picking up blobs skills wrote to the shared volume directly."""
+        if not _DIGEST_RE.match(digest):
+            return None
+        with self._lock:
+            if digest in self._entries:
+                self._entries.move_to_end(digest)
+                return self._entries[digest]
+            path = self.root / digest
+            if not path.exists():
+                return None
+            artifact = Artifact(digest, sniff_mime(_head(path)), path.stat().st_size, path)
+            self._track(artifact)
+            self._evict()
+            return artifact
+
+    def extract(self, value, found: list[Artifact]):
+        """Return value with embedded binaries replaced by artifact refs; append them to found."""
+        if isinstance(value, dict):
+            digest = value.get("artifact")
+            if isinstance(digest, str) and (artifact := self.get(digest)):
+                if isinstance(value.get("mime"), str) and artifact.mime == "application/octet-stream":
+                    artifact.mime = value["mime"]  # trust the skill when sniffing can't tell
+                found.append(artifact)
+                return {**value, **artifact.ref()}
+            return {k: self.extract(v, found) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.extract(v, found) for v in value]
+        if isinstance(value, (bytes, bytearray)):  # raw bytes from msgpack responses
+            artifact = self.put(bytes(value))
+            found.append(artifact)
+            return artifact.ref()
+        if isinstance(value, str) and len(value) >= config.ARTIFACT_INLINE_MIN_BYTES:
+            return self.extract_text(value, found)
+        return value
+
+    def extract_text(self, text: str, found: list[Artifact]):
+        """Pull data: URIs out of text; a string that is entirely base64 becomes a ref."""
+        def replace(match: re.Match) -> str:
+            try:
+                data = base64.b64decode(match.group(2), validate=True)
+            except binascii.Error:
+                return match.group(0)
+            artifact = self.put(data, match.group(1))
+            found.append(artifact)
+            return f"artifact:{artifact.digest}"
+
+        if "data:" in text:
+            return _DATA_URI_RE.sub(replace, text)
+        if _BASE64_RE.match(text):
+            try:
+                data = base64.b64decode(text, validate=False)
+            except binascii.Error:
+                return text
+            if sniff_mime(data) != "application/octet-stream":
+                artifact = self.put(data)
+                found.append(artifact)
+                return artifact.ref()
+        return text
+
+
+def _head(path: Path) -> bytes:
+    with path.open("rb") as f:
+        return f.read(16)
+
+
+_store: ArtifactStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArtifactStore(Path(config.ARTIFACTS_DIR), config.ARTIFACT_STORE_MAX_BYTES)
+        return _store
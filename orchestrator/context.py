@@ -0,0 +1,155 @@
+"""Context budget for the agent loop — keeps tool results and history from growing without bound."""
+
+import itertools
+import json
+import threading
+
+import config
+
+CHARS_PER_TOKEN = 4  # rough estimate; calibrated against real usage once the provider reports it
+_PREVIEW_CHARS = 1500  # head/tail kept from an oversized tool result
+
+
+def estimate_tokens(content) -> int:
+    """Cheap token estimate for a message or content block."""
+    text = content if isinstance(content, str) else json.dumps(content, default=str)
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def describe_shape(value, depth: int = 0) -> str:
+    """One-line structural summary of a JSON value, e.g. {rows: list[5000] of {id: int, name: str}}."""
+    if isinstance(value, dict):
+        if depth >= 3:
+            return f"dict[{len(value)}]"
+        fields = ", ".join(f"{k}: {describe_shape(v, depth + 1)}" for k, v in itertools.islice(value.items(), 12))
+        more = ", ..." if len(value) > 12 else ""
+        return "{" + fields + more + "}"
+    if isinstance(value, list):
+        item = f" of {describe_shape(value[0], depth + 1)}" if value else ""
+        return f"list[{len(value)}]{item}"
+    if isinstance(value, str):
+        return f"str[{len(value)}]" if len(value) > 40 else "str"
+    return type(value).__name__
+
+
+def _tool_result_blocks(message: dict):
+    """Yield the dicts holding tool result text, for both Anthropic and OpenAI message shapes."""
+    if message.get("role") == "tool":
+        yield message
+        return
+    content = message.get("content")
+    if isinstance(content, list):
+        for block in content:
+            if isinstance(block, dict) and block.get("type") == "tool_result":
+                yield block
+
+
+class ContextBudget:
+    """Tracks per-message token counts for one agent loop and keeps them under a budget.
+
+    Oversized tool results are clipped to a head/tail preview before they enter the
+    conversation; the full text stays here under a handle the model can page through
+    with the fetch_tool_result tool. When the conversation nears the budget, tool
+    results outside the most recent messages are replaced with stubs pointing at
+    their handles. Compaction rewrites the conversation prefix (and so invalidates
+    the prompt cache), so it frees down to a low-water mark rather than running
+    every turn.
+    """
+
+    def __init__(
+        self,
+        budget_tokens: int = config.CONTEXT_BUDGET_TOKENS,
+        max_result_tokens: int = config.TOOL_RESULT_MAX_TOKENS,
+        keep_recent: int = config.CONTEXT_KEEP_RECENT_MESSAGES,
+    ):
+        self.budget_tokens = budget_tokens
+        self.max_result_tokens = max_result_tokens
+        self.keep_recent = keep_recent
+        self._scale = 1.0  # real tokens per estimated token
+        self._sizes: dict[int, int] = {}  # id(message) -> estimated tokens
+        self._results: dict[str, str] = {}  # handle -> full tool result
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    # --- Tool results ---
+
+    def _store(self, text: str) -> str:
+        with self._lock:
+            handle = f"result-{next(self._counter)}"
+            self._results[handle] = text
+        return handle
+
+    def clip_result(self, result: str) -> str:
+        """Return result unchanged if it fits, else a preview plus a retrievable handle."""
+        if estimate_tokens(result) <= self.max_result_tokens:
+            return result
+        handle = self._store(result)
+        try:
+            shape = f"Shape: {describe_shape(json.loads(result))}\n"
+        except ValueError:
+            shape = ""
+        omitted = len(result) - 2 * _PREVIEW_CHARS
+        return (
+            f"{result[:_PREVIEW_CHARS]}\n"
+            f"... [{omitted} chars omitted of {len(result)}. {shape}"
+            f"Call fetch_tool_result with handle \"{handle}\" and an offset/length to read more] ...\n"
+            f"{result[-_PREVIEW_CHARS:]}"
+        )
+
+    def fetch(self, handle: str, offset: int = 0, length: int | None = None) -> str | None:
+        """Return a slice of a stored tool result, or None for an unknown handle."""
+        with self._lock:
+            text = self._results.get(handle)
+        if text is None:
+            return None
+        length = length or self.max_result_tokens * CHARS_PER_TOKEN
+        length = min(length, self.max_result_tokens * CHARS_PER_TOKEN)
+        return text[offset:offset + length]
+
+    # --- History ---
+
+    def calibrate(self, messages: list, prompt_tokens: int, overhead_tokens: int = 0) -> None:
+        """Scale future estimates by the provider's real prompt size for these messages.
+
+        overhead_tokens is the estimate for what else was in the prompt (system, tools).
+        """
+        estimated = sum(self._message_tokens(m) for m in messages) + overhead_tokens
+        if estimated and prompt_tokens:
+            self._scale = max(0.5, prompt_tokens / estimated)
+
+    def total_tokens(self, messages: list) -> int:
+        return int(sum(self._message_tokens(m) for m in messages) * self._scale)
+
+    def _message_tokens(self, message: dict) -> int:
+        key = id(message)
+        if key not in self._sizes:
+            self._sizes[key] = estimate_tokens(message)
+        return self._sizes[key]
+
+    def compact(self, messages: list, request_index: int = 0) -> int:
+        """Stub out old tool results if the conversation is over budget. Returns tokens freed.
+
+        request_index is where the user's current request sits, after any earlier
+        exchanges; it and everything before it are left as they are.
+        """
+        before = self.total_tokens(messages)
+        if before <= self.budget_tokens:
+            return 0
+
+        low_water = self.budget_tokens * 3 // 4
+        freed = 0
+        for message in messages[request_index + 1:-self.keep_recent or None]:
+            for block in _tool_result_blocks(message):
+                content = block["content"]
+                if not isinstance(content, str) or content.startswith("[compacted"):
+                    continue
+                tokens = estimate_tokens(content)
+                if tokens < 50:
+                    continue
+                handle = self._store(content)
+                block["content"] = f"[compacted: {tokens} tokens; fetch_tool_result handle \"{handle}\"]"
+                freed += tokens
+            self._sizes.pop(id(message), None)
+            if before - freed * self._scale <= low_water:
+                break
+        return int(freed * self._scale)
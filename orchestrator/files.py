@@ -0,0 +1,74 @@
+"""Shared input files — hand files to skills by path instead of pasting them into the prompt."""
+
+import hashlib
+import os
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+
+import config
+
+
+@dataclass
+class FileHandle:
+    handle: str
+    source: str  # path as the user typed it
+    container_path: str  # where skills see the file, e.g. /data/3f2a91c0-data.csv
+    size: int
+    preview: str
+
+    def describe(self) -> str:
+        """What the model sees in place of the file contents."""
+        return (
+            f"[File {self.source}: handle {self.handle}, path {self.container_path} inside skill containers, "
+            f"{_format_size(self.size)}. Preview:\n{self.preview}\n]"
+        )
+
+
+def _format_size(size: int) -> str:
+    for unit in ("bytes", "KB", "MB"):
+        if size < 1024 or unit == "MB":
+            return f"{size} {unit}" if unit == "bytes" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def _preview(path: Path) -> str:
+    with path.open("rb") as f:
+        head = f.read(config.FILE_PREVIEW_BYTES)
+    if b"\0" in head:
+        return "(binary file)"
+    text = head.decode("utf-8", errors="replace")
+    if path.stat().st_size > len(head):
+        text += "\n..."
+    return text
+
+
+def share_file(path: Path) -> FileHandle:
+    """Expose a local file to every skill container through the read-only shared volume.
+
+    The file is hard-linked into SHARED_FILES_DIR when possible (no copy; falls back
+    to copying across filesystems). The handle depends on path, size and mtime, so
+    re-sharing an unchanged file is free.
+    """
+    path = path.resolve()
+    stat = path.stat()
+    digest = hashlib.sha1(f"{path}:{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:12]
+    shared_name = f"{digest}-{path.name}"
+
+    shared_dir = Path(config.SHARED_FILES_DIR)
+    shared_dir.mkdir(parents=True, exist_ok=True)
+    target = shared_dir / shared_name
+    if not target.exists():
+        try:
+            os.link(path, target)
+        except OSError:
+            shutil.copyfile(path, target)
+
+    return FileHandle(
+        handle=digest,
+        source=str(path),
+        container_path=f"{config.SKILL_FILES_MOUNT}/{shared_name}",
+        size=stat.st_size,
+        preview=_preview(path),
+    )
@@ -0,0 +1,174 @@
+"""Load generator for deployed skills — find a skill's throughput limit and tail latency.
+
+benchmark_skill() drives a skill's /execute endpoint through the normal client path
+(registry lease, codec negotiation) at concurrency 1, 2, 4, ... up to a maximum,
+sending requests_per_level calls at each level. Each level's throughput and
+latency percentiles form a saturation curve: throughput grows with concurrency
+until the skill is saturated, after which only latency grows. Climbing stops early
+once throughput falls off its peak or too many calls fail.
+
+With a rate limit, calls are scheduled at fixed intervals and latency is measured
+from the scheduled send time, so a backed-up skill shows its queueing delay instead
+of hiding it (no coordinated omission).
+"""
+
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+import telemetry
+from models.skill import LoadLevel, SkillBenchmark
+from orchestrator.registry import SkillRegistry
+from orchestrator.skill_client import post_execute
+
+MAX_SAMPLE_ERRORS = 5
+
+
+class LoadTestError(Exception):
+    """Raised when a load test cannot start (unknown skill, no payloads)."""
+
+
+def concurrency_levels(maximum: int) -> list[int]:
+    """1, 2, 4, ... doubling up to maximum, which is always the last level."""
+    levels = [1]
+    while levels[-1] * 2 < maximum:
+        levels.append(levels[-1] * 2)
+    if maximum > 1:
+        levels.append(maximum)
+    return levels
+
+
+def _percentile(ordered: list[float], p: float) -> float:
+    """Nearest-rank percentile of sorted seconds, in milliseconds."""
+    if not ordered:
+        return 0.0
+    return round(ordered[min(len(ordered) - 1, max(0, round(p * len(ordered)) - 1))] * 1000, 2)
+
+
+class _Level:
+    """Runs one concurrency level and collects its latencies and errors."""
+
+    def __init__(self, registry: SkillRegistry, name: str, payloads: list[dict], requests: int, rate: float | None):
+        self.registry = registry
+        self.name = name
+        self.payloads = payloads
+        self.requests = requests
+        self.interval = 1 / rate if rate else 0.0
+        self.latencies: list[float] = []
+        self.errors: list[str] = []
+        self._lock = threading.Lock()
+        self._next = itertools.count()
+
+    def _call(self, payload: dict) -> str | None:
+        """Send one request. Returns an error description, or None on success."""
+        try:
+            with self.registry.lease(self.name) as skill:
+                if skill is None:
+                    return f"skill '{self.name}' was removed"
+                resp = post_execute(skill, payload)
+        except Exception as e:
+            return f"{type(e).__name__}: {e}"
+        if resp.status_code >= 400:
+            return f"HTTP {resp.status_code}: {resp.text[:200]}"
+        return None
+
+    def _worker(self, started: float) -> None:
+        while True:
+            with self._lock:
+                i = next(self._next)
+            if i >= self.requests:
+                return
+            scheduled = started + i * self.interval
+            if self.interval:
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            else:
+                scheduled = time.perf_counter()
+            error = self._call(self.payloads[i % len(self.payloads)])
+            elapsed = time.perf_counter() - scheduled
+            with self._lock:
+                self.latencies.append(elapsed)
+                if error is not None:
+                    self.errors.append(error)
+
+    def run(self, concurrency: int) -> LoadLevel:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f"bench-{self.name}") as pool:
+            for _ in range(concurrency):
+                pool.submit(telemetry.propagate(self._worker), started)
+        wall = time.perf_counter() - started
+        ordered = sorted(self.latencies)
+        return LoadLevel(
+            concurrency=concurrency,
+            requests=len(ordered),
+            errors=len(self.errors),
+            throughput_rps=round((len(ordered) - len(self.errors)) / wall, 2) if wall else 0.0,
+            p50_ms=_percentile(ordered, 0.50),
+            p95_ms=_percentile(ordered, 0.95),
+            p99_ms=_percentile(ordered, 0.99),
+            max_ms=round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        )
+
+
+def _histogram_ms(latencies: list[float]) -> dict[str, int]:
+    hist = telemetry.Histogram()
+    for value in latencies:
+        hist.observe(value)
+    buckets = {f"{bound * 1000:g}": n for bound, n in zip(hist.buckets, hist.counts)}
+    buckets["+Inf"] = hist.count - sum(hist.counts)
+    return buckets
+
+
+def benchmark_skill(
+    registry: SkillRegistry,
+    name: str,
+    payloads: list[dict] | None = None,
+    concurrency: int = config.BENCH_MAX_CONCURRENCY,
+    requests_per_level: int = config.BENCH_REQUESTS_PER_LEVEL,
+    rate: float | None = None,
+) -> SkillBenchmark:
+    """Load-test a registered skill and store the result on its Skill record.
+
+    payloads are cycled through in order; they default to the skill's sample payloads
+    (its smoke and warmup bodies). rate caps total requests per second at each level.
+    Raises LoadTestError if the skill is unknown or there is nothing to send.
+    """
+    skill = registry.lookup(name)
+    if skill is None:
+        raise LoadTestError(f"Skill '{name}' not found in registry.")
+    payloads = payloads or skill.sample_payloads
+    if not payloads:
+        raise LoadTestError(f"Skill '{name}' has no sample payloads; pass some to send.")
+    concurrency = max(1, min(concurrency, config.BENCH_CONCURRENCY_LIMIT))
+    requests_per_level = max(1, requests_per_level)
+
+    levels: list[LoadLevel] = []
+    latencies: list[float] = []
+    errors: list[str] = []
+    with telemetry.span("skill.benchmark", skill=name, max_concurrency=concurrency, rate=rate) as bench_span:
+        for level_concurrency in concurrency_levels(concurrency):
+            level = _Level(registry, name, payloads, max(requests_per_level, level_concurrency), rate)
+            result = level.run(level_concurrency)
+            levels.append(result)
+            latencies += level.latencies
+            errors += level.errors
+            peak = max(lvl.throughput_rps for lvl in levels)
+            if result.errors > config.BENCH_MAX_ERROR_RATE * result.requests or result.throughput_rps < 0.9 * peak:
+                break  # overloaded, or past the knee: more concurrency only adds latency
+        bench_span.set(levels=len(levels), peak_rps=peak)
+
+    benchmark = SkillBenchmark(
+        version=skill.version,
+        rate_limit_rps=rate,
+        levels=levels,
+        histogram_ms=_histogram_ms(latencies),
+        error_rate=round(len(errors) / len(latencies), 4) if latencies else 0.0,
+        peak_throughput_rps=peak,
+        saturation_concurrency=next(lvl.concurrency for lvl in levels if lvl.throughput_rps >= 0.9 * peak),
+        sample_errors=list(dict.fromkeys(errors))[:MAX_SAMPLE_ERRORS],
+    )
+    skill.benchmark = benchmark
+    return benchmark
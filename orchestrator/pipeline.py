@@ -0,0 +1,129 @@
+"""Skill pipelines — run a small DAG of skill calls without routing data through the LLM."""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import config
+from orchestrator.context import describe_shape
+from orchestrator.registry import SkillRegistry
+from orchestrator.skill_client import decode_response, post_execute
+
+
+class PipelineError(Exception):
+    """Raised when a pipeline is malformed or one of its steps fails."""
+
+
+def resolve_path(value, path: str):
+    """Follow a dotted path (dict keys or list indices) into a step result."""
+    for part in filter(None, path.split(".")):
+        if isinstance(value, list) and part.lstrip("-").isdigit():
+            value = value[int(part)]
+        elif isinstance(value, dict) and part in value:
+            value = value[part]
+        else:
+            raise KeyError(part)
+    return value
+
+
+def _set_path(target: dict, path: str, value) -> None:
+    *parents, leaf = path.split(".")
+    for part in parents:
+        target = target.setdefault(part, {})
+    target[leaf] = value
+
+
+def _dependencies(step: dict) -> set[str]:
+    return {source.split(".", 1)[0] for source in step.get("inputs", {}).values()}
+
+
+def validate(registry: SkillRegistry, steps: list[dict]) -> dict[str, dict]:
+    """Check ids, skills and dependencies; return steps keyed by id. Raises PipelineError."""
+    by_id: dict[str, dict] = {}
+    for step in steps:
+        step_id = step.get("id")
+        if not step_id or step_id in by_id:
+            raise PipelineError(f"Every step needs a unique id (got {step_id!r}).")
+        if registry.lookup(step.get("skill", "")) is None:
+            raise PipelineError(f"Step '{step_id}': skill '{step.get('skill')}' not found in registry.")
+        by_id[step_id] = step
+
+    for step_id, step in by_id.items():
+        unknown = _dependencies(step) - by_id.keys()
+        if unknown:
+            raise PipelineError(f"Step '{step_id}' reads from unknown step(s): {sorted(unknown)}")
+
+    # Kahn's algorithm — anything left over is on a cycle
+    remaining = {step_id: _dependencies(step) for step_id, step in by_id.items()}
+    while remaining:
+        ready = [step_id for step_id, deps in remaining.items() if not deps & remaining.keys()]
+        if not ready:
+            raise PipelineError(f"Pipeline has a cycle among steps: {sorted(remaining)}")
+        for step_id in ready:
+            del remaining[step_id]
+    return by_id
+
+
+def _run_step(registry: SkillRegistry, step: dict, results: dict):
+    payload = dict(step.get("payload") or {})
+    for field, source in step.get("inputs", {}).items():
+        source_id, _, path = source.partition(".")
+        try:
+            _set_path(payload, field, resolve_path(results[source_id], path))
+        except (KeyError, IndexError, TypeError) as e:
+            raise PipelineError(f"Step '{step['id']}': cannot read '{source}' ({e!r} missing)") from e
+
+    with registry.lease(step["skill"]) as skill:
+        if skill is None:
+            raise PipelineError(f"Step '{step['id']}': skill '{step['skill']}' was removed.")
+        resp = post_execute(skill, payload, binary=True)
+    if resp.status_code != 200:
+        raise PipelineError(f"Step '{step['id']}' ({skill.name}) returned HTTP {resp.status_code}: {resp.text[:500]}")
+    return decode_response(resp)
+
+
+def run_pipeline(registry: SkillRegistry, steps: list[dict], output: str | list[str] | None = None) -> dict:
+    """Run the steps, each as soon as its inputs are ready, and return the output step results.
+
+    A step is {"id", "skill", "payload"?, "inputs"?}; inputs maps a payload field
+    (dotted for nesting) to "step_id" or "step_id.path.into.result". Outputs default
+    to the steps nothing else reads from. Intermediate results never leave this
+    process; only their shapes and timings are reported.
+    """
+    by_id = validate(registry, steps)
+    if output is None:
+        consumed = set().union(*(_dependencies(step) for step in by_id.values()))
+        outputs = [step_id for step_id in by_id if step_id not in consumed]
+    else:
+        outputs = [output] if isinstance(output, str) else list(output)
+    missing = set(outputs) - by_id.keys()
+    if missing:
+        raise PipelineError(f"Unknown output step(s): {sorted(missing)}")
+
+    results: dict = {}
+    timings: dict[str, float] = {}
+    waiting = dict(by_id)
+    running: dict = {}
+
+    with ThreadPoolExecutor(max_workers=config.PIPELINE_MAX_PARALLEL, thread_name_prefix="pipeline") as pool:
+        while waiting or running:
+            for step_id, step in list(waiting.items()):
+                if _dependencies(step) <= results.keys():
+                    del waiting[step_id]
+                    running[pool.submit(_run_step, registry, step, results)] = (step_id, time.perf_counter())
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                step_id, started = running.pop(future)
+                timings[step_id] = round((time.perf_counter() - started) * 1000)
+                error = future.exception()
+                if error is not None:
+                    for other in running:
+                        other.cancel()
+                    raise error if isinstance(error, PipelineError) else PipelineError(f"Step '{step_id}' failed: {error}")
+                results[step_id] = future.result()
+
+    return {
+        "status": "ok",
+        "steps": {step_id: {"ms": timings[step_id], "shape": describe_shape(results[step_id])} for step_id in by_id},
+        "result": results[outputs[0]] if len(outputs) == 1 else {step_id: results[step_id] for step_id in outputs},
+    }
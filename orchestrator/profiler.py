@@ -0,0 +1,149 @@
+"""Profiles of deployed skills — captured inside the skill, aggregated per skill here.
+
+Every skill runtime can cProfile its execute_code: a single call when the request
+carries "X-Helix-Profile: 1", or every call after POST /profile {"enabled": true}.
+The skill accumulates the stats; GET /profile?reset=1 hands them over. Functions
+defined in execute_code are reported by their line within execute_code, so the
+model can map hot spots back to the code it wrote.
+
+ProfileStore merges collected reports per skill version. profile_skill() sends a
+few profiled calls, collects, and returns the merged profile; describe() renders
+it as text for the model to use when rewriting a slow skill.
+"""
+
+import threading
+from dataclasses import dataclass, field
+
+import telemetry
+from models.skill import Skill
+from orchestrator.registry import SkillRegistry
+from orchestrator.skill_client import call_route, post_execute
+
+PROFILE_HEADERS = {"x-helix-profile": "1"}
+PROFILE_TOP_FUNCTIONS = 40  # functions a skill reports per collection, by cumulative time
+EXECUTE_CODE = "execute_code"
+
+
+class ProfileError(Exception):
+    """Raised when a skill can't be profiled (unknown skill, or built before /profile existed)."""
+
+
+@dataclass
+class SkillProfile:
+    skill: str
+    version: int
+    calls: int = 0
+    functions: dict[str, dict] = field(default_factory=dict)  # label -> {"calls", "self_ms", "cumulative_ms"}
+
+    def merge(self, report: dict) -> None:
+        """Add one GET /profile report."""
+        self.calls += report.get("calls", 0)
+        for entry in report.get("functions", []):
+            totals = self.functions.setdefault(entry["function"], {"calls": 0, "self_ms": 0.0, "cumulative_ms": 0.0})
+            totals["calls"] += entry["calls"]
+            totals["self_ms"] = round(totals["self_ms"] + entry["self_ms"], 3)
+            totals["cumulative_ms"] = round(totals["cumulative_ms"] + entry["cumulative_ms"], 3)
+
+    def mean_ms(self) -> float:
+        """Average time spent in execute_code per profiled call."""
+        total = self.functions.get(EXECUTE_CODE, {}).get("cumulative_ms", 0.0)
+        return round(total / self.calls, 3) if self.calls else 0.0
+
+    def hotspots(self, top: int = 15) -> list[dict]:
+        """Functions by self time, with their share of the time spent in execute_code."""
+        total = self.functions.get(EXECUTE_CODE, {}).get("cumulative_ms", 0.0)
+        ranked = sorted(self.functions.items(), key=lambda item: item[1]["self_ms"], reverse=True)
+        return [
+            {"function": label, **stats, "share": round(stats["self_ms"] / total, 3) if total else 0.0}
+            for label, stats in ranked[:top]
+        ]
+
+    def summary(self, top: int = 15) -> dict:
+        return {"skill": self.skill, "version": self.version, "calls": self.calls,
+                "mean_ms": self.mean_ms(), "hotspots": self.hotspots(top)}
+
+    def describe(self, top: int = 10) -> str:
+        """Plain-text profile for a prompt."""
+        lines = [f"Profile of '{self.skill}' v{self.version}: {self.calls} call(s), {self.mean_ms()} ms each on average.",
+                 "Where the time goes (self time, share of execute_code):"]
+        for spot in self.hotspots(top):
+            lines.append(f"- {spot['function']}: {spot['self_ms']} ms over {spot['calls']} call(s), {spot['share']:.0%}")
+        return "\n".join(lines)
+
+
+class ProfileStore:
+    """Profiles per skill; a report from a new version replaces the old version's profile."""
+
+    def __init__(self):
+        self._profiles: dict[str, SkillProfile] = {}
+        self._lock = threading.Lock()
+
+    def record(self, skill: Skill, report: dict) -> SkillProfile:
+        with self._lock:
+            profile = self._profiles.get(skill.name)
+            if profile is None or profile.version != skill.version:
+                profile = self._profiles[skill.name] = SkillProfile(skill.name, skill.version)
+            profile.merge(report)
+            return profile
+
+    def get(self, name: str) -> SkillProfile | None:
+        with self._lock:
+            return self._profiles.get(name)
+
+    def forget(self, name: str) -> None:
+        with self._lock:
+            self._profiles.pop(name, None)
+
+
+def set_profiling(skill: Skill, enabled: bool) -> None:
+    """Profile every /execute call on the skill (enabled) or only calls that ask for it."""
+    resp = call_route(skill, "POST", "/profile", json={"enabled": enabled})
+    if resp.status_code != 200:
+        raise ProfileError(f"Skill '{skill.name}' does not support profiling (HTTP {resp.status_code}); update it to rebuild.")
+
+
+def collect(skill: Skill, store: ProfileStore | None = None) -> SkillProfile:
+    """Fetch and reset the stats the skill has accumulated; merge them into the store."""
+    resp = call_route(skill, "GET", "/profile", params={"top": PROFILE_TOP_FUNCTIONS, "reset": True})
+    if resp.status_code != 200:
+        raise ProfileError(f"Skill '{skill.name}' does not support profiling (HTTP {resp.status_code}); update it to rebuild.")
+    return (store or get_profile_store()).record(skill, resp.json())
+
+
+def profile_skill(
+    registry: SkillRegistry,
+    name: str,
+    payloads: list[dict] | None = None,
+    requests: int = 5,
+    live: bool | None = None,
+) -> SkillProfile:
+    """Send profiled calls to a skill, collect what it captured, and return its merged profile.
+
+    payloads default to the skill's sample payloads; with none, only stats already
+    captured (e.g. from live profiling) are collected. live=True keeps profiling
+    every real call afterwards, live=False stops it.
+    """
+    with registry.lease(name) as skill:
+        if skill is None:
+            raise ProfileError(f"Skill '{name}' not found in registry.")
+        payloads = payloads or skill.sample_payloads
+        with telemetry.span("skill.profile", skill=name, requests=requests if payloads else 0):
+            for i in range(requests if payloads else 0):
+                post_execute(skill, payloads[i % len(payloads)], extra_headers=PROFILE_HEADERS)
+            profile = collect(skill)
+            if live is not None:
+                set_profiling(skill, live)
+    return profile
+
+
+_store: ProfileStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_profile_store() -> ProfileStore:
+    """The process-wide ProfileStore."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ProfileStore()
+        return _store
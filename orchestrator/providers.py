@@ -1,9 +1,10 @@
 """LLM provider adapters — Anthropic and Cerebras (OpenAI-compatible)."""
 
 import json
+import threading
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, Callable
 
 import config
 
@@ -15,15 +16,39 @@ class ToolCall:
     input: dict
 
 
+@dataclass
+class Usage:
+    input_tokens: int = 0  # uncached input tokens
+    output_tokens: int = 0
+    cache_read_tokens: int = 0  # input tokens served from the prompt cache (hits)
+    cache_write_tokens: int = 0  # input tokens written to the prompt cache (misses)
+
+    @property
+    def prompt_tokens(self) -> int:
+        return self.input_tokens + self.cache_read_tokens + self.cache_write_tokens
+
+    def summary(self) -> str:
+        return (
+            f"{self.input_tokens} in, {self.cache_read_tokens} cache hit, "
+            f"{self.cache_write_tokens} cache miss, {self.output_tokens} out"
+        )
+
+
 @dataclass
 class AgentResponse:
     text_parts: list[str] = field(default_factory=list)
     tool_calls: list[ToolCall] = field(default_factory=list)
     is_done: bool = False
     raw_message: Any = None
+    usage: Usage = field(default_factory=Usage)
+    model: str = ""
+    phase: str = ""  # set by RoutingProvider: "route" or "codegen"
+    discarded: "AgentResponse | None" = None  # fast-model turn RoutingProvider re-asked of the strong model (still billed)
 
 
 class LLMProvider(ABC):
+    message_format = "anthropic"  # shape of raw_message / format_tool_results: "anthropic" or "openai"
+
     @abstractmethod
     def create_message(self, system: str, messages: list, tools: list) -> AgentResponse:
         ...
@@ -36,25 +61,104 @@ class LLMProvider(ABC):
     def convert_tools(self, tools: list[dict]) -> list:
         ...
 
+    def stream_message(
+        self,
+        system: str,
+        messages: list,
+        tools: list,
+        on_text: Callable[[str], None] | None = None,
+        on_tool_call: Callable[[ToolCall], None] | None = None,
+    ) -> AgentResponse:
+        """Like create_message, but report text deltas and each completed tool call as they arrive.
+
+        Providers without native streaming fall back to a single blocking request.
+        """
+        response = self.create_message(system, messages, tools)
+        for text in response.text_parts:
+            if on_text:
+                on_text(text)
+        for tc in response.tool_calls:
+            if on_tool_call:
+                on_tool_call(tc)
+        return response
+
+    def observe_tool_result(self, tool_call: ToolCall, result: str) -> None:
+        """Hook called with every tool result, in call order. Used by routing policies."""
+
+    def for_codegen(self) -> "LLMProvider":
+        """The provider to use for standalone code generation requests."""
+        return self
+
+
+_CACHE_BREAKPOINT = {"type": "ephemeral"}
+
+
+def _cacheable_tools(tools: list[dict]) -> list[dict]:
+    """Mark the end of the tool definitions as a cache breakpoint (caches every tool before it)."""
+    if not tools:
+        return tools
+    return tools[:-1] + [{**tools[-1], "cache_control": _CACHE_BREAKPOINT}]
+
+
+def _cacheable_messages(messages: list) -> list:
+    """Return a copy of messages with a cache breakpoint on the last content block.
+
+    The breakpoint moves forward every turn; the API still reads the prefix cached
+    by the previous turn's breakpoint, so only the newest messages are billed as misses.
+    The stored conversation is left untouched.
+    """
+    if not messages:
+        return messages
+    last = messages[-1]
+    content = last["content"]
+    if isinstance(content, str):
+        content = [{"type": "text", "text": content}]
+    if not content:
+        return messages
+    content = content[:-1] + [{**content[-1], "cache_control": _CACHE_BREAKPOINT}]
+    return messages[:-1] + [{**last, "content": content}]
+
 
 class AnthropicProvider(LLMProvider):
-    def __init__(self):
+    def __init__(self, model: str | None = None):
         import anthropic
         self.client = anthropic.Anthropic(api_key=config.ANTHROPIC_API_KEY)
-        self.model = config.ANTHROPIC_MODEL
+        self.model = model or config.ANTHROPIC_MODEL
+        self.prompt_caching = config.ANTHROPIC_PROMPT_CACHING
 
     def convert_tools(self, tools: list[dict]) -> list[dict]:
+        if self.prompt_caching:
+            return _cacheable_tools(tools)
         return tools
 
+    def _request_kwargs(self, system: str, messages: list, tools: list) -> dict:
+        if self.prompt_caching:
+            system = [{"type": "text", "text": system, "cache_control": _CACHE_BREAKPOINT}]
+            messages = _cacheable_messages(messages)
+        return {
+            "model": self.model,
+            "max_tokens": config.MAX_TOKENS,
+            "system": system,
+            "tools": tools,
+            "messages": messages,
+        }
+
     def create_message(self, system: str, messages: list, tools: list) -> AgentResponse:
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=config.MAX_TOKENS,
-            system=system,
-            tools=tools,
-            messages=messages,
-        )
+        response = self.client.messages.create(**self._request_kwargs(system, messages, tools))
+        return self._to_agent_response(response)
+
+    def stream_message(self, system, messages, tools, on_text=None, on_tool_call=None) -> AgentResponse:
+        with self.client.messages.stream(**self._request_kwargs(system, messages, tools)) as stream:
+            for event in stream:
+                if event.type == "text" and on_text:
+                    on_text(event.text)
+                elif event.type == "content_block_stop" and event.content_block.type == "tool_use" and on_tool_call:
+                    block = event.content_block
+                    on_tool_call(ToolCall(id=block.id, name=block.name, input=block.input))
+            response = stream.get_final_message()
+        return self._to_agent_response(response)
 
+    def _to_agent_response(self, response) -> AgentResponse:
         text_parts = []
         tool_calls = []
         for block in response.content:
@@ -67,32 +171,50 @@ class AnthropicProvider(LLMProvider):
                     input=block.input,
                 ))
 
+        usage = response.usage
         return AgentResponse(
             text_parts=text_parts,
             tool_calls=tool_calls,
             is_done=(response.stop_reason == "end_turn"),
-            raw_message={"role": "assistant", "content": response.content},
+            # Plain dicts (not SDK objects) so later turns can attach cache breakpoints
+            raw_message={
+                "role": "assistant",
+                "content": [block.model_dump(exclude_none=True) for block in response.content],
+            },
+            usage=Usage(
+                input_tokens=usage.input_tokens,
+                output_tokens=usage.output_tokens,
+                cache_read_tokens=usage.cache_read_input_tokens or 0,
+                cache_write_tokens=usage.cache_creation_input_tokens or 0,
+            ),
+            model=self.model,
         )
 
     def format_tool_results(self, tool_results: list[dict]) -> list[dict]:
-        return [{"role": "user", "content": [
-            {
-                "type": "tool_result",
-                "tool_use_id": tr["id"],
-                "content": tr["content"],
-            }
-            for tr in tool_results
-        ]}]
+        return _anthropic_tool_results(tool_results)
+
+
+def _anthropic_tool_results(tool_results: list[dict]) -> list[dict]:
+    return [{"role": "user", "content": [
+        {
+            "type": "tool_result",
+            "tool_use_id": tr["id"],
+            "content": tr["content"],
+        }
+        for tr in tool_results
+    ]}]
 
 
 class CerebrasProvider(LLMProvider):
-    def __init__(self):
+    message_format = "openai"
+
+    def __init__(self, model: str | None = None):
         import openai
         self.client = openai.OpenAI(
             base_url=config.CEREBRAS_BASE_URL,
             api_key=config.CEREBRAS_API_KEY,
         )
-        self.model = config.CEREBRAS_MODEL
+        self.model = model or config.CEREBRAS_MODEL
 
     def convert_tools(self, tools: list[dict]) -> list[dict]:
         converted = []
@@ -107,7 +229,7 @@ class CerebrasProvider(LLMProvider):
             })
         return converted
 
-    def create_message(self, system: str, messages: list, tools: list) -> AgentResponse:
+    def _request_kwargs(self, system: str, messages: list, tools: list) -> dict:
         openai_messages = [{"role": "system", "content": system}] + messages
 
         kwargs = {
@@ -117,42 +239,65 @@ class CerebrasProvider(LLMProvider):
         }
         if tools:
             kwargs["tools"] = tools
+        return kwargs
 
-        response = self.client.chat.completions.create(**kwargs)
+    def create_message(self, system: str, messages: list, tools: list) -> AgentResponse:
+        response = self.client.chat.completions.create(**self._request_kwargs(system, messages, tools))
 
         choice = response.choices[0]
         message = choice.message
+        raw_calls = [
+            {"id": tc.id, "name": tc.function.name, "arguments": tc.function.arguments}
+            for tc in message.tool_calls or []
+        ]
+        return _openai_response(message.content, raw_calls, choice.finish_reason, response.usage, self.model)
 
-        text_parts = [message.content] if message.content else []
-        tool_calls = []
-        if message.tool_calls:
-            for tc in message.tool_calls:
-                tool_calls.append(ToolCall(
-                    id=tc.id,
-                    name=tc.function.name,
-                    input=json.loads(tc.function.arguments),
-                ))
+    def stream_message(self, system, messages, tools, on_text=None, on_tool_call=None) -> AgentResponse:
+        stream = self.client.chat.completions.create(
+            **self._request_kwargs(system, messages, tools),
+            stream=True,
+            stream_options={"include_usage": True},
+        )
 
-        raw = {"role": "assistant", "content": message.content or ""}
-        if message.tool_calls:
-            raw["tool_calls"] = [
-                {
-                    "id": tc.id,
-                    "type": "function",
-                    "function": {
-                        "name": tc.function.name,
-                        "arguments": tc.function.arguments,
-                    },
-                }
-                for tc in message.tool_calls
-            ]
+        content = []
+        raw_calls: list[dict] = []  # accumulated by stream index
+        dispatched = 0
+        finish_reason = None
+        usage = None
 
-        return AgentResponse(
-            text_parts=text_parts,
-            tool_calls=tool_calls,
-            is_done=(choice.finish_reason == "stop"),
-            raw_message=raw,
-        )
+        def dispatch_until(count: int) -> None:
+            # Tool call deltas arrive in index order, so every call before `count` is complete
+            nonlocal dispatched
+            while dispatched < count:
+                if on_tool_call:
+                    on_tool_call(_openai_tool_call(raw_calls[dispatched]))
+                dispatched += 1
+
+        for chunk in stream:
+            if chunk.usage:
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            delta = choice.delta
+            if delta.content:
+                content.append(delta.content)
+                if on_text:
+                    on_text(delta.content)
+            for tc_delta in delta.tool_calls or []:
+                if tc_delta.index >= len(raw_calls):
+                    dispatch_until(len(raw_calls))
+                    raw_calls.append({"id": tc_delta.id, "name": "", "arguments": ""})
+                call = raw_calls[tc_delta.index]
+                if tc_delta.function and tc_delta.function.name:
+                    call["name"] += tc_delta.function.name
+                if tc_delta.function and tc_delta.function.arguments:
+                    call["arguments"] += tc_delta.function.arguments
+            if choice.finish_reason:
+                finish_reason = choice.finish_reason
+        dispatch_until(len(raw_calls))
+
+        return _openai_response("".join(content) or None, raw_calls, finish_reason, usage, self.model)
 
     def format_tool_results(self, tool_results: list[dict]) -> list[dict]:
         return [
@@ -165,10 +310,238 @@ class CerebrasProvider(LLMProvider):
         ]
 
 
+def _openai_tool_call(raw_call: dict) -> ToolCall:
+    return ToolCall(
+        id=raw_call["id"],
+        name=raw_call["name"],
+        input=json.loads(raw_call["arguments"] or "{}"),
+    )
+
+
+def _openai_response(content: str | None, raw_calls: list[dict], finish_reason: str | None, usage, model: str) -> AgentResponse:
+    """Build an AgentResponse from an OpenAI-style assistant message (complete or reassembled from a stream)."""
+    text_parts = [content] if content else []
+    tool_calls = [_openai_tool_call(rc) for rc in raw_calls]
+
+    raw = {"role": "assistant", "content": content or ""}
+    if raw_calls:
+        raw["tool_calls"] = [
+            {
+                "id": rc["id"],
+                "type": "function",
+                "function": {
+                    "name": rc["name"],
+                    "arguments": rc["arguments"],
+                },
+            }
+            for rc in raw_calls
+        ]
+
+    return AgentResponse(
+        text_parts=text_parts,
+        tool_calls=tool_calls,
+        is_done=(finish_reason == "stop"),
+        raw_message=raw,
+        usage=_openai_usage(usage),
+        model=model,
+    )
+
+
+def _openai_usage(usage) -> Usage:
+    """Map OpenAI-style usage (Cerebras caches prompt prefixes automatically) onto Usage."""
+    if usage is None:
+        return Usage()
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = (getattr(details, "cached_tokens", None) or 0) if details else 0
+    return Usage(
+        input_tokens=usage.prompt_tokens - cached,
+        output_tokens=usage.completion_tokens,
+        cache_read_tokens=cached,
+    )
+
+
+def _to_openai_messages(messages: list) -> list:
+    """Translate Anthropic-shaped messages into OpenAI chat messages."""
+    converted = []
+    for message in messages:
+        content = message["content"]
+        if isinstance(content, str):
+            converted.append({"role": message["role"], "content": content})
+            continue
+        texts = [block["text"] for block in content if block.get("type") == "text"]
+        if message["role"] == "assistant":
+            out = {"role": "assistant", "content": "\n".join(texts)}
+            calls = [block for block in content if block.get("type") == "tool_use"]
+            if calls:
+                out["tool_calls"] = [
+                    {
+                        "id": block["id"],
+                        "type": "function",
+                        "function": {"name": block["name"], "arguments": json.dumps(block["input"])},
+                    }
+                    for block in calls
+                ]
+            converted.append(out)
+            continue
+        for block in content:
+            if block.get("type") == "tool_result":
+                converted.append({"role": "tool", "tool_call_id": block["tool_use_id"], "content": block["content"]})
+        if texts:
+            converted.append({"role": "user", "content": "\n".join(texts)})
+    return converted
+
+
+def _to_anthropic_message(response: AgentResponse) -> dict:
+    """Rebuild an assistant message in Anthropic shape from a provider-neutral response."""
+    content = [{"type": "text", "text": text} for text in response.text_parts if text]
+    content += [{"type": "tool_use", "id": tc.id, "name": tc.name, "input": tc.input} for tc in response.tool_calls]
+    return {"role": "assistant", "content": content}
+
+
+class RoutingProvider(LLMProvider):
+    """Route each turn to a fast model, escalating to a strong model for code generation.
+
+    The fast model handles routing turns (list skills, call an existing one). If it
+    decides a skill must be written, its response is discarded and the same turn is
+    re-asked of the strong model; the strong model also takes the turn after a failed
+    build. Escalation lasts one turn: every other turn starts on the fast model.
+    When streaming, the fast model's output is shown as it arrives up to its first
+    codegen tool call.
+
+    The conversation is kept in Anthropic shape and translated for OpenAI-style
+    providers, so the two tiers may be different vendors.
+    """
+
+    codegen_tools = frozenset({"create_new_skill", "update_skill"})
+
+    def __init__(self, fast: LLMProvider, strong: LLMProvider):
+        self.fast = fast
+        self.strong = strong
+        self._escalated = False
+        self._tools: dict[int, list] = {}
+
+    def convert_tools(self, tools: list[dict]) -> list[dict]:
+        self._tools = {id(p): p.convert_tools(tools) for p in (self.fast, self.strong)}
+        return tools
+
+    def format_tool_results(self, tool_results: list[dict]) -> list[dict]:
+        return _anthropic_tool_results(tool_results)
+
+    def _provider_messages(self, provider: LLMProvider, messages: list) -> list:
+        if provider.message_format == "openai":
+            return _to_openai_messages(messages)
+        return messages
+
+    def _ask(self, provider: LLMProvider, phase: str, system, messages, on_text=None, on_tool_call=None, stream=False) -> AgentResponse:
+        provider_messages = self._provider_messages(provider, messages)
+        tools = self._tools[id(provider)]
+        if stream:
+            response = provider.stream_message(system, provider_messages, tools, on_text=on_text, on_tool_call=on_tool_call)
+        else:
+            response = provider.create_message(system, provider_messages, tools)
+        if provider.message_format != "anthropic":
+            response.raw_message = _to_anthropic_message(response)
+        response.phase = phase
+        return response
+
+    def _wants_codegen(self, response: AgentResponse) -> bool:
+        return any(tc.name in self.codegen_tools for tc in response.tool_calls)
+
+    def create_message(self, system: str, messages: list, tools: list) -> AgentResponse:
+        escalated, self._escalated = self._escalated, False
+        discarded = None
+        if not escalated:
+            response = self._ask(self.fast, "route", system, messages)
+            if not self._wants_codegen(response):
+                return response
+            discarded = response
+        response = self._ask(self.strong, "codegen", system, messages)
+        response.discarded = discarded
+        return response
+
+    def stream_message(self, system, messages, tools, on_text=None, on_tool_call=None) -> AgentResponse:
+        escalated, self._escalated = self._escalated, False
+        discarded = None
+        if not escalated:
+            # The fast model's text and tool calls pass straight through until it reaches
+            # for a codegen tool; everything from there on is held back, since that part
+            # of the turn goes to the strong model
+            shown: list[str] = []
+            dispatched: list[ToolCall] = []
+            holding = False
+
+            def text(delta: str) -> None:
+                if not holding:
+                    shown.append(delta)
+                    if on_text:
+                        on_text(delta)
+
+            def tool_call(tc: ToolCall) -> None:
+                nonlocal holding
+                holding = holding or tc.name in self.codegen_tools
+                if not holding:
+                    dispatched.append(tc)
+                    if on_tool_call:
+                        on_tool_call(tc)
+
+            response = self._ask(self.fast, "route", system, messages, on_text=text, on_tool_call=tool_call, stream=True)
+            if not holding:
+                return response
+            if dispatched:
+                # Tool calls already running can't be taken back: end the turn with them
+                # and give the strong model the next one
+                response.text_parts = ["".join(shown)] if shown else []
+                response.tool_calls = dispatched
+                response.raw_message = _to_anthropic_message(response)
+                self._escalated = True
+                return response
+            discarded = response
+        response = self._ask(self.strong, "codegen", system, messages, on_text=on_text, on_tool_call=on_tool_call, stream=True)
+        response.discarded = discarded
+        return response
+
+    def for_codegen(self) -> LLMProvider:
+        return self.strong
+
+    def observe_tool_result(self, tool_call: ToolCall, result: str) -> None:
+        if tool_call.name not in self.codegen_tools:
+            return
+        try:
+            failed = "error" in json.loads(result)
+        except (ValueError, TypeError):
+            failed = True
+        self._escalated = failed
+
+
+_PROVIDERS = {
+    "anthropic": AnthropicProvider,
+    "cerebras": CerebrasProvider,
+}
+
+
+# SDK clients hold connection pools and are slow to build; one per provider spec is
+# shared by every session (RoutingProvider keeps per-session state, so it is not)
+_instances: dict[str, LLMProvider] = {}
+_instances_lock = threading.Lock()
+
+
+def _make_provider(spec: str) -> LLMProvider:
+    """The provider for "name" or "name:model" (e.g. "anthropic:claude-haiku-4-5"), built on first use."""
+    name, _, model = spec.partition(":")
+    if name not in _PROVIDERS:
+        raise ValueError(f"Unknown LLM provider: {name!r}. Use 'anthropic' or 'cerebras'.")
+    with _instances_lock:
+        if spec not in _instances:
+            _instances[spec] = _PROVIDERS[name](model or None)
+        return _instances[spec]
+
+
 def get_provider() -> LLMProvider:
-    if config.LLM_PROVIDER == "anthropic":
-        return AnthropicProvider()
-    elif config.LLM_PROVIDER == "cerebras":
-        return CerebrasProvider()
-    else:
+    if config.LLM_ROUTING == "hybrid":
+        return RoutingProvider(
+            fast=_make_provider(config.LLM_FAST_PROVIDER),
+            strong=_make_provider(config.LLM_STRONG_PROVIDER),
+        )
+    if config.LLM_PROVIDER not in _PROVIDERS:
         raise ValueError(f"Unknown LLM_PROVIDER: {config.LLM_PROVIDER!r}. Use 'anthropic' or 'cerebras'.")
+    return _make_provider(config.LLM_PROVIDER)
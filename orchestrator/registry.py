@@ -1,4 +1,7 @@
 import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
 
 import httpx
 
@@ -11,6 +14,8 @@ class SkillRegistry:
     def __init__(self):
         self._skills: dict[str, Skill] = {}
         self._lock = threading.Lock()
+        self._inflight: dict[str, int] = {}  # container_id -> calls in flight
+        self._idle = threading.Condition(self._lock)
 
     def register(self, skill: Skill) -> None:
         """Add a skill to the registry."""
@@ -22,18 +27,71 @@ class SkillRegistry:
         with self._lock:
             return self._skills.get(name)
 
+    def skills(self) -> list[Skill]:
+        """Snapshot of all registered Skill records."""
+        with self._lock:
+            return list(self._skills.values())
+
     def list_skills(self) -> list[dict]:
         """Return a summary of all registered skills (for Claude's tool context)."""
         with self._lock:
-            return [
-                {
-                    "name": skill.name,
-                    "description": skill.description,
-                    "endpoint": skill.endpoint,
-                    "status": skill.status.value,
-                }
-                for skill in self._skills.values()
-            ]
+            return [self._summary(skill) for skill in self._skills.values()]
+
+    @staticmethod
+    def _summary(skill: Skill) -> dict:
+        summary = {
+            "name": skill.name,
+            "description": skill.description,
+            "endpoint": skill.endpoint,
+            "status": skill.status.value,
+        }
+        if skill.benchmark is not None and skill.benchmark.version == skill.version:
+            knee = skill.benchmark.at_saturation()
+            summary["capacity"] = {
+                "peak_rps": skill.benchmark.peak_throughput_rps,
+                "saturation_concurrency": knee.concurrency,
+                "p99_ms": knee.p99_ms,
+            }
+        return summary
+
+    @contextmanager
+    def lease(self, name: str) -> Iterator[Skill | None]:
+        """Look up a skill and count a call against it until the block exits.
+
+        The count lets a version replaced by swap() finish its in-flight calls
+        before it is stopped. Yields None if the skill isn't registered.
+        """
+        with self._lock:
+            skill = self._skills.get(name)
+            if skill is not None:
+                self._inflight[skill.container_id] = self._inflight.get(skill.container_id, 0) + 1
+        try:
+            yield skill
+        finally:
+            if skill is not None:
+                with self._lock:
+                    self._inflight[skill.container_id] -= 1
+                    if not self._inflight[skill.container_id]:
+                        del self._inflight[skill.container_id]
+                        self._idle.notify_all()
+
+    def swap(self, skill: Skill) -> Skill | None:
+        """Atomically replace the registered skill of the same name. Returns the previous version."""
+        with self._lock:
+            previous = self._skills.get(skill.name)
+            self._skills[skill.name] = skill
+            return previous
+
+    def drain(self, skill: Skill, timeout: float) -> bool:
+        """Wait until no calls are in flight to this skill instance. False if timed out."""
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while self._inflight.get(skill.container_id):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+            return True
 
     def remove(self, name: str) -> None:
         """Remove a skill from the registry."""
@@ -49,7 +107,7 @@ class SkillRegistry:
             if skill.status != SkillStatus.RUNNING:
                 continue
             try:
-                resp = httpx.get(f"http://localhost:{skill.port}/health", timeout=3)
+                resp = httpx.get(skill.url("/health"), timeout=3)
                 if resp.status_code != 200:
                     raise Exception("unhealthy")
             except Exception:
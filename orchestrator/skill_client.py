@@ -0,0 +1,106 @@
+"""HTTP client for calling deployed skills.
+
+Requests are msgpack-encoded and compressed above TRANSPORT_COMPRESS_MIN_BYTES when
+the skill advertised support in /health and the codec is installed here; otherwise
+plain JSON. The codecs are project dependencies, so a missing one means a broken
+install — missing_codecs() lets startup say so. Responses are negotiated with Accept / Accept-Encoding (httpx decodes
+gzip and zstd itself).
+"""
+
+import gzip
+import json
+import threading
+
+import httpx
+
+import config
+import telemetry
+from models.skill import Skill
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SKILL_CALL_TIMEOUT = 30  # seconds
+_MSGPACK = "application/msgpack"
+
+# One pooled client so repeated calls reuse keep-alive connections; created on first
+# call, since building its SSL context is a noticeable part of startup
+_client: httpx.Client | None = None
+_client_lock = threading.Lock()
+
+
+def missing_codecs() -> list[str]:
+    """Transport codecs that failed to import; calls fall back to JSON (and gzip) without them."""
+    return [name for name, module in (("msgpack", msgpack), ("orjson", orjson), ("zstandard", zstandard))
+            if module is None]
+
+
+def _http() -> httpx.Client:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = httpx.Client(timeout=SKILL_CALL_TIMEOUT)
+        return _client
+
+
+def _encode_request(skill: Skill, payload: dict) -> tuple[bytes, dict]:
+    if msgpack and "msgpack" in skill.codecs:
+        body = msgpack.packb(payload)
+        headers = {"content-type": _MSGPACK}
+    else:
+        body = orjson.dumps(payload) if orjson else json.dumps(payload).encode()
+        headers = {"content-type": "application/json"}
+
+    if len(body) >= config.TRANSPORT_COMPRESS_MIN_BYTES:
+        if zstandard and "zstd" in skill.encodings:
+            body = zstandard.ZstdCompressor(level=3).compress(body)
+            headers["content-encoding"] = "zstd"
+        elif "gzip" in skill.encodings:
+            body = gzip.compress(body, compresslevel=5)
+            headers["content-encoding"] = "gzip"
+    return body, headers
+
+
+def post_execute(skill: Skill, payload: dict, binary: bool = False, extra_headers: dict | None = None) -> httpx.Response:
+    """POST a payload to a skill's /execute endpoint.
+
+    binary=True asks for a msgpack response, for callers that decode the result
+    themselves (pipelines) rather than hand text to the model.
+    """
+    body, headers = _encode_request(skill, payload)
+    headers.update(extra_headers or {})
+    if binary and msgpack and "msgpack" in skill.codecs:
+        headers["accept"] = f"{_MSGPACK}, application/json;q=0.9"
+    else:
+        headers["accept"] = "application/json"
+    with telemetry.span("skill.call", skill=skill.name, request_bytes=len(body)) as call:
+        resp = _http().post(skill.endpoint, content=body, headers=headers)
+        call.set(status=resp.status_code, response_bytes=len(resp.content))
+    telemetry.count("helix_skill_calls_total", skill=skill.name, status=resp.status_code)
+    return resp
+
+
+def call_route(skill: Skill, method: str, path: str, **kwargs) -> httpx.Response:
+    """Call another route on a skill's server with the pooled client, e.g. GET /profile."""
+    return _http().request(method, skill.url(path), **kwargs)
+
+
+def decode_response(resp: httpx.Response):
+    """Parse a skill response body: msgpack or JSON into Python values, anything else as text."""
+    content_type = resp.headers.get("content-type", "")
+    if content_type.startswith(_MSGPACK):
+        return msgpack.unpackb(resp.content, raw=False)
+    try:
+        return orjson.loads(resp.content) if orjson else resp.json()
+    except ValueError:
+        return resp.text
@@ -0,0 +1,102 @@
+"""Speculative skill builds — race several candidate implementations, keep the first that works."""
+
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable
+
+from rich.console import Console
+
+from models.skill import Skill, SkillSpec
+from orchestrator.skill_client import post_execute
+from skill_factory.factory import build_and_run, remove_skill
+
+console = Console()
+
+
+def smoke_test(skill: Skill, payload: dict) -> None:
+    """Call a freshly built skill once. Raises if it errors or returns an error payload."""
+    resp = post_execute(skill, payload)
+    if resp.status_code != 200:
+        raise RuntimeError(f"Smoke test failed with HTTP {resp.status_code}: {resp.text[:500]}")
+    try:
+        body = resp.json()
+    except ValueError:
+        return
+    if isinstance(body, dict) and "error" in body:
+        raise RuntimeError(f"Smoke test returned an error: {body['error']}")
+
+
+def build_verified(spec: SkillSpec, instance: str | None = None, smoke_payload: dict | None = None) -> Skill:
+    """Build and health-check a skill, then smoke test it if a payload is given."""
+    skill = build_and_run(spec, instance=instance)
+    if smoke_payload is not None:
+        try:
+            smoke_test(skill, smoke_payload)
+        except Exception:
+            remove_skill(skill)
+            raise
+    return skill
+
+
+def race_candidates(
+    spec: SkillSpec,
+    make_candidate: Callable[[int], SkillSpec],
+    count: int,
+    smoke_payload: dict | None = None,
+) -> Skill:
+    """Build spec plus count-1 generated alternatives concurrently; return the first that passes.
+
+    make_candidate(i) asks the LLM for alternative i and runs in parallel with the
+    builds. Once a winner is found, candidates that haven't started are cancelled
+    and builds still in flight are torn down as they finish, so the caller only
+    waits for the fastest passing candidate.
+    """
+    done_event = threading.Event()
+    errors: list[str] = []
+    pool = ThreadPoolExecutor(max_workers=2 * count, thread_name_prefix=f"candidate-{spec.name}")
+
+    def build(candidate: SkillSpec, index: int) -> Skill:
+        if done_event.is_set():
+            raise RuntimeError("cancelled")
+        console.print(f"[yellow]Building candidate {index}/{count} for '{spec.name}'...[/yellow]")
+        return build_verified(candidate, instance=f"c{index}", smoke_payload=smoke_payload)
+
+    def discard_loser(future: Future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            remove_skill(future.result())
+
+    builds: dict[Future, int] = {pool.submit(build, spec, 1): 1}
+    generations: dict[Future, int] = {pool.submit(make_candidate, i): i for i in range(2, count + 1)}
+    pending: set[Future] = set(builds) | set(generations)
+    winner: Skill | None = None
+
+    try:
+        while pending and winner is None:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                if future in generations:
+                    index = generations[future]
+                    if future.exception() is not None:
+                        errors.append(f"candidate {index} generation: {future.exception()}")
+                        continue
+                    build_future = pool.submit(build, future.result(), index)
+                    builds[build_future] = index
+                    pending.add(build_future)
+                elif future.exception() is not None:
+                    errors.append(f"candidate {builds[future]}: {future.exception()}")
+                    console.print(f"[red]Candidate {builds[future]} failed: {str(future.exception())[:200]}[/red]")
+                elif winner is None:
+                    winner = future.result()
+                    console.print(f"[green]Candidate {builds[future]} passed[/green]")
+                else:
+                    discard_loser(future)
+    finally:
+        done_event.set()
+        for future in pending:
+            if future in builds:
+                future.add_done_callback(discard_loser)
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    if winner is None:
+        raise RuntimeError("All candidates failed:\n" + "\n".join(errors))
+    return winner
@@ -1,120 +1,292 @@
+import re
 import shutil
 import textwrap
+import threading
 import time
+from dataclasses import dataclass
 from pathlib import Path
 
-import docker
 import httpx
-from jinja2 import Environment, FileSystemLoader
 
 import config
+import telemetry
 from models.skill import Skill, SkillSpec, SkillStatus
-from skill_factory.port_manager import allocate_port
+from skill_factory.hosts import DockerHost, get_host_pool
+from skill_factory.placement import container_limits, infer_resource_class
+from skill_factory.port_manager import allocate_port, release_port
 
-# Jinja2 setup — load templates from the templates directory
+# Jinja2 templates; environments are created on first render (jinja2 and docker are
+# imported where first needed, so importing this module stays cheap)
 TEMPLATE_DIR = Path(__file__).parent / "templates" / "fastapi_skill"
 BUILDS_DIR = Path(__file__).parent / "builds"
-jinja_env = Environment(loader=FileSystemLoader(str(TEMPLATE_DIR)))
+HOST_TEMPLATE_DIR = Path(__file__).parent / "templates" / "skill_host"
+_template_envs: dict[Path, object] = {}
+
+# Every image and container Helix creates carries this label, so garbage collection
+# only ever touches what Helix owns on a shared daemon
+MANAGED_LABEL = "helix.managed"
+
+
+def _template(directory: Path, name: str):
+    """Load a template, creating the Jinja2 environment for its directory on first use."""
+    env = _template_envs.get(directory)
+    if env is None:
+        from jinja2 import Environment, FileSystemLoader
+        env = _template_envs.setdefault(directory, Environment(loader=FileSystemLoader(str(directory))))
+    return env.get_template(name)
+
+
+def build_dir_for(name: str, instance: str | None = None) -> Path:
+    """Where build_and_run writes a skill's Dockerfile and sources."""
+    return BUILDS_DIR / (f"{name}-{instance}" if instance else name)
+
+
+# Deployments in progress: build dir -> (container name, image tag). Garbage
+# collection leaves these alone until the deploy finishes or fails.
+_deploying: dict[Path, tuple[str, str]] = {}
+_deploying_lock = threading.Lock()
+
+
+def deploying() -> dict[Path, tuple[str, str]]:
+    """Snapshot of the deployments currently being built, started or health-checked."""
+    with _deploying_lock:
+        return dict(_deploying)
+
+
+# pip distribution name -> import name, where they differ
+_IMPORT_NAMES = {
+    "beautifulsoup4": "bs4",
+    "pillow": "PIL",
+    "python-dateutil": "dateutil",
+    "pyyaml": "yaml",
+    "scikit-learn": "sklearn",
+    "opencv-python": "cv2",
+    "opencv-python-headless": "cv2",
+    "python-docx": "docx",
+    "pymupdf": "fitz",
+}
+
+
+def import_name(dependency: str) -> str:
+    """Best-effort module name for a pip requirement, e.g. 'Pillow>=10' -> 'PIL'."""
+    name = re.split(r"[<>=!~;\s]", dependency.strip(), maxsplit=1)[0].lower()
+    if name in _IMPORT_NAMES:
+        return _IMPORT_NAMES[name]
+    return name.split("[", 1)[0].replace("-", "_")
 
 
 def render_skill(spec: SkillSpec) -> dict[str, str]:
     """Render the Jinja2 templates into source files using a SkillSpec."""
-    # Indent code blocks to sit inside their try blocks (8 spaces)
-    indented_code = textwrap.indent(spec.execute_code, "        ")
+    # Indent code blocks: execute_code is a function body (4 spaces), view_post_code sits in a try block (8)
+    indented_code = textwrap.indent(spec.execute_code, "    ")
     indented_view_post = textwrap.indent(spec.view_post_code, "        ")
 
-    main_py = jinja_env.get_template("main.py.j2").render(
+    main_py = _template(TEMPLATE_DIR, "main.py.j2").render(
         skill_name=spec.name,
         execute_code=indented_code,
+        execute_code_lines=len(spec.execute_code.splitlines()),
         view_post_code=indented_view_post,
+        files_mount=config.SKILL_FILES_MOUNT,
+        artifacts_mount=config.SKILL_ARTIFACTS_MOUNT,
+        compress_min_bytes=config.TRANSPORT_COMPRESS_MIN_BYTES,
+        warmup_modules=repr([import_name(dep) for dep in spec.dependencies]),
+        warmup_payloads=repr(spec.warmup_payloads),
     )
 
-    dockerfile = jinja_env.get_template("Dockerfile.j2").render(
+    dockerfile = _template(TEMPLATE_DIR, "Dockerfile.j2").render(
         base_image=config.SKILL_BASE_IMAGE,
         dependencies=spec.dependencies,
+        profile=config.SKILL_IMAGE_PROFILE,
     )
 
     return {"main.py": main_py, "Dockerfile": dockerfile}
 
 
-def build_and_run(spec: SkillSpec) -> Skill:
-    """Take a SkillSpec, build a Docker image, run the container, return a Skill."""
-    client = docker.from_env()
-    port = allocate_port()
-    image_tag = f"helix-skill-{spec.name}:latest"
+@dataclass
+class _Deployment:
+    host: DockerHost
+    port: int
+    container: object
+    image_tag: str
+    health: dict
+
+
+def build_and_run(spec: SkillSpec, instance: str | None = None) -> Skill:
+    """Take a SkillSpec, build a Docker image, run the container, return a Skill.
+
+    instance distinguishes builds of the same skill that exist side by side
+    (e.g. speculative candidates); it suffixes the image tag, container name and build dir.
+    The container goes to the least-loaded Docker host in the pool; raises PlacementError
+    if no host has room for the skill's resource class.
+    """
+    resource_class = infer_resource_class(spec)
+    warms_up = bool(spec.dependencies or spec.warmup_payloads)
+    deployment = _deploy(spec.name, render_skill(spec), instance, resource_class, warms_up)
+    return _skill_record(spec, deployment, resource_class, "/execute")
+
+
+def render_group(group_name: str, specs: list[SkillSpec], dependencies: list[str]) -> dict[str, str]:
+    """Render a shared host container: each skill's module under skills/, mounted at /s/<name>."""
+    modules = {spec.name: _module_name(spec.name) for spec in specs}
+    files = {
+        "main.py": _template(HOST_TEMPLATE_DIR, "main.py.j2").render(group_name=group_name, skills=repr(modules)),
+        "Dockerfile": _template(TEMPLATE_DIR, "Dockerfile.j2").render(
+            base_image=config.SKILL_BASE_IMAGE,
+            dependencies=dependencies,
+            profile=config.SKILL_IMAGE_PROFILE,
+        ),
+    }
+    for spec in specs:
+        files[f"skills/{modules[spec.name]}.py"] = render_skill(spec)["main.py"]
+    return files
+
+
+def build_and_run_group(group_name: str, specs: list[SkillSpec], dependencies: list[str], instance: str) -> list[Skill]:
+    """Build one host container serving several skills; return a Skill record per member.
+
+    Members share the container, port and image; each is reached under /s/<name>.
+    """
+    warms_up = any(spec.dependencies or spec.warmup_payloads for spec in specs)
+    files = render_group(group_name, specs, dependencies)
+    deployment = _deploy(group_name, files, instance, config.PACK_RESOURCE_CLASS, warms_up)
+    return [_skill_record(spec, deployment, config.PACK_RESOURCE_CLASS, f"/s/{spec.name}/execute") for spec in specs]
+
+
+def _module_name(name: str) -> str:
+    return re.sub(r"\W", "_", name)
 
-    # Render templates to source files
-    files = render_skill(spec)
+
+def _skill_record(spec: SkillSpec, deployment: _Deployment, resource_class: str, path: str) -> Skill:
+    return Skill(
+        name=spec.name,
+        description=spec.description,
+        endpoint=f"http://{deployment.host.address}:{deployment.port}{path}",
+        port=deployment.port,
+        host=deployment.host.name,
+        container_id=deployment.container.id,
+        image_name=deployment.image_tag,
+        status=SkillStatus.RUNNING,
+        resource_class=resource_class,
+        codecs=deployment.health.get("codecs", ["json"]),
+        encodings=deployment.health.get("encodings", []),
+        spec=spec,
+    )
+
+
+def _deploy(name: str, files: dict[str, str], instance: str | None, resource_class: str, warms_up: bool) -> _Deployment:
+    """Place, build, run and health-check one container. Releases its port and budget on failure."""
+    image_tag = f"helix-skill-{name}:{instance or 'latest'}"
+    build_dir = build_dir_for(name, instance)
+    with _deploying_lock:
+        _deploying[build_dir] = (f"helix-{name}-{instance}" if instance else f"helix-{name}", image_tag)
+    try:
+        return _place_and_deploy(name, files, instance, image_tag, resource_class, warms_up)
+    finally:
+        with _deploying_lock:
+            _deploying.pop(build_dir, None)
+
+
+def _place_and_deploy(name: str, files: dict[str, str], instance: str | None, image_tag: str, resource_class: str, warms_up: bool) -> _Deployment:
+    pool = get_host_pool()
+    host = pool.place(image_tag, resource_class, timeout=config.PLACEMENT_QUEUE_TIMEOUT)
+    try:
+        port = allocate_port(host.name, probe=host.is_local)
+    except Exception:
+        host.budget.release(image_tag)
+        raise
+    try:
+        return _build_and_run(name, files, host, port, instance, image_tag, resource_class, warms_up)
+    except Exception:
+        release_port(port, host.name)
+        host.budget.release(image_tag)
+        raise
+
+
+def _build_and_run(name: str, files: dict[str, str], host: DockerHost, port: int, instance: str | None, image_tag: str, resource_class: str, warms_up: bool) -> _Deployment:
+    import docker
+
+    client = host.client
+    suffix = f"-{instance}" if instance else ""
 
     # Write source files to persistent builds directory
-    build_dir = BUILDS_DIR / spec.name
+    build_dir = build_dir_for(name, instance)
     if build_dir.exists():
         shutil.rmtree(build_dir)
     build_dir.mkdir(parents=True)
 
     for filename, content in files.items():
-        (build_dir / filename).write_text(content)
+        path = build_dir / filename
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
 
     # Build image
     try:
-        client.images.build(
-            path=str(build_dir),
-            tag=image_tag,
-            rm=True,
-            timeout=config.CONTAINER_TIMEOUT,
-        )
+        with telemetry.span("docker.build", image=image_tag, host=host.name):
+            client.images.build(
+                path=str(build_dir),
+                tag=image_tag,
+                labels={MANAGED_LABEL: "true"},
+                rm=True,
+                timeout=config.CONTAINER_TIMEOUT,
+            )
     except docker.errors.BuildError as e:
         build_log = "\n".join(line.get("stream", "") for line in e.build_log if "stream" in line)
         raise RuntimeError(f"Docker build failed:\n{build_log}") from e
 
-    # Run container
-    container = client.containers.run(
-        image_tag,
-        detach=True,
-        ports={"8000/tcp": port},
-        network=config.DOCKER_NETWORK,
-        name=f"helix-{spec.name}",
-    )
-
-    # Build the Skill object
-    skill = Skill(
-        name=spec.name,
-        description=spec.description,
-        endpoint=f"http://localhost:{port}/execute",
-        port=port,
-        container_id=container.id,
-        image_name=image_tag,
-        status=SkillStatus.BUILDING,
-    )
+    # Run container within its resource class, with the shared input files mounted read-only
+    # and the artifact store writable
+    Path(config.SHARED_FILES_DIR).mkdir(parents=True, exist_ok=True)
+    Path(config.ARTIFACTS_DIR).mkdir(parents=True, exist_ok=True)
+    with telemetry.span("docker.run", image=image_tag, host=host.name, resource_class=resource_class):
+        container = client.containers.run(
+            image_tag,
+            detach=True,
+            ports={"8000/tcp": port},
+            network=config.DOCKER_NETWORK,
+            name=f"helix-{name}{suffix}",
+            labels={MANAGED_LABEL: "true"},
+            volumes={
+                config.SHARED_FILES_DIR: {"bind": config.SKILL_FILES_MOUNT, "mode": "ro"},
+                config.ARTIFACTS_DIR: {"bind": config.SKILL_ARTIFACTS_MOUNT, "mode": "rw"},
+            },
+            **container_limits(resource_class),
+        )
 
-    # Wait for healthy
-    if wait_for_healthy(port):
-        skill.status = SkillStatus.RUNNING
-    else:
+    # Wait for healthy (after warmup); /health also advertises the transport codecs the skill supports
+    startup_timeout = config.SKILL_STARTUP_TIMEOUT
+    if warms_up:
+        startup_timeout += config.SKILL_WARMUP_TIMEOUT
+    with telemetry.span("skill.health_wait", skill=name, timeout=startup_timeout) as wait:
+        health = wait_for_healthy(port, startup_timeout, host.address)
+        wait.set(healthy=health is not None)
+    if health is None:
         container.stop(timeout=5)
         container.remove()
-        skill.status = SkillStatus.FAILED
-        raise RuntimeError(f"Skill '{spec.name}' failed to start within {config.SKILL_STARTUP_TIMEOUT}s")
+        raise RuntimeError(f"Skill '{name}' failed to start within {startup_timeout}s")
 
-    return skill
+    return _Deployment(host, port, container, image_tag, health)
 
 
-def wait_for_healthy(port: int) -> bool:
-    """Poll /health until the container is ready."""
-    deadline = time.time() + config.SKILL_STARTUP_TIMEOUT
+def wait_for_healthy(port: int, timeout: float = config.SKILL_STARTUP_TIMEOUT, address: str = "localhost") -> dict | None:
+    """Poll /health until the container is ready. Returns the health payload, or None on timeout."""
+    deadline = time.time() + timeout
     while time.time() < deadline:
         try:
-            resp = httpx.get(f"http://localhost:{port}/health", timeout=2)
+            resp = httpx.get(f"http://{address}:{port}/health", timeout=2)
             if resp.status_code == 200:
-                return True
+                return resp.json()
         except (httpx.ConnectError, httpx.ReadError, httpx.RemoteProtocolError):
-            time.sleep(0.5)
-    return False
+            pass
+        time.sleep(0.5)  # not listening yet, or still warming up (503)
+    return None
 
 
 def remove_skill(skill: Skill) -> None:
-    """Stop and remove a skill's container and image."""
-    client = docker.from_env()
+    """Stop and remove a skill's container and image on the host it runs on."""
+    import docker
+
+    host = get_host_pool().get(skill.host)
+    client = host.client
     try:
         container = client.containers.get(skill.container_id)
         container.stop(timeout=5)
@@ -125,3 +297,5 @@ def remove_skill(skill: Skill) -> None:
         client.images.remove(skill.image_name, force=True)
     except docker.errors.ImageNotFound:
         pass
+    release_port(skill.port, host.name)
+    host.budget.release(skill.image_name)
@@ -0,0 +1,254 @@
+"""Garbage collection for skill images, leftover containers and build directories.
+
+Crashed or interrupted runs leave helix-skill-* images, stopped helix-* containers
+and skill_factory/builds/<name> directories behind. collect_garbage removes the ones
+no registered skill references, least recently built first, until Helix's disk use
+is under GC_DISK_BUDGET_BYTES and the Docker disk has GC_MIN_FREE_BYTES free (free
+space is only measured for local daemons; remote hosts go by the budget alone).
+Containers and dangling images are only collected if they carry the helix.managed
+label, so other projects sharing the daemon are left alone.
+Sizes count only each image's unique layers, and images are removed without force,
+so shared base layers (python:3.12-slim and friends) are never touched. Nothing a
+deploy in progress may still need (its build dir, image or container) is collected.
+"""
+
+import shutil
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable
+
+import config
+from models.skill import Skill
+from skill_factory.factory import BUILDS_DIR, MANAGED_LABEL, build_dir_for, deploying
+from skill_factory.hosts import get_host_pool
+
+IMAGE_PREFIX = "helix-skill-"
+_MANAGED = f"{MANAGED_LABEL}=true"
+
+
+@dataclass
+class GcReport:
+    removed_containers: list[str] = field(default_factory=list)
+    removed_images: list[str] = field(default_factory=list)
+    removed_build_dirs: list[str] = field(default_factory=list)
+    freed_bytes: int = 0
+
+    def merge(self, other: "GcReport") -> None:
+        self.removed_containers += other.removed_containers
+        self.removed_images += other.removed_images
+        self.removed_build_dirs += other.removed_build_dirs
+        self.freed_bytes += other.freed_bytes
+
+    def summary(self) -> str:
+        return (
+            f"removed {len(self.removed_images)} image(s), {len(self.removed_build_dirs)} build dir(s), "
+            f"{len(self.removed_containers)} container(s); freed {self.freed_bytes / 1e6:.0f} MB"
+        )
+
+
+@dataclass
+class _Entry:
+    tag: str
+    build_dir: Path
+    size: int
+    last_used: float
+    created: float  # when the image was built
+
+
+@dataclass
+class _Protected:
+    """What a collection must not touch: referenced or still being deployed."""
+    tags: set[str]
+    containers: set[str]
+    container_names: set[str]
+    dirs: set[Path]
+
+
+def _dir_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def _build_dir_for_tag(tag: str) -> Path:
+    """helix-skill-<name>:<instance|latest> -> the directory build_and_run wrote it from."""
+    name, _, instance = tag[len(IMAGE_PREFIX):].partition(":")
+    return build_dir_for(name, None if instance == "latest" else instance)
+
+
+def _free_bytes(client, local: bool) -> int | None:
+    """Free space on Docker's disk, or None if it can't be measured from here.
+
+    DockerRootDir is a path on the daemon's machine, so it is only statted for a local
+    daemon; a remote host's free space is unknown and its images are collected against
+    the disk budget alone.
+    """
+    import docker
+
+    if not local:
+        return None
+    try:
+        root = client.info().get("DockerRootDir", "")
+        return shutil.disk_usage(root).free
+    except (OSError, docker.errors.APIError):
+        return shutil.disk_usage(BUILDS_DIR if BUILDS_DIR.exists() else Path.cwd()).free
+
+
+def _recent(timestamp: float, now: float) -> bool:
+    return now - timestamp < config.GC_GRACE_PERIOD
+
+
+def _container_created(container) -> float:
+    """Creation time of a container, from Docker's RFC 3339 "Created" (0 if unknown)."""
+    created = (getattr(container, "attrs", None) or {}).get("Created", "")
+    try:
+        return datetime.fromisoformat(created[:19]).replace(tzinfo=timezone.utc).timestamp()
+    except ValueError:
+        return 0.0
+
+
+def collect_garbage(
+    in_use: Iterable[Skill],
+    budget_bytes: int = config.GC_DISK_BUDGET_BYTES,
+    min_free_bytes: int = config.GC_MIN_FREE_BYTES,
+    client=None,
+) -> GcReport:
+    """Remove unreferenced skill images, containers and build dirs until within budget.
+
+    Without a client, every Docker host in the pool is collected, each against its own
+    budget and only for its own images; hosts that can't be reached are skipped. Build
+    dirs with no image on any host are removed only if every host could be listed.
+
+    Deployments in progress, and anything created in the last GC_GRACE_PERIOD seconds
+    (a finished deploy whose skill isn't registered yet), are left alone.
+    """
+    import docker
+
+    in_use = list(in_use)
+    report = GcReport()
+    listed: list[tuple[object, bool, list[dict]]] = []  # (client, is it local, its images)
+    complete = True
+    if client is not None:
+        listed.append((client, True, client.df().get("Images") or []))
+    else:
+        for host in get_host_pool().hosts.values():
+            try:
+                host_client = host.client
+                listed.append((host_client, host.is_local, host_client.df().get("Images") or []))
+            except docker.errors.DockerException:
+                complete = False
+
+    tag_hosts: dict[str, int] = {}
+    for _, _, images in listed:
+        for tag in {t for image in images for t in image.get("RepoTags") or [] if t.startswith(IMAGE_PREFIX)}:
+            tag_hosts[tag] = tag_hosts.get(tag, 0) + 1
+    in_flight = deploying()
+    protected = _Protected(
+        tags={s.image_name for s in in_use if s.image_name} | {tag for _, tag in in_flight.values()},
+        containers={s.container_id for s in in_use if s.container_id},
+        container_names={name for name, _ in in_flight.values()},
+        dirs=set(in_flight),
+    )
+    protected.dirs |= {_build_dir_for_tag(tag) for tag in protected.tags}
+
+    for host_client, local, images in listed:
+        try:
+            free = _free_bytes(host_client, local)
+            report.merge(_collect_host(host_client, images, protected, tag_hosts, budget_bytes, min_free_bytes, free))
+        except docker.errors.DockerException:
+            if client is not None:
+                raise
+
+    # Build dirs whose image is gone are always garbage — unless a host we couldn't
+    # list might still have it
+    if complete and BUILDS_DIR.exists():
+        now = time.time()
+        known_dirs = {_build_dir_for_tag(tag) for tag in tag_hosts}
+        for build_dir in BUILDS_DIR.iterdir():
+            if (not build_dir.is_dir() or build_dir in known_dirs or build_dir in protected.dirs
+                    or _recent(build_dir.stat().st_mtime, now)):
+                continue
+            size = _dir_size(build_dir)
+            shutil.rmtree(build_dir, ignore_errors=True)
+            report.removed_build_dirs.append(build_dir.name)
+            report.freed_bytes += size
+    return report
+
+
+def _collect_host(client, images: list[dict], protected: _Protected, tag_hosts: dict[str, int],
+                  budget_bytes: int, min_free_bytes: int, free: int | None) -> GcReport:
+    """One host's pass: its leftover containers, dangling layers and LRU skill images.
+
+    free is the daemon's free disk space; None (unknown) leaves the disk budget in charge.
+    """
+    import docker
+
+    report = GcReport()
+    now = time.time()
+
+    # Stopped containers from crashed runs keep their images alive — remove them first.
+    # A "created" container may be a deploy that's starting right now.
+    stopped = {"label": _MANAGED, "status": ["exited", "created", "dead"]}
+    for container in client.containers.list(all=True, filters=stopped):
+        if (container.id in protected.containers or container.name in protected.container_names
+                or container.status not in ("exited", "created", "dead")
+                or _recent(_container_created(container), now)):
+            continue
+        container.remove()
+        report.removed_containers.append(container.name)
+
+    # Dangling layers from failed or superseded builds are never useful
+    pruned = client.images.prune(filters={"dangling": True, "label": _MANAGED})
+    report.freed_bytes += pruned.get("SpaceReclaimed") or 0
+
+    # This host's skill images, with their unique size plus their build dir
+    entries: list[_Entry] = []
+    for image in images:
+        for tag in image.get("RepoTags") or []:
+            if not tag.startswith(IMAGE_PREFIX):
+                continue
+            build_dir = _build_dir_for_tag(tag)
+            dir_size = _dir_size(build_dir) if build_dir.exists() else 0
+            last_used = max(image.get("Created", 0), build_dir.stat().st_mtime if build_dir.exists() else 0)
+            unique = max(0, image.get("Size", 0) - max(0, image.get("SharedSize", 0)))
+            entries.append(_Entry(tag, build_dir, unique + dir_size, last_used, image.get("Created", 0)))
+
+    usage = sum(e.size for e in entries)
+    for entry in sorted(entries, key=lambda e: e.last_used):
+        if usage <= budget_bytes and (free is None or free >= min_free_bytes):
+            break
+        if entry.tag in protected.tags or entry.build_dir in protected.dirs or _recent(entry.created, now):
+            continue
+        try:
+            client.images.remove(entry.tag)  # no force: skip images a container still uses
+        except docker.errors.APIError:
+            continue
+        report.removed_images.append(entry.tag)
+        # Another host may run the same tag from this build dir
+        if tag_hosts.get(entry.tag, 0) <= 1 and entry.build_dir.exists():
+            shutil.rmtree(entry.build_dir, ignore_errors=True)
+            report.removed_build_dirs.append(entry.build_dir.name)
+        usage -= entry.size
+        if free is not None:
+            free += entry.size
+        report.freed_bytes += entry.size
+    return report
+
+
+_last_run = 0.0
+_run_lock = threading.Lock()
+
+
+def maybe_collect_garbage(in_use: Iterable[Skill]) -> GcReport | None:
+    """collect_garbage at most once per GC_INTERVAL seconds; None if skipped or already running."""
+    global _last_run
+    if not _run_lock.acquire(blocking=False):
+        return None
+    try:
+        if time.monotonic() - _last_run < config.GC_INTERVAL:
+            return None
+        _last_run = time.monotonic()
+        return collect_garbage(in_use)
+    finally:
+        _run_lock.release()
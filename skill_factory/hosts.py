@@ -0,0 +1,193 @@
+"""The pool of Docker daemons skills are placed on.
+
+HELIX_DOCKER_HOSTS lists the daemons as comma-separated entries, each "url" or
+"name=url": "local" (the daemon from the environment, like docker.from_env()),
+"unix:///path/docker.sock" or "tcp://10.0.0.5:2375". Skills on a TCP host are
+reached at that host's address; everything else is reached at localhost. Each host
+gets its own HostBudget, and a deploy goes to the least-loaded host with room,
+preferring hosts that already have the base image (and so its layers) cached.
+A host that can't be reached is skipped for a backoff period before it's retried;
+if no host can be reached at all, placement fails straight away with
+HostUnavailableError instead of queueing for capacity.
+"""
+
+import threading
+import time
+from typing import Callable
+from urllib.parse import urlparse
+
+import config
+from skill_factory.placement import HostBudget, PlacementError
+
+LOCAL = "local"
+
+
+class HostUnavailableError(PlacementError):
+    """No Docker host in the pool can be reached, so there is no capacity to wait for."""
+
+
+def _default_client_factory(base_url: str):
+    import docker
+
+    if base_url == LOCAL:
+        return docker.from_env()
+    return docker.DockerClient(base_url=base_url)
+
+
+class DockerHost:
+    """One Docker daemon: its client, the address its published ports are reached at, and its budget."""
+
+    def __init__(self, name: str, base_url: str, budget: HostBudget, client_factory: Callable = _default_client_factory):
+        self.name = name
+        self.base_url = base_url
+        self.budget = budget
+        parsed = urlparse(base_url)
+        self.address = parsed.hostname if parsed.scheme in ("tcp", "http", "https") and parsed.hostname else "localhost"
+        self._client_factory = client_factory
+        self._client = None
+        self._cached_images: set[str] = set()
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._down_until = 0.0
+
+    @property
+    def is_local(self) -> bool:
+        return self.address in ("localhost", "127.0.0.1")
+
+    @property
+    def available(self) -> bool:
+        """False while the host is backing off after failing to connect."""
+        return time.monotonic() >= self._down_until
+
+    def retry_in(self) -> float:
+        return max(0.0, self._down_until - time.monotonic())
+
+    def mark_down(self) -> None:
+        """Skip this host for a while; the wait doubles with each consecutive failure."""
+        with self._lock:
+            self._back_off()
+
+    def _back_off(self) -> None:
+        self._failures += 1
+        backoff = min(config.DOCKER_HOST_RETRY_MAX, config.DOCKER_HOST_RETRY_MIN * 2 ** (self._failures - 1))
+        self._down_until = time.monotonic() + backoff
+        self._client = None
+
+    @property
+    def client(self):
+        """The daemon's client, connected on first use. Raises DockerException while the host is down."""
+        import docker
+
+        with self._lock:
+            if self._client is None:
+                if time.monotonic() < self._down_until:
+                    raise docker.errors.DockerException(f"Docker host '{self.name}' is unreachable; retrying in {self.retry_in():.0f}s")
+                try:
+                    self._client = self._client_factory(self.base_url)
+                except Exception:
+                    self._back_off()
+                    raise
+                self._failures = 0
+            return self._client
+
+    def has_image(self, tag: str) -> bool:
+        """Whether the image is already on this daemon. An unreachable daemon has nothing."""
+        import docker
+
+        if tag in self._cached_images:
+            return True
+        if not self.available:
+            return False
+        try:
+            client = self.client
+        except Exception:
+            return False  # couldn't connect; the host is backing off now
+        try:
+            client.images.get(tag)
+        except docker.errors.APIError:  # ImageNotFound included: the daemon answered
+            return False
+        except Exception:
+            self.mark_down()  # connected before, but not answering now
+            return False
+        self._cached_images.add(tag)
+        return True
+
+    def load(self) -> float:
+        """Fraction of this host's budget in use (the larger of memory and CPU)."""
+        usage = self.budget.usage()
+        return max(usage["memory_mb"] / usage["memory_budget_mb"], usage["cpus"] / usage["cpu_budget"])
+
+
+class HostPool:
+    """Places skill containers across DockerHosts."""
+
+    def __init__(self, hosts: list[DockerHost]):
+        if not hosts:
+            raise ValueError("HostPool needs at least one Docker host")
+        self.hosts = {host.name: host for host in hosts}
+
+    def get(self, name: str) -> DockerHost:
+        """The named host; skills recorded before multi-host placement live on the first one."""
+        return self.hosts.get(name) or next(iter(self.hosts.values()))
+
+    def _ranked(self, base_image: str) -> list[DockerHost]:
+        """Reachable hosts, best first. A host that fails its image check drops out too."""
+        cached = {host.name: host.has_image(base_image) for host in self.hosts.values() if host.available}
+        up = [host for host in self.hosts.values() if host.name in cached and host.available]
+        return sorted(up, key=lambda host: (not cached[host.name], host.load()))
+
+    def place(self, key: str, resource_class: str, base_image: str = config.SKILL_BASE_IMAGE, timeout: float = 0) -> DockerHost:
+        """Reserve capacity for one container on the best host.
+
+        Waits up to timeout for a reachable host to free capacity, then raises PlacementError.
+        Raises HostUnavailableError at once if no host can be reached.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            ranked = self._ranked(base_image)
+            errors = [f"{host.name}: unreachable, retrying in {host.retry_in():.0f}s"
+                      for host in self.hosts.values() if not host.available]
+            if not ranked:
+                raise HostUnavailableError("No Docker host is reachable. " + "; ".join(errors))
+            for host in ranked:
+                try:
+                    host.budget.reserve(key, resource_class)
+                    return host
+                except PlacementError as e:
+                    errors.append(f"{host.name}: {e}")
+            if time.monotonic() >= deadline:
+                raise PlacementError("No Docker host can take this skill. " + "; ".join(errors))
+            time.sleep(min(0.5, max(0.0, deadline - time.monotonic())))
+
+    def release(self, host_name: str, key: str) -> None:
+        self.get(host_name).budget.release(key)
+
+    def usage(self) -> dict[str, dict]:
+        return {name: host.budget.usage() for name, host in self.hosts.items()}
+
+
+def parse_hosts(spec: str, client_factory: Callable = _default_client_factory) -> list[DockerHost]:
+    """Parse a HELIX_DOCKER_HOSTS value into DockerHosts with the configured per-host budget."""
+    hosts = []
+    for index, entry in enumerate(e.strip() for e in spec.split(",")):
+        if not entry:
+            continue
+        name, sep, url = entry.partition("=")
+        if not sep:
+            name, url = (LOCAL if entry == LOCAL else f"host{index}"), entry
+        budget = HostBudget(config.HOST_MEMORY_BUDGET_MB, config.HOST_CPU_BUDGET)
+        hosts.append(DockerHost(name.strip(), url.strip(), budget, client_factory))
+    return hosts
+
+
+_pool: HostPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_host_pool() -> HostPool:
+    """The process-wide pool built from config.DOCKER_HOSTS."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = HostPool(parse_hosts(config.DOCKER_HOSTS))
+        return _pool
@@ -0,0 +1,173 @@
+"""Packing mode — several small skills share one host container.
+
+With SKILL_PACKING on, small non-interactive skills aren't given a container each.
+They join a group whose dependencies don't conflict with theirs, up to
+PACK_MAX_SKILLS per group, and the group runs as one container built from the
+skill_host template: one interpreter and one uvicorn, with each skill loaded as its
+own module (so its own _state) and mounted under /s/<name>.
+
+Adding, updating or removing a member rebuilds the group under a new generation
+tag. The caller swaps the members' new Skill records into the registry and retires
+the previous container, the same blue/green path a single-skill update takes.
+Because the pip layer is keyed on the group's dependencies, a rebuild that adds no
+new dependencies reuses the cached layer.
+"""
+
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Callable
+
+from rich.console import Console
+
+import config
+from models.skill import Skill, SkillSpec
+from skill_factory.factory import build_and_run_group, remove_skill
+from skill_factory.placement import infer_resource_class
+
+console = Console()
+
+_DEFAULT_VIEW_POST = SkillSpec.model_fields["view_post_code"].default
+
+
+def _requirement(dependency: str) -> tuple[str, str]:
+    """'Pillow>=10' -> ('pillow', '>=10')."""
+    dependency = dependency.strip()
+    name = re.split(r"[<>=!~;\[\s]", dependency, maxsplit=1)[0]
+    return name.lower(), dependency[len(name):].strip()
+
+
+def merge_dependencies(*dependency_lists: list[str]) -> list[str] | None:
+    """Union of several dependency lists, or None if two pin the same package differently."""
+    merged: dict[str, str] = {}
+    for dependencies in dependency_lists:
+        for dependency in dependencies:
+            name, specifier = _requirement(dependency)
+            existing = merged.get(name)
+            if existing is None or not _requirement(existing)[1]:
+                merged[name] = dependency.strip()
+            elif specifier and specifier != _requirement(existing)[1]:
+                return None
+    return sorted(merged.values())
+
+
+def packable(spec: SkillSpec) -> bool:
+    """Whether a skill may share a host container.
+
+    Interactive skills are kept alone: their forms post to an absolute /view.
+    """
+    return (
+        config.SKILL_PACKING
+        and spec.view_post_code == _DEFAULT_VIEW_POST
+        and infer_resource_class(spec) == "small"
+    )
+
+
+@dataclass
+class SkillGroup:
+    name: str
+    specs: dict[str, SkillSpec] = field(default_factory=dict)
+    generation: int = 0
+
+    def dependencies(self, specs: dict[str, SkillSpec] | None = None) -> list[str] | None:
+        return merge_dependencies(*(s.dependencies for s in (specs or self.specs).values()))
+
+
+class Packer:
+    """Tracks skill groups and rebuilds them as members come and go."""
+
+    def __init__(self, max_group_size: int = config.PACK_MAX_SKILLS, build: Callable = build_and_run_group):
+        self.max_group_size = max_group_size
+        self._build = build
+        self._groups: dict[str, SkillGroup] = {}
+        self._next_id = 1
+        self._lock = threading.Lock()  # one group rebuild at a time
+
+    def group_of(self, name: str) -> SkillGroup | None:
+        return next((g for g in self._groups.values() if name in g.specs), None)
+
+    def _choose(self, spec: SkillSpec) -> SkillGroup:
+        """The group that needs the fewest new dependencies for spec, or a new one."""
+        best, best_added = None, None
+        for group in self._groups.values():
+            if len(group.specs) >= self.max_group_size and spec.name not in group.specs:
+                continue
+            merged = group.dependencies({**group.specs, spec.name: spec})
+            if merged is None:
+                continue
+            added = len(merged) - len(group.dependencies() or [])
+            if best_added is None or added < best_added:
+                best, best_added = group, added
+        if best is None:
+            best = SkillGroup(name=f"pack{self._next_id}")
+            self._next_id += 1
+        return best
+
+    def _rebuild(self, group: SkillGroup, specs: dict[str, SkillSpec]) -> list[Skill]:
+        generation = group.generation + 1
+        skills = self._build(group.name, list(specs.values()), group.dependencies(specs), f"g{generation}")
+        group.generation = generation
+        group.specs = specs
+        self._groups[group.name] = group
+        return skills
+
+    def deploy(self, spec: SkillSpec, verify: Callable[[Skill], None] | None = None) -> list[Skill]:
+        """Add spec to a group (or replace it in its current one) and rebuild the affected groups.
+
+        verify is called with spec's new Skill record before anything is committed; if it
+        raises, the new container is removed and the groups are left as they were.
+        Returns new Skill records for every member of every rebuilt group.
+        """
+        with self._lock:
+            current = self.group_of(spec.name)
+            target = self._choose(spec)
+            skills = self._rebuild_verified(target, {**target.specs, spec.name: spec}, spec.name, verify)
+            if current is not None and current is not target:
+                skills += self._remove_member(current, spec.name)
+            return skills
+
+    def evict(self, name: str) -> list[Skill]:
+        """Take a skill out of its group (e.g. it outgrew packing). Returns the siblings' new records."""
+        with self._lock:
+            group = self.group_of(name)
+            return self._remove_member(group, name) if group else []
+
+    def _rebuild_verified(self, group: SkillGroup, specs: dict[str, SkillSpec], name: str, verify) -> list[Skill]:
+        previous = (group.generation, dict(group.specs))
+        skills = self._rebuild(group, specs)
+        if verify is not None:
+            try:
+                verify(next(s for s in skills if s.name == name))
+            except Exception:
+                remove_skill(skills[0])
+                group.generation, group.specs = previous
+                if not group.specs:
+                    self._groups.pop(group.name, None)
+                raise
+        return skills
+
+    def _remove_member(self, group: SkillGroup, name: str) -> list[Skill]:
+        remaining = {n: s for n, s in group.specs.items() if n != name}
+        if not remaining:
+            self._groups.pop(group.name, None)
+            return []
+        try:
+            return self._rebuild(group, remaining)
+        except Exception as e:
+            # The old container keeps serving the siblings; the next rebuild drops the member
+            console.print(f"[red]Rebuilding {group.name} without '{name}' failed: {e}[/red]")
+            group.specs = remaining
+            return []
+
+
+_packer: Packer | None = None
+_packer_lock = threading.Lock()
+
+
+def get_packer() -> Packer:
+    """The process-wide Packer."""
+    global _packer
+    with _packer_lock:
+        if _packer is None:
+            _packer = Packer()
+        return _packer
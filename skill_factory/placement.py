@@ -0,0 +1,118 @@
+"""Resource classes for skill containers and the host budget they are placed against.
+
+Every skill runs with a memory, CPU and pids limit taken from its resource class
+(config.RESOURCE_CLASSES). The class comes from SkillSpec.resource_class, or is
+inferred from the skill's dependencies. Before a container starts, its limits are
+reserved against a host budget (one per Docker host, see hosts.py); a deploy that
+doesn't fit anywhere waits up to PLACEMENT_QUEUE_TIMEOUT for capacity to be released,
+then fails with PlacementError.
+"""
+
+import re
+import threading
+import time
+
+import config
+from models.skill import SkillSpec
+
+# Dependencies that pull in large native libraries or models
+_LARGE_DEPENDENCIES = {
+    "torch", "tensorflow", "transformers", "sentence-transformers", "jax", "spacy",
+    "easyocr", "onnxruntime", "openai-whisper", "diffusers",
+}
+_MEDIUM_DEPENDENCIES = {
+    "numpy", "pandas", "scipy", "scikit-learn", "matplotlib", "pillow", "opencv-python",
+    "opencv-python-headless", "pymupdf", "playwright", "selenium", "polars", "pyarrow",
+    "seaborn", "plotly", "lxml", "reportlab",
+}
+
+
+class PlacementError(RuntimeError):
+    """The host has no capacity left for a skill of the requested resource class."""
+
+
+def _package(dependency: str) -> str:
+    return re.split(r"[<>=!~;\[\s]", dependency.strip(), maxsplit=1)[0].lower()
+
+
+def infer_resource_class(spec: SkillSpec) -> str:
+    """The spec's explicit resource class, or one guessed from its dependencies."""
+    if spec.resource_class:
+        if spec.resource_class not in config.RESOURCE_CLASSES:
+            raise ValueError(
+                f"Unknown resource class '{spec.resource_class}' "
+                f"(expected one of {', '.join(config.RESOURCE_CLASSES)})"
+            )
+        return spec.resource_class
+    packages = {_package(dep) for dep in spec.dependencies}
+    if packages & _LARGE_DEPENDENCIES:
+        return "large"
+    if packages & _MEDIUM_DEPENDENCIES:
+        return "medium"
+    return "small"
+
+
+def container_limits(resource_class: str) -> dict:
+    """docker-py containers.run kwargs enforcing a resource class."""
+    limits = config.RESOURCE_CLASSES[resource_class]
+    memory = f"{limits['memory_mb']}m"
+    return {
+        "mem_limit": memory,
+        "memswap_limit": memory,  # no swap: a skill over its limit is OOM-killed, not slowed down
+        "nano_cpus": int(limits["cpus"] * 1e9),
+        "pids_limit": limits["pids"],
+    }
+
+
+class HostBudget:
+    """Memory and CPU a host can give to skill containers, and who holds what."""
+
+    def __init__(self, memory_mb: int, cpus: float):
+        self.memory_mb = memory_mb
+        self.cpus = cpus
+        self._held: dict[str, str] = {}  # reservation key -> resource class
+        self._released = threading.Condition()
+
+    def _used(self) -> tuple[int, float]:
+        classes = [config.RESOURCE_CLASSES[c] for c in self._held.values()]
+        return sum(c["memory_mb"] for c in classes), sum(c["cpus"] for c in classes)
+
+    def _fits(self, resource_class: str) -> bool:
+        limits = config.RESOURCE_CLASSES[resource_class]
+        memory, cpus = self._used()
+        return memory + limits["memory_mb"] <= self.memory_mb and cpus + limits["cpus"] <= self.cpus
+
+    def reserve(self, key: str, resource_class: str, timeout: float = 0) -> None:
+        """Hold capacity for one container, waiting up to timeout seconds for it. Raises PlacementError."""
+        limits = config.RESOURCE_CLASSES[resource_class]
+        if limits["memory_mb"] > self.memory_mb or limits["cpus"] > self.cpus:
+            raise PlacementError(f"Resource class '{resource_class}' is larger than the whole host budget")
+        deadline = time.monotonic() + timeout
+        with self._released:
+            while not self._fits(resource_class):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    memory, cpus = self._used()
+                    raise PlacementError(
+                        f"Host budget exhausted: {memory}/{self.memory_mb} MB and {cpus:g}/{self.cpus:g} CPUs "
+                        f"reserved by {len(self._held)} skill(s); a '{resource_class}' skill does not fit"
+                    )
+                self._released.wait(remaining)
+            self._held[key] = resource_class
+
+    def release(self, key: str) -> None:
+        with self._released:
+            if self._held.pop(key, None) is not None:
+                self._released.notify_all()
+
+    def usage(self) -> dict:
+        with self._released:
+            memory, cpus = self._used()
+            return {
+                "skills": len(self._held),
+                "memory_mb": memory,
+                "memory_budget_mb": self.memory_mb,
+                "cpus": cpus,
+                "cpu_budget": self.cpus,
+            }
+
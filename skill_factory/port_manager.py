@@ -1,7 +1,12 @@
 import socket
+import threading
 
 from config import PORT_RANGE_START, PORT_RANGE_END
 
+# (host, port) pairs handed out but possibly not bound yet (container still building/starting)
+_reserved: set[tuple[str, int]] = set()
+_lock = threading.Lock()
+
 
 def is_port_free(port: int) -> bool:
     """Check if a port is available on localhost."""
@@ -13,9 +18,21 @@ def is_port_free(port: int) -> bool:
             return False
 
 
-def allocate_port() -> int:
-    """Find the next free port in the configured range."""
-    for port in range(PORT_RANGE_START, PORT_RANGE_END):
-        if is_port_free(port):
-            return port
-    raise RuntimeError(f"No free ports in range {PORT_RANGE_START}-{PORT_RANGE_END}")
+def allocate_port(host: str = "local", probe: bool = True) -> int:
+    """Find and reserve the next free port in the configured range on a Docker host.
+
+    probe checks the port can be bound here, which only means something for local hosts;
+    on remote hosts the reservations are all we know.
+    """
+    with _lock:
+        for port in range(PORT_RANGE_START, PORT_RANGE_END):
+            if (host, port) not in _reserved and (not probe or is_port_free(port)):
+                _reserved.add((host, port))
+                return port
+    raise RuntimeError(f"No free ports in range {PORT_RANGE_START}-{PORT_RANGE_END} on host '{host}'")
+
+
+def release_port(port: int, host: str = "local") -> None:
+    """Return a port to the pool once its container is gone."""
+    with _lock:
+        _reserved.discard((host, port))
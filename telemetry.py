@@ -0,0 +1,256 @@
+"""Tracing and metrics for agent turns, LLM calls, tool handlers, builds and skill calls.
+
+span() times a block of work. Finished spans feed a latency histogram per span
+name and, if TRACE_FILE is set, are appended to it as JSON lines (trace_id /
+span_id / parent_id link the spans of one agent turn). count() bumps a counter,
+e.g. tokens by kind. Metrics are served in Prometheus text format on
+http://127.0.0.1:METRICS_PORT/metrics once start_metrics_server() is called.
+"""
+
+import atexit
+import contextvars
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+import config
+
+# Seconds; spans range from sub-millisecond skill calls to minute-long builds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+
+
+_lock = threading.Lock()
+_histograms: dict[tuple[str, tuple], Histogram] = {}
+_counters: dict[tuple[str, tuple], float] = {}
+_current: contextvars.ContextVar["Span | None"] = contextvars.ContextVar("helix_span", default=None)
+
+
+def _labels(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def observe(name: str, value: float, **labels) -> None:
+    """Record a value in the histogram name{labels}."""
+    with _lock:
+        key = (name, _labels(labels))
+        if key not in _histograms:
+            _histograms[key] = Histogram()
+        _histograms[key].observe(value)
+
+
+def count(name: str, value: float = 1, **labels) -> None:
+    """Add value to the counter name{labels}."""
+    with _lock:
+        key = (name, _labels(labels))
+        _counters[key] = _counters.get(key, 0) + value
+
+
+class Span:
+    def __init__(self, name: str, attrs: dict):
+        parent = _current.get()
+        self.name = name
+        self.attrs = attrs
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex[:16]
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.start = time.time()
+        self.duration = 0.0
+        self.error: str | None = None
+
+    def set(self, **attrs) -> None:
+        """Attach attributes known only once the work is done (status codes, token counts, ...)."""
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "duration_ms": round(self.duration * 1000, 3),
+            "status": "error" if self.error else "ok",
+            **({"error": self.error} if self.error else {}),
+            "attrs": self.attrs,
+        }
+
+
+@contextmanager
+def span(name: str, **attrs) -> Iterator[Span]:
+    """Time the enclosed block as a span nested under the current one."""
+    current = Span(name, attrs)
+    token = _current.set(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"[:500]
+        raise
+    finally:
+        current.duration = time.perf_counter() - started
+        _current.reset(token)
+        observe("helix_span_duration_seconds", current.duration, span=name)
+        if current.error:
+            count("helix_span_errors_total", span=name)
+        _write_trace(current)
+
+
+def propagate(fn: Callable) -> Callable:
+    """Wrap fn so it runs under the caller's current span when called from another thread."""
+    ctx = contextvars.copy_context()
+    return lambda *args, **kwargs: ctx.run(fn, *args, **kwargs)
+
+
+# --- JSONL trace file ---
+# Spans are handed to one writer thread, so finishing a span never waits on disk I/O.
+# The writer keeps the file open and rotates it by the bytes it has written.
+
+_trace_queue: queue.SimpleQueue = queue.SimpleQueue()
+_trace_writer: threading.Thread | None = None
+_trace_writer_lock = threading.Lock()
+
+
+def _write_trace(finished: Span) -> None:
+    path = config.TRACE_FILE
+    if not path:
+        return
+    global _trace_writer
+    if _trace_writer is None:
+        with _trace_writer_lock:
+            if _trace_writer is None:
+                _trace_writer = threading.Thread(target=_run_trace_writer, name="trace-writer", daemon=True)
+                _trace_writer.start()
+                atexit.register(flush_traces)
+    _trace_queue.put((path, (json.dumps(finished.to_dict(), default=str) + "\n").encode()))
+
+
+def flush_traces(timeout: float = 5.0) -> None:
+    """Wait until every span finished so far is written to the trace file."""
+    if _trace_writer is None:
+        return
+    done = threading.Event()
+    _trace_queue.put(done)
+    done.wait(timeout)
+
+
+def _run_trace_writer() -> None:
+    file = None
+    open_path = None
+    written = 0
+    while True:
+        item = _trace_queue.get()
+        if isinstance(item, threading.Event):  # flush_traces() is waiting
+            try:
+                if file:
+                    file.flush()
+            except OSError:
+                pass
+            item.set()
+            continue
+        path, line = item
+        try:
+            if path != open_path or written > config.TRACE_FILE_MAX_BYTES:
+                if file:
+                    file.close()
+                    file = None
+                if path == open_path:
+                    os.replace(path, path + ".1")  # keep one rotated file
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                file, open_path = open(path, "ab"), path
+                written = file.tell()
+            file.write(line)
+            written += len(line)
+            if _trace_queue.empty():
+                file.flush()
+        except OSError:
+            open_path = None  # tracing must never break the work it measures; reopen on the next span
+
+
+# --- Prometheus exposition ---
+
+def _format_labels(labels: tuple, extra: tuple = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+def render_prometheus() -> str:
+    """All counters and histograms in Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        seen = set()
+        for (name, labels), value in sorted(_counters.items()):
+            if name not in seen:
+                lines.append(f"# TYPE {name} counter")
+                seen.add(name)
+            lines.append(f"{name}{_format_labels(labels)} {value:g}")
+        for (name, labels), hist in sorted(_histograms.items()):
+            if name not in seen:
+                lines.append(f"# TYPE {name} histogram")
+                seen.add(name)
+            cumulative = 0
+            for bound, bucket_count in zip(hist.buckets, hist.counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{_format_labels(labels, (('le', f'{bound:g}'),))} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {hist.count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {hist.total:.6f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {hist.count}")
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    """Forget all recorded metrics."""
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def start_metrics_server(port: int = config.METRICS_PORT):
+    """Serve /metrics on localhost in a daemon thread. None if disabled (port 0) or the port is taken."""
+    if not port:
+        return None
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # only needed once serving
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer(("127.0.0.1", port), MetricsHandler)
+    except OSError:
+        return None
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server